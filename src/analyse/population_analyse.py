@@ -3,7 +3,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from src.load_data.summary_data_load import load_summary_monthly_data
-from src.load_data.data_load import load_population_data
+from src.load_data.data_load import load_population_data, seoul_yearly_population
 
 
 
@@ -14,12 +14,12 @@ def analyze_correlation_with_population():
     print("--- 따릉이 수요-인구 상관관계 분석 시작 ---")
 
     # --- 1단계: 따릉이 연간 이용 데이터 집계 ---
-    yearly_rentals = []
-    for year in range(2020, 2025):
-        monthly_df = load_summary_monthly_data([year])
-        if monthly_df is not None and not monthly_df.empty:
-            total_rentals_for_year = monthly_df['total_rentals'].sum()
-            yearly_rentals.append({'연도': year, '총_대여건수': total_rentals_for_year})
+    # 연도별 월별 요약을 스레드 풀로 한 번에 읽은 뒤 연도별로 합산합니다.
+    monthly_df = load_summary_monthly_data(list(range(2020, 2025)))
+    yearly_rentals = [
+        {'연도': int(year), '총_대여건수': total_rentals_for_year}
+        for year, total_rentals_for_year in monthly_df.groupby('year')['total_rentals'].sum().items()
+    ]
     
     if not yearly_rentals:
         print("🚨 따릉이 월별 요약 데이터가 없어 분석을 중단합니다.")
@@ -33,20 +33,8 @@ def analyze_correlation_with_population():
     population_raw_df = load_population_data()
     if population_raw_df is None: return
 
-    population_raw_df.columns = population_raw_df.columns.get_level_values(0)
-    seoul_pop_df = population_raw_df[population_raw_df['동별(2)'] == '소계'].copy()
-    
-    yearly_population = []
-    for year in range(2020, 2026):
-        year_str = str(year)
-        if year_str in seoul_pop_df.columns:
-            pop_value = seoul_pop_df[year_str].iloc[0]
-            yearly_population.append({'연도': year-1, '총_인구수': pop_value})
-        else:
-            continue
-            
-
-    population_df = pd.DataFrame(yearly_population)
+    # 연도별 4분기(연말) 서울시 전체 인구
+    population_df = seoul_yearly_population(population_raw_df)
     print("\n✅ 단계 2: 서울시 연간 인구 데이터 전처리 완료")
     print(population_df)
 
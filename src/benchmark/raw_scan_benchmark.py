@@ -0,0 +1,124 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.load_data.raw_dataset import list_raw_files, to_date
+from src.load_data.station_dictionary import load_station_dictionary
+from src.translate_data.csv_ingest import (
+    DEFAULT_ROW_GROUP_SIZE,
+    conform_raw_table,
+    iter_parquet_standard_batches,
+    write_sorted_parquet,
+)
+
+
+class CountingFile(io.RawIOBase):
+    """읽은 바이트 수를 세는 읽기 전용 파일 래퍼"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def readinto(self, buffer):
+        size = self._file.readinto(buffer)
+        self.bytes_read += size
+        return size
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def measure_scan(file_path, scan_filter):
+    """filter로 파일 하나를 조회할 때 (행 수, 읽은 바이트, 소요 초)를 측정합니다."""
+    source = CountingFile(file_path)
+    try:
+        start_time = time.perf_counter()
+        fragment = ds.ParquetFileFormat().make_fragment(source)
+        dataset = ds.FileSystemDataset([fragment], schema=fragment.physical_schema,
+                                       format=ds.ParquetFileFormat())
+        rows = dataset.to_table(filter=scan_filter).num_rows
+        return rows, source.bytes_read, time.perf_counter() - start_time
+    finally:
+        source.close()
+
+
+def write_sorted_copy(file_path, output_path):
+    """원본 파일을 write_sorted_parquet로 정렬하여 output_path에 기록합니다."""
+    batches = iter_parquet_standard_batches(file_path, load_station_dictionary())
+    write_sorted_parquet(batches, output_path)
+
+
+def write_shuffled_copy(file_path, output_path, seed=0):
+    """
+    원본 파일의 행 순서를 섞어 output_path에 기록합니다. (정렬 전 기준선)
+    원본이 이미 정렬되어 있어도 비교가 되도록, 정렬본과 같은 스키마·row group 크기로 쓰고 순서만 다르게 합니다.
+    """
+    table = pa.concat_tables(iter_parquet_standard_batches(file_path, load_station_dictionary()))
+    order = np.random.default_rng(seed).permutation(table.num_rows)
+    pq.write_table(conform_raw_table(table.take(order)), output_path,
+                   row_group_size=DEFAULT_ROW_GROUP_SIZE, write_page_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="원본 Parquet 파일 하나를 정렬 전/후로 하루·한 시간 조회하여 읽은 바이트를 비교합니다.")
+    parser.add_argument('file', nargs='?', help="원본 Parquet 파일 (기본: data/parquet의 첫 파일)")
+    parser.add_argument('--date', help="조회할 날짜 (기본: 파일의 첫 행 날짜)")
+    parser.add_argument('--hour', type=int, default=8, help="한 시간 조회에 사용할 시각 (0~23)")
+    parser.add_argument('--seed', type=int, default=0, help="정렬 전 기준선의 행 순서를 섞을 때 쓰는 시드")
+    args = parser.parse_args()
+
+    file_path = args.file or next(iter(list_raw_files()), None)
+    if file_path is None:
+        print("🚨 원본 Parquet 파일을 찾을 수 없습니다.")
+        return
+
+    if args.date:
+        day = to_date(args.date)
+    else:
+        day = to_date(pq.ParquetFile(file_path).read_row_group(0, columns=['기준_날짜']).column(0)[0].as_py())
+
+    day_filter = ds.field('기준_날짜') == day
+    hour_filter = day_filter & (ds.field('기준_시간대') >= args.hour * 100) & \
+        (ds.field('기준_시간대') < (args.hour + 1) * 100)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shuffled_path = os.path.join(temp_dir, 'shuffled.parquet')
+        sorted_path = os.path.join(temp_dir, 'sorted.parquet')
+        print(f"--- ⏱️ {os.path.basename(file_path)} 정렬 전(행 순서 섞음)/정렬 후 사본 생성 중... ---")
+        write_shuffled_copy(file_path, shuffled_path, args.seed)
+        write_sorted_copy(file_path, sorted_path)
+
+        print(f"\n조회 조건: {day} 하루 / {args.hour}시 한 시간")
+        print(f"{'파일':<8} {'조회':<6} {'row group':>10} {'행 수':>12} {'읽은 바이트':>16} {'초':>8}")
+        for label, path in [('정렬 전', shuffled_path), ('정렬 후', sorted_path)]:
+            metadata = pq.ParquetFile(path).metadata
+            size = os.path.getsize(path)
+            for query, scan_filter in [('하루', day_filter), ('한 시간', hour_filter)]:
+                rows, bytes_read, seconds = measure_scan(path, scan_filter)
+                print(f"{label:<8} {query:<6} {metadata.num_row_groups:>10,} {rows:>12,} "
+                      f"{bytes_read:>16,} {seconds:>8.3f}  (파일 크기의 {bytes_read / size:.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.load_data.raw_dataset import list_raw_files, raw_to_pandas
+from src.load_data.station_dictionary import load_station_dictionary
+from src.translate_data.csv_ingest import (
+    DEFAULT_ROW_GROUP_SIZE,
+    iter_parquet_standard_batches,
+    write_sorted_parquet,
+)
+
+# 비교할 Parquet 쓰기 설정 (압축 코덱/레벨 × 사전 인코딩 × row group 크기)
+CODECS = [('none', None), ('snappy', None), ('zstd', 1), ('zstd', 3), ('zstd', 9)]
+DICTIONARY_OPTIONS = [True, False]
+ROW_GROUP_SIZES = [32 * 1024, DEFAULT_ROW_GROUP_SIZE, 1024 * 1024]
+
+PROJECTED_COLUMNS = ['기준_날짜', '기준_시간대', '전체_건수']
+SCAN_BATCH_SIZE = 100_000  # load_parquet_year_data 기본 chunk_size와 동일
+REPEATS = 3
+OUTPUT_PATH = os.path.join('data', 'benchmark', 'storage_format_benchmark.csv')
+
+
+def time_scan(file_path, columns=None, scan_filter=None, repeats=REPEATS):
+    """
+    load_parquet_year_data와 같은 방식(dataset → 배치 → 좁은 dtype DataFrame)으로 파일을 읽고
+    가장 빠른 시간(초)과 읽은 행 수를 반환합니다.
+    """
+    dataset = ds.dataset(file_path, format='parquet')
+    best, rows = float('inf'), 0
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        rows = 0
+        for batch in dataset.to_batches(columns=columns, filter=scan_filter, batch_size=SCAN_BATCH_SIZE):
+            rows += len(raw_to_pandas(batch))
+        best = min(best, time.perf_counter() - start_time)
+    return best, rows
+
+
+def benchmark_setting(sample_path, file_path, compression, level, use_dictionary, row_group_size, day):
+    """
+    쓰기 설정 하나로 표본 파일을 다시 기록하고 크기와 조회 시간을 측정합니다.
+    실제 적재와 같은 write_sorted_parquet로 기록하므로 row group이 날짜 경계에서 나뉩니다.
+    """
+    start_time = time.perf_counter()
+    write_sorted_parquet(
+        iter_parquet_standard_batches(sample_path, load_station_dictionary()), file_path,
+        row_group_size=row_group_size, compression=compression, compression_level=level,
+        use_dictionary=use_dictionary,
+    )
+    write_seconds = time.perf_counter() - start_time
+
+    full_seconds, full_rows = time_scan(file_path)
+    projected_seconds, _ = time_scan(file_path, columns=PROJECTED_COLUMNS)
+    day_seconds, day_rows = time_scan(file_path, scan_filter=ds.field('기준_날짜') == day)
+
+    return {
+        'compression': compression if level is None else f'{compression}({level})',
+        'dictionary': use_dictionary,
+        'row_group_size': row_group_size,
+        'size_mb': os.path.getsize(file_path) / 1024 ** 2,
+        'write_sec': write_seconds,
+        'full_scan_sec': full_seconds,
+        'full_rows_per_sec': full_rows / full_seconds if full_seconds > 0 else 0,
+        'projected_scan_sec': projected_seconds,
+        'one_day_sec': day_seconds,
+        'one_day_rows': day_rows,
+    }
+
+
+def run_benchmark(sample_path, output_path=OUTPUT_PATH):
+    """표본 월 파일을 쓰기 설정 조합마다 다시 기록하여 비교표를 만들고 CSV로 저장합니다."""
+    table = pq.read_table(sample_path, columns=['기준_날짜'])
+    day = table.column('기준_날짜')[table.num_rows // 2].as_py()
+    settings = list(itertools.product(CODECS, DICTIONARY_OPTIONS, ROW_GROUP_SIZES))
+    print(f"--- 📏 {os.path.basename(sample_path)} ({table.num_rows:,}행)로 {len(settings)}개 설정 비교 ---")
+    print(f"하루 조회 날짜: {day}\n")
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index, ((compression, level), use_dictionary, row_group_size) in enumerate(settings, start=1):
+            file_path = os.path.join(temp_dir, f'setting_{index}.parquet')
+            result = benchmark_setting(sample_path, file_path, compression, level, use_dictionary, row_group_size, day)
+            results.append(result)
+            os.remove(file_path)
+            print(f"  [{index}/{len(settings)}] {result['compression']}, dictionary={use_dictionary}, "
+                  f"row_group={row_group_size:,}: {result['size_mb']:.1f}MB, "
+                  f"전체 {result['full_scan_sec']:.2f}초, 하루 {result['one_day_sec']:.3f}초")
+
+    result_df = pd.DataFrame(results).sort_values(['full_scan_sec', 'size_mb'])
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    result_df.to_csv(output_path, index=False)
+
+    print("\n--- 📊 비교표 (전체 조회 시간 순) ---")
+    print(result_df.to_string(index=False, float_format=lambda v: f'{v:,.3f}'))
+    print(f"\n✅ 결과 저장: {output_path}")
+    return result_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="압축 코덱/사전 인코딩/row group 크기별 Parquet 읽기 성능을 비교합니다.")
+    parser.add_argument('file', nargs='?', help="표본 원본 Parquet 파일 (기본: data/parquet의 마지막 파일)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="비교표 CSV 저장 경로")
+    args = parser.parse_args()
+
+    sample_path = args.file or next(reversed(list_raw_files()), None)
+    if sample_path is None:
+        print("🚨 원본 Parquet 파일을 찾을 수 없습니다.")
+        return
+    run_benchmark(sample_path, args.output)
+
+
+if __name__ == '__main__':
+    main()
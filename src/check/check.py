@@ -1,5 +1,5 @@
 from src.load_data.summary_data_load import load_summary_monthly_data
-from src.load_data.data_load import load_population_data
+from src.load_data.data_load import load_population_data, seoul_yearly_population
 
 yearly_rentals = []
 for year in range(2020, 2025):
@@ -32,23 +32,7 @@ population_raw_df = load_population_data()
 if population_raw_df is None:
     print("🚨 서울시 인구 데이터가 없어 분석을 중단합니다.")
 
-population_raw_df.columns = population_raw_df.columns.get_level_values(0)
-
-seoul_pop_df = population_raw_df[population_raw_df['동별(2)'] == '소계'].copy()
-
-yearly_population = []
-
-for year in range(2020, 2026):
-    year_str = str(year)
-    q4_col = f'{year_str}'
-    
-    if year_str in seoul_pop_df.columns:
-        pop_value = seoul_pop_df[year_str].iloc[0]
-    elif q4_col in seoul_pop_df.columns:
-        pop_value = seoul_pop_df[q4_col].iloc[0]
-    else:
-        continue 
-    
-    yearly_population.append({'연도': year-1, '총_인구수': pop_value})
+# 연도별 4분기(연말) 서울시 전체 인구
+yearly_population = seoul_yearly_population(population_raw_df)
 
 print(yearly_population)
\ No newline at end of file
@@ -1,13 +1,16 @@
 import pandas as pd
 import os
-import glob # 파일 경로를 쉽게 다루기 위한 라이브러리
+
+from src.load_data.raw_dataset import list_raw_files
+from src.load_data.station_dictionary import decode_station_columns
 
 # --- 데이터 경로 설정 ---
 # 실제 프로젝트 구조에 맞게 경로를 수정해주세요.
 BASE_DIR = '.' # 현재 스크립트가 실행되는 위치를 기준으로 가정
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 MASTER_FILE_PATH = os.path.join(DATA_DIR, 'bcycle_master_location.csv')
-RAW_DATA_DIR = os.path.join(DATA_DIR, 'parquet', '2025') # 예시로 2023년 데이터 사용
+RAW_DATA_DIR = os.path.join(DATA_DIR, 'parquet')
+SAMPLE_YEAR = 2025 # 예시로 2025년 데이터 사용
 
 def check_station_id_matching():
     """
@@ -28,11 +31,12 @@ def check_station_id_matching():
         return
 
     # --- 2. 원본 데이터 샘플 로드 ---
-    # 2023년 폴더의 첫 번째 parquet 파일을 샘플로 사용
+    # SAMPLE_YEAR 파티션의 첫 번째 parquet 파일을 샘플로 사용
     try:
-        sample_file = glob.glob(os.path.join(RAW_DATA_DIR, '*.parquet'))[0]
+        sample_file = list_raw_files(years=[SAMPLE_YEAR], base_dir=RAW_DATA_DIR)[0]
         print(f"샘플 파일: {os.path.basename(sample_file)}")
-        usage_df = pd.read_parquet(sample_file)
+        # 원본의 대여소_ID는 대여소 사전 코드이므로 문자열 ID로 되돌려 마스터와 비교합니다.
+        usage_df = decode_station_columns(pd.read_parquet(sample_file))
         print(f"✅ 원본 데이터 샘플 로드 성공: {len(usage_df):,}건")
     except IndexError:
         print(f"🚨 오류: 원본 데이터 파일을 찾을 수 없습니다. 경로: {RAW_DATA_DIR}")
@@ -1,94 +1,47 @@
-import pandas as pd
+import argparse
+import numpy as np
 import os
-import glob
 import time
-import pyarrow.parquet as pq 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.data_mart.mart_partials import (
+    forget_month, load_watermark, partial_path, partials_dir, plan_refresh, record_month, recorded_months, save_watermark
+)
+from src.data_mart.time_series_dense import (
+    SLOTS_PER_DAY, aggregate_month_job, dense_to_frames, dense_to_rollups, year_day_range
+)
+from src.load_data.catalog import available_years, refresh_catalog
+from src.load_data.mart_io import export_marts_ipc, ipc_path
+from src.load_data.summary_data_load import ROLLUP_LEVELS, SUMMARY_DATA_DIR, rollup_file_path
+from src.load_data.timeline_index import TIMELINE_DIR, build_timeline_index, load_timeline_index
 
 # --- 설정 (Configuration) ---
 
 # 1. 입력: 월별 Parquet 파일이 있는 기본 경로
 BASE_INPUT_DIR = 'data/parquet'
 
-# 2. 출력: 최종 요약 파일을 저장할 경로
-OUTPUT_DATA_DIR = 'data/summary'
+# 2. 출력: 최종 요약 파일을 저장할 경로 (summary_data_load가 읽는 경로와 같습니다)
+OUTPUT_DATA_DIR = SUMMARY_DATA_DIR
 
-# 3. 처리할 연도 범위
+# 3. 처리할 연도 범위 (카탈로그가 비어 있을 때 사용)
 YEARS_TO_PROCESS = range(2020, 2026)
 
-# 4. 집계에 필요한 최소한의 컬럼
-REQUIRED_COLUMNS = ['기준_날짜', '기준_시간대', '전체_건수']
+# 4. 월 파일을 동시에 집계할 워커 프로세스 수
+DEFAULT_WORKERS = os.cpu_count() or 1
 
+# 5. 월별 부분 집계 파일 형식 (OUTPUT_DATA_DIR/partials/{YYYY-MM}.npz)
+#    버전 2: (일자 × 5분 슬롯) 배열. 버전이 다른 부분 집계는 모두 다시 만듭니다.
+PARTIAL_EXTENSION = 'npz'
+PARTIAL_VERSION = 2
 
-def create_yearly_summaries_from_monthly_files(year):
-    """
-    지정된 연도의 모든 월별 Parquet 파일을 직접 읽어, 두 종류의 사전 집계된
-    요약 파일(Data Mart)을 생성합니다.
-    """
-    
-    # --- 1. 입력 파일 탐색 ---
-    year_input_folder = os.path.join(BASE_INPUT_DIR, str(year))
-    file_pattern = os.path.join(year_input_folder, f'bycle_{year}*.parquet')
-    monthly_files = sorted(glob.glob(file_pattern))
 
-    if not monthly_files:
-        print(f"    ⏩ 원본 파일 없음: {year_input_folder} 폴더에 파일이 없습니다. 건너뜁니다.")
-        return
-
-    print(f"    - Step 1: 총 {len(monthly_files)}개의 월별 파일을 읽어 집계 시작...")
-    
-    daily_hourly_dict = {}
-    monthly_dict = {}
-    total_chunks_processed = 0
-
-    # --- 2. 모든 월별 파일을 순회하며 청크 단위로 집계 ---
-    for file_path in monthly_files:
-        try:
-            parquet_file = pq.ParquetFile(file_path)
-            batch_iterator = parquet_file.iter_batches(batch_size=500_000, columns=REQUIRED_COLUMNS)
-
-            for batch in batch_iterator:
-
-                chunk = batch.to_pandas()
-
-                chunk['기준_날짜'] = pd.to_datetime(chunk['기준_날짜'], format='%Y%m%d')
-                chunk['year'] = chunk['기준_날짜'].dt.year
-                chunk['month'] = chunk['기준_날짜'].dt.month
-                chunk['day'] = chunk['기준_날짜'].dt.day
-                chunk['hour'] = chunk['기준_시간대'] // 100
-
-                # 집계 1: 일별/시간별
-                daily_chunk_summary = chunk.groupby(['year', 'month', 'day', 'hour'])['전체_건수'].sum()
-                for (y, m, d, h), count in daily_chunk_summary.items():
-                    key = (y, m, d, h)
-                    daily_hourly_dict[key] = daily_hourly_dict.get(key, 0) + count
-
-                # 집계 2: 월별
-                monthly_chunk_summary = chunk.groupby(['year', 'month'])['전체_건수'].sum()
-                for (y, m), count in monthly_chunk_summary.items():
-                    key = (y, m)
-                    monthly_dict[key] = monthly_dict.get(key, 0) + count
-                    
-                total_chunks_processed += 1
-                print(f"\r      총 {total_chunks_processed}개의 청크 처리 완료... ({os.path.basename(file_path)})", end="")
-
-        except Exception as e:
-            file_name = os.path.basename(file_path)
-            print(f"\n    ❌ 오류: {file_name} 파일을 읽는 중 문제 발생 - {e}. 이 파일은 건너뜁니다.")
-            continue
+def write_year_summaries(year, rentals, observed):
+    """(reduce 결과) 연도 배열을 일별/시간별 요약, 월별 요약, 롤업 큐브 파일로 저장합니다."""
+    first_day, _ = year_day_range(year)
+    daily_df, monthly_df = dense_to_frames(year, first_day, rentals, observed)
 
-    print("\n    - Step 2: 최종 집계 결과 변환 및 저장...")
-    
     # --- 결과 1: 일별/시간별 요약 파일 저장 ---
-    if daily_hourly_dict:
-        daily_data = []
-        for (y, m, d, h), count in daily_hourly_dict.items():
-            daily_data.append({'year': y, 'month': m, 'day': d, 'hour': h, 'total_rentals': count})
-        daily_df = pd.DataFrame(daily_data)
-        
-        for col in ['year', 'month', 'day', 'hour']:
-            daily_df[col] = pd.to_numeric(daily_df[col], downcast='integer')
-        daily_df['total_rentals'] = pd.to_numeric(daily_df['total_rentals'], downcast='unsigned')
-
+    if not daily_df.empty:
         output_daily_file = os.path.join(OUTPUT_DATA_DIR, f'summary_daily_hourly_{year}.parquet')
         daily_df.to_parquet(output_daily_file, index=False)
         print(f"    ✅ 일별/시간별 요약 저장 완료: {os.path.basename(output_daily_file)}")
@@ -96,37 +49,144 @@ def create_yearly_summaries_from_monthly_files(year):
         print("    ⚠️ 일별/시간별 요약 데이터 없음.")
 
     # --- 결과 2: 월별 요약 파일 저장 ---
-    if monthly_dict:
-        monthly_data = []
-        for (y, m), count in monthly_dict.items():
-            monthly_data.append({'year': y, 'month': m, 'total_rentals': count})
-        monthly_df = pd.DataFrame(monthly_data)
-        
-        for col in ['year', 'month']:
-            monthly_df[col] = pd.to_numeric(monthly_df[col], downcast='integer')
-        monthly_df['total_rentals'] = pd.to_numeric(monthly_df['total_rentals'], downcast='unsigned')
-
+    if not monthly_df.empty:
         output_monthly_file = os.path.join(OUTPUT_DATA_DIR, f'summary_monthly_{year}.parquet')
         monthly_df.to_parquet(output_monthly_file, index=False)
         print(f"    ✅ 월별 요약 저장 완료: {os.path.basename(output_monthly_file)}")
     else:
         print("    ⚠️ 월별 요약 데이터 없음.")
 
+    # --- 결과 3: 롤업 큐브 (5분 → 15분 → 시 → 일 → 주 → 월) ---
+    rollups = dense_to_rollups(first_day, rentals, observed)
+    for level, rollup_df in rollups.items():
+        rollup_df.to_parquet(rollup_file_path(level, year), index=False)
+    print(f"    ✅ 롤업 큐브 저장 완료: rollup_{{{','.join(rollups)}}}_{year}.parquet")
+
+
+def remove_year_summaries(year):
+    """원본 월이 모두 사라진 연도의 요약/롤업 파일과 그 IPC 사본을 지웁니다."""
+    paths = [
+        os.path.join(OUTPUT_DATA_DIR, f'summary_daily_hourly_{year}.parquet'),
+        os.path.join(OUTPUT_DATA_DIR, f'summary_monthly_{year}.parquet'),
+    ] + [rollup_file_path(level, year) for level in ROLLUP_LEVELS]
+    for path in paths:
+        for file_path in (path, ipc_path(path)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    print(f"    🗑️ {year}년 요약/롤업 파일을 삭제했습니다.")
+
+
+def build_summaries(years, max_workers=DEFAULT_WORKERS, force=False):
+    """
+    월 파일 단위 map-reduce로 여러 연도의 요약 마트를 증분 갱신합니다.
+    - map: 워터마크와 비교해 새로 생기거나 바뀐 원본 월만 워커 프로세스가 연도 크기의 (일자 × 5분 슬롯) 부분 배열로
+      집계하고, 드라이버가 partials/{YYYY-MM}.npz로 저장합니다.
+    - reduce: 바뀐 월이 속한 연도만 저장된 부분 배열을 모두 더해 다시 기록합니다.
+      집계에 실패한 월이 있는 연도는 이전 부분 배열이 섞이지 않도록 다시 기록하지 않습니다.
+      (실패한 월은 워터마크가 갱신되지 않으므로 다음 실행에서 다시 집계합니다)
+      원본 월이 모두 사라진 연도는 요약/롤업 파일을 지웁니다.
+    정수 덧셈만 사용하므로 워커 수나 완료 순서, 증분 여부와 관계없이 전체 직렬 실행과 같은 결과가 나옵니다.
+    force=True이면 워터마크와 관계없이 모든 월을 다시 집계합니다.
+
+    Returns:
+        요약 파일을 다시 기록한 연도 목록
+    """
+    watermark = load_watermark(OUTPUT_DATA_DIR, version=PARTIAL_VERSION)
+    changed, removed = plan_refresh(watermark, years, force=force, base_dir=BASE_INPUT_DIR)
+    if not changed and not removed:
+        print("    ⏩ 새로 생기거나 바뀐 원본 월이 없습니다. 기존 요약 마트를 그대로 사용합니다.")
+        return []
+
+    os.makedirs(partials_dir(OUTPUT_DATA_DIR), exist_ok=True)
+    for year, month in removed:
+        print(f"      🗑️ 원본이 사라진 {year}년 {month}월 부분 집계를 삭제합니다.")
+        forget_month(OUTPUT_DATA_DIR, watermark, year, month, PARTIAL_EXTENSION)
+
+    print(f"    - Step 1: 새로 생기거나 바뀐 {len(changed)}개의 월별 파일을 {max_workers}개 워커로 집계 시작...")
+    if max_workers <= 1:
+        results = (aggregate_month_job(year, month, path) for year, month, path in changed)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        futures = [executor.submit(aggregate_month_job, year, month, path) for year, month, path in changed]
+        results = (future.result() for future in as_completed(futures))
+
+    failed_years = set()
+    try:
+        for done, (year, month, rentals, observed, fingerprint, error, seconds) in enumerate(results, start=1):
+            if error is not None:
+                print(f"      ❌ [{done}/{len(changed)}] {year}년 {month}월 실패 - {error}. 이 파일은 건너뜁니다.")
+                failed_years.add(year)
+                continue
+            np.savez(partial_path(OUTPUT_DATA_DIR, year, month, PARTIAL_EXTENSION), rentals=rentals, observed=observed)
+            record_month(watermark, year, month, fingerprint)
+            save_watermark(OUTPUT_DATA_DIR, watermark)
+            print(f"      ✅ [{done}/{len(changed)}] {year}년 {month}월 집계 완료 ({seconds:.1f}초)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        save_watermark(OUTPUT_DATA_DIR, watermark)
+
+    print("    - Step 2: 바뀐 연도의 부분 집계 합산 및 저장...")
+    updated_years = []
+    for year in sorted({year for year, _, _ in changed} | {year for year, _ in removed}):
+        if year in failed_years:
+            print(f"    ⚠️ {year}년은 집계에 실패한 월이 있어 요약 파일을 다시 기록하지 않습니다. (다음 실행에서 재시도)")
+            continue
+        months = recorded_months(watermark, year)
+        if not months:
+            print(f"    ⚠️ {year}년 부분 집계가 없습니다.")
+            remove_year_summaries(year)
+            updated_years.append(year)
+            continue
+
+        _, num_days = year_day_range(year)
+        rentals = np.zeros(num_days * SLOTS_PER_DAY, dtype=np.int64)
+        observed = np.zeros(num_days * SLOTS_PER_DAY, dtype=np.int64)
+        for _, month in months:
+            with np.load(partial_path(OUTPUT_DATA_DIR, year, month, PARTIAL_EXTENSION)) as partial:
+                rentals += partial['rentals']
+                observed += partial['observed']
+        write_year_summaries(year, rentals, observed)
+        updated_years.append(year)
+    return updated_years
+
+
+def create_yearly_summaries_from_monthly_files(year, max_workers=1, force=False):
+    """
+    지정된 연도의 모든 월별 Parquet 파일을 직접 읽어, 두 종류의 사전 집계된
+    요약 파일(Data Mart)과 롤업 큐브를 생성합니다.
+    집계는 미리 할당한 (연중 일자 × 5분 슬롯) 배열에 np.bincount로 누적합니다.
+    """
+    build_summaries([year], max_workers=max_workers, force=force)
+
 
 def main():
+    parser = argparse.ArgumentParser(description="원본 Parquet에서 시간대별/월별 요약 마트를 생성합니다.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="월 파일을 집계할 워커 프로세스 수")
+    parser.add_argument('--force', action='store_true', help="워터마크와 관계없이 모든 월을 다시 집계")
+    args = parser.parse_args()
+
     start_time = time.time()
-    print("--- 🚀 최종 사전 집계 데이터 마트 2종 생성 시작 (월별 파일 직접 처리) ---\n")
+    print("--- 🚀 최종 사전 집계 데이터 마트 2종 생성 시작 (월별 파일 map-reduce) ---\n")
     
     os.makedirs(OUTPUT_DATA_DIR, exist_ok=True)
     
-    for year in YEARS_TO_PROCESS:
-        print(f"--- 🏭 {year}년 데이터 집계 시작 ---")
-        create_yearly_summaries_from_monthly_files(year)
-        print("-" * 40)
-
+    # 처리할 연도는 카탈로그에 기록된 원본 연도를 사용합니다.
+    refresh_catalog()
+    updated_years = build_summaries(available_years(default=YEARS_TO_PROCESS), max_workers=args.workers, force=args.force)
+
+    # 대시보드의 임의 기간 조회에 쓰는 누적합 색인 (요약이 바뀐 경우에만 다시 만듭니다)
+    if updated_years or load_timeline_index() is None:
+        build_timeline_index()
+        print(f"    ✅ 누적합 색인 저장 완료: {TIMELINE_DIR}")
+
+    # 대시보드가 메모리 맵으로 읽을 비압축 IPC 사본
+    export_marts_ipc([OUTPUT_DATA_DIR])
+    refresh_catalog()
     end_time = time.time()
     print(f"\n🎉 모든 작업 완료! 총 소요 시간: {end_time - start_time:.2f}초")
     print(f"집계된 최종 요약 파일들은 '{OUTPUT_DATA_DIR}' 폴더에 저장되었습니다.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,19 +1,49 @@
+import argparse
+import json
 import pandas as pd
 import numpy as np
 import os
 from pathlib import Path
 
-def process_yearly_data():
+from src.data_mart.mart_partials import is_source_current, load_watermark, save_watermark, source_fingerprint
+from src.load_data.catalog import available_years, refresh_catalog
+from src.load_data.distance_data_load import DISTANCE_DATA_DIR
+from src.load_data.mart_io import export_marts_ipc
+
+# hole_distance_time_preprocessing과 같은 폴더 (partials/watermark.json을 함께 씁니다)
+DATA_DIR = DISTANCE_DATA_DIR
+DETAILED_SUMMARY_PATH = os.path.join(DATA_DIR, 'yearly_detailed_summary.json')
+YEARS_TO_PROCESS = range(2020, 2026)  # 카탈로그에 distance_time 파일이 없을 때 사용
+
+
+def load_previous_summaries():
+    """이전 실행에서 저장한 연도별 상세 요약 {연도: 통계}. 파일이 없으면 빈 딕셔너리"""
+    if not os.path.exists(DETAILED_SUMMARY_PATH):
+        return {}
+    with open(DETAILED_SUMMARY_PATH, 'r', encoding='utf-8') as f:
+        return {stats['year']: stats for stats in json.load(f)}
+
+
+def process_yearly_data(watermark, years=YEARS_TO_PROCESS, force=False):
     """
     연도별 데이터를 처리하여 이상치/결측치 제거 후 요약 통계 생성
+    IQR 경계가 연도 전체 분포에 따라 달라지므로 월 단위로 합칠 수 없습니다. 대신 입력 파일
+    (distance_time_{year}.parquet)이 워터마크 기록 이후 바뀌지 않은 연도는 이전 요약을 그대로 씁니다.
+    다시 계산한 연도의 입력 지문은 watermark['sources']에 기록합니다. (저장은 호출한 쪽에서)
     """
-    years = range(2020, 2026)  # 2020-2025
     summary_results = []
+    previous_summaries = {} if force else load_previous_summaries()
     
     print("=== 연도별 데이터 처리 시작 ===")
     
     for year in years:
-        file_path = f'data/02/distance_time_{year}.parquet'
+        file_path = os.path.join(DATA_DIR, f'distance_time_{year}.parquet')
+        source_key = f'distance_time_{year}'
+
+        if year in previous_summaries and is_source_current(watermark['sources'].get(source_key), file_path):
+            print(f"\n--- {year}년: 입력 파일이 바뀌지 않아 이전 요약 통계를 재사용합니다 ---")
+            summary_results.append(previous_summaries[year])
+            continue
         
         try:
             print(f"\n--- {year}년 데이터 처리 중 ---")
@@ -93,6 +123,7 @@ def process_yearly_data():
                 summary_stats['weekday_avg_distance'] = {int(k): float(v) for k, v in weekday_stats['전체_이용_거리'].to_dict().items()}
             
             summary_results.append(summary_stats)
+            watermark['sources'][source_key] = source_fingerprint(file_path)
             
             print(f"평균 이용시간: {summary_stats['avg_time']:.2f}분")
             print(f"평균 이용거리: {summary_stats['avg_distance']:.2f}m")
@@ -109,95 +140,112 @@ def process_yearly_data():
     
     return summary_results
 
-# 데이터 처리 실행
-summary_data = process_yearly_data()
+def main():
+    parser = argparse.ArgumentParser(description="연도별 이용 시간/거리 요약 통계를 생성합니다.")
+    parser.add_argument('--force', action='store_true', help="입력 파일이 바뀌지 않은 연도도 다시 계산")
+    args = parser.parse_args()
 
-if summary_data:
-    print("\n=== 연도별 요약 통계 ===")
-    
-    # DataFrame으로 변환 (기본 통계만)
-    basic_stats = []
-    for stats in summary_data:
-        basic_stats.append({
-            'year': stats['year'],
-            'total_records': stats['total_records'],
-            'avg_time': round(stats['avg_time'], 2),
-            'avg_distance': round(stats['avg_distance'], 2),
-            'median_time': round(stats['median_time'], 2),
-            'median_distance': round(stats['median_distance'], 2),
-            'std_time': round(stats['std_time'], 2),
-            'std_distance': round(stats['std_distance'], 2)
-        })
-    
-    summary_df = pd.DataFrame(basic_stats)
-    
-    # 요약 데이터 저장
-    output_path = 'data/02/yearly_summary.parquet'
-    summary_df.to_parquet(output_path)
-    print(f"\n요약 데이터 저장 완료: {output_path}")
-    
-    # 상세 정보도 JSON으로 저장
-    import json
-    with open('data/02/yearly_detailed_summary.json', 'w', encoding='utf-8') as f:
-        json.dump(summary_data, f, ensure_ascii=False, indent=2)
-    print("상세 요약 데이터 저장 완료: data/02/yearly_detailed_summary.json")
-    
-    print("\n=== 상관관계 분석 (요약 데이터 기반) ===")
-    
-    # 연도별 평균값들 간의 상관관계
-    time_distance_corr = summary_df['avg_time'].corr(summary_df['avg_distance'])
-    print(f"연도별 평균 이용시간-거리 상관관계: {time_distance_corr:.4f}")
-    
-    # 시각화를 위한 차트 생성
-    import altair as alt
-    alt.data_transformers.enable('default', max_rows=None)
-    
-    # 1. 연도별 평균 이용시간 추이
-    time_chart = alt.Chart(summary_df).mark_line(point=True, strokeWidth=3).encode(
-        x=alt.X('year:O', title='연도'),
-        y=alt.Y('avg_time:Q', title='평균 이용시간 (분)'),
-        color=alt.value('#1f77b4'),
-        tooltip=['year:O', 'avg_time:Q']
-    ).properties(
-        title='연도별 평균 이용시간 추이',
-        width=400,
-        height=300
-    )
-    
-    # 2. 연도별 평균 이용거리 추이
-    distance_chart = alt.Chart(summary_df).mark_line(point=True, strokeWidth=3).encode(
-        x=alt.X('year:O', title='연도'),
-        y=alt.Y('avg_distance:Q', title='평균 이용거리 (m)'),
-        color=alt.value('#ff7f0e'),
-        tooltip=['year:O', 'avg_distance:Q']
-    ).properties(
-        title='연도별 평균 이용거리 추이',
-        width=400,
-        height=300
-    )
-    
-    # 3. 이중축 차트
-    base = alt.Chart(summary_df).encode(x=alt.X('year:O', title='연도'))
-    
-    bar_time = base.mark_bar(color='#5276A7', opacity=0.7).encode(
-        y=alt.Y('avg_time:Q', axis=alt.Axis(title='평균 이용시간 (분)', titleColor='#5276A7'))
-    )
-    
-    line_dist = base.mark_line(color='#F58518', point=True, strokeWidth=3).encode(
-        y=alt.Y('avg_distance:Q', axis=alt.Axis(title='평균 이용거리 (m)', titleColor='#F58518'))
-    )
-    
-    combined_chart = alt.layer(bar_time, line_dist).resolve_scale(
-        y='independent'
-    ).properties(
-        title='연도별 평균 이용시간(막대) 및 이용거리(선) 추이',
-        width=600,
-        height=400
-    )
-    
-    # 차트 출력
-    alt.hconcat(time_chart, distance_chart).display()
-    combined_chart.display()
-    
-else:
-    print("처리할 수 있는 데이터가 없습니다.")
\ No newline at end of file
+    # 데이터 처리 실행 (연도는 카탈로그에 기록된 distance_time_{year} 파일 기준)
+    refresh_catalog()
+    years = available_years('distance_time', default=YEARS_TO_PROCESS)
+    watermark = load_watermark(DATA_DIR)
+    summary_data = process_yearly_data(watermark, years, force=args.force)
+
+    if summary_data:
+        print("\n=== 연도별 요약 통계 ===")
+
+        # DataFrame으로 변환 (기본 통계만)
+        basic_stats = []
+        for stats in summary_data:
+            basic_stats.append({
+                'year': stats['year'],
+                'total_records': stats['total_records'],
+                'avg_time': round(stats['avg_time'], 2),
+                'avg_distance': round(stats['avg_distance'], 2),
+                'median_time': round(stats['median_time'], 2),
+                'median_distance': round(stats['median_distance'], 2),
+                'std_time': round(stats['std_time'], 2),
+                'std_distance': round(stats['std_distance'], 2)
+            })
+
+        summary_df = pd.DataFrame(basic_stats)
+
+        # 요약 데이터 저장
+        output_path = 'data/02/yearly_summary.parquet'
+        summary_df.to_parquet(output_path)
+        print(f"\n요약 데이터 저장 완료: {output_path}")
+
+        # 상세 정보도 JSON으로 저장
+        with open(DETAILED_SUMMARY_PATH, 'w', encoding='utf-8') as f:
+            json.dump(summary_data, f, ensure_ascii=False, indent=2)
+        print("상세 요약 데이터 저장 완료: data/02/yearly_detailed_summary.json")
+
+        # 요약을 저장한 뒤에 입력 파일 지문을 기록합니다. (다음 실행에서 바뀌지 않은 연도는 재사용)
+        save_watermark(DATA_DIR, watermark, section='sources')
+        # 대시보드가 메모리 맵으로 읽을 비압축 IPC 사본
+        export_marts_ipc([DATA_DIR])
+        refresh_catalog()
+
+        print("\n=== 상관관계 분석 (요약 데이터 기반) ===")
+
+        # 연도별 평균값들 간의 상관관계
+        time_distance_corr = summary_df['avg_time'].corr(summary_df['avg_distance'])
+        print(f"연도별 평균 이용시간-거리 상관관계: {time_distance_corr:.4f}")
+
+        # 시각화를 위한 차트 생성
+        import altair as alt
+        alt.data_transformers.enable('default', max_rows=None)
+
+        # 1. 연도별 평균 이용시간 추이
+        time_chart = alt.Chart(summary_df).mark_line(point=True, strokeWidth=3).encode(
+            x=alt.X('year:O', title='연도'),
+            y=alt.Y('avg_time:Q', title='평균 이용시간 (분)'),
+            color=alt.value('#1f77b4'),
+            tooltip=['year:O', 'avg_time:Q']
+        ).properties(
+            title='연도별 평균 이용시간 추이',
+            width=400,
+            height=300
+        )
+
+        # 2. 연도별 평균 이용거리 추이
+        distance_chart = alt.Chart(summary_df).mark_line(point=True, strokeWidth=3).encode(
+            x=alt.X('year:O', title='연도'),
+            y=alt.Y('avg_distance:Q', title='평균 이용거리 (m)'),
+            color=alt.value('#ff7f0e'),
+            tooltip=['year:O', 'avg_distance:Q']
+        ).properties(
+            title='연도별 평균 이용거리 추이',
+            width=400,
+            height=300
+        )
+
+        # 3. 이중축 차트
+        base = alt.Chart(summary_df).encode(x=alt.X('year:O', title='연도'))
+
+        bar_time = base.mark_bar(color='#5276A7', opacity=0.7).encode(
+            y=alt.Y('avg_time:Q', axis=alt.Axis(title='평균 이용시간 (분)', titleColor='#5276A7'))
+        )
+
+        line_dist = base.mark_line(color='#F58518', point=True, strokeWidth=3).encode(
+            y=alt.Y('avg_distance:Q', axis=alt.Axis(title='평균 이용거리 (m)', titleColor='#F58518'))
+        )
+
+        combined_chart = alt.layer(bar_time, line_dist).resolve_scale(
+            y='independent'
+        ).properties(
+            title='연도별 평균 이용시간(막대) 및 이용거리(선) 추이',
+            width=600,
+            height=400
+        )
+
+        # 차트 출력
+        alt.hconcat(time_chart, distance_chart).display()
+        combined_chart.display()
+
+    else:
+        print("처리할 수 있는 데이터가 없습니다.")
+
+
+if __name__ == '__main__':
+    main()
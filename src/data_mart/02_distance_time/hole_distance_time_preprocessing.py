@@ -1,23 +1,36 @@
-import pandas as pd
+import argparse
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import pathlib
 import logging
 
+from src.data_mart.mart_partials import (
+    forget_month, load_watermark, partial_path, partials_dir, plan_refresh, record_month, recorded_months,
+    save_watermark, source_fingerprint
+)
+from src.load_data.arrow_compute import weekday
+from src.load_data.catalog import available_years, refresh_catalog
+from src.load_data.distance_data_load import DISTANCE_DATA_DIR
+from src.load_data.mart_io import export_marts_ipc, ipc_path
+from src.load_data.raw_dataset import RAW_DATA_DIR
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# 경로 설정
-try:
-    BASE_DIR = pathlib.Path(__file__).resolve().parent.parent.parent
-except NameError:
-    # 대화형 환경 (예: Jupyter)에서 실행될 경우를 대비
-    BASE_DIR = pathlib.Path('.').resolve()
-
-DATA_DIR = BASE_DIR / "data"
-SOURCE_DIR = DATA_DIR / "parquet"
-TARGET_DIR = DATA_DIR / "02"
+# 경로 설정 (distnace_time_data_preprocessing, 대시보드와 같은 data/02 폴더와 워터마크를 씁니다)
+SOURCE_DIR = pathlib.Path(RAW_DATA_DIR)
+TARGET_DIR = pathlib.Path(DISTANCE_DATA_DIR)
 
 # 대상 디렉터리 생성 (이미 존재하면 무시)
-TARGET_DIR.mkdir(exist_ok=True)
+TARGET_DIR.mkdir(parents=True, exist_ok=True)
+
+# 처리할 연도 범위 (카탈로그가 비어 있을 때 사용)
+YEARS_TO_PROCESS = range(2020, 2026)
+
+# 월별 부분 파일 형식 (TARGET_DIR/partials/{YYYY-MM}.parquet, 정제된 행 그대로)
+PARTIAL_EXTENSION = "parquet"
 
 # 불러올 컬럼 정의
 COLUMNS_TO_LOAD = [
@@ -26,75 +39,148 @@ COLUMNS_TO_LOAD = [
     "전체_이용_거리",
 ]
 
-def process_and_clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    """데이터프레임에 정제 및 변환 로직을 적용합니다."""
-    
-    # 1. 주요 컬럼에 null 값이 있는 행 제거
-    df_processed = df.dropna(subset=["전체_이용_분", "전체_이용_거리"]).copy()
-
-    # 2. 이용 시간이 0 이하인 데이터 제거
-    initial_rows = len(df_processed)
-    df_processed = df_processed[df_processed["전체_이용_분"] > 0]
-    
-    rows_dropped = initial_rows - len(df_processed)
-    if rows_dropped > 0:
-        logging.info(f"{rows_dropped} rows with non-positive usage time removed.")
+# 저장할 컬럼 (부분 파일과 연도 파일이 같은 스키마를 씁니다)
+OUTPUT_SCHEMA = pa.schema([
+    ("전체_이용_분", pa.float32()),
+    ("전체_이용_거리", pa.float32()),
+    ("요일", pa.int8()),
+])
 
-    # 3. 기준_날짜를 datetime으로 변환하고 요일 컬럼 추가 후, 기준_날짜 제거
-    try:
-        df_processed['기준_날짜'] = pd.to_datetime(df_processed['기준_날짜'], format='%Y%m%d', errors='coerce')
-        df_processed.dropna(subset=['기준_날짜'], inplace=True)
-        
-        # 요일 컬럼 추가 (월요일=0, 일요일=6)
-        df_processed['요일'] = df_processed['기준_날짜'].dt.dayofweek
-        
-        # 원본 기준_날짜 컬럼 제거
-        df_processed.drop(columns=['기준_날짜'], inplace=True)
-
-        logging.info("Added '요일' column and removed '기준_날짜' column.")
-    except Exception as e:
-        logging.error(f"Error during date conversion: {e}")
-
-    return df_processed
-
-def process_year(year: int):
-    """단일 연도의 데이터를 처리합니다: 불러오기, 정제, 저장."""
-    logging.info(f"Processing data for {year}...")
-    year_source_dir = SOURCE_DIR / str(year)
-    
-    if not year_source_dir.exists():
-        logging.warning(f"Source directory for year {year} not found. Skipping.")
-        return
+# 한 번에 읽고 쓰는 배치(row group)의 행 수
+STREAM_BATCH_ROWS = 262_144
 
-    all_files = list(year_source_dir.glob("*.parquet"))
-    if not all_files:
-        logging.warning(f"No parquet files found for year {year}. Skipping.")
-        return
-    
+def clean_batch(batch: pa.RecordBatch) -> pa.Table:
+    """
+    원본 배치 하나에 정제 및 변환 로직을 적용합니다.
+    pandas 변환 없이 Arrow에서 필터링하며, 요일도 Arrow compute로 구합니다. (load_data.arrow_compute)
+    """
+    minutes, distance, dates = batch.column("전체_이용_분"), batch.column("전체_이용_거리"), batch.column("기준_날짜")
+
+    # 1. 주요 컬럼(이용 시간/거리/날짜)에 null 값이 있는 행, 이용 시간이 0 이하인 행 제거
+    keep = pc.and_(
+        pc.and_(pc.is_valid(minutes), pc.is_valid(distance)),
+        pc.and_(pc.is_valid(dates), pc.fill_null(pc.greater(minutes, 0), False))
+    )
+    filtered = batch.filter(keep)
+
+    # 2. 요일 컬럼 추가 (월요일=0, 일요일=6)
+    weekdays = weekday(filtered.column("기준_날짜"))
+
+    # 3. 원본 기준_날짜 컬럼 제거
+    return pa.Table.from_arrays(
+        [filtered.column("전체_이용_분"), filtered.column("전체_이용_거리"), weekdays],
+        schema=OUTPUT_SCHEMA
+    )
+
+def _write_stream(output_path, tables) -> int:
+    """
+    테이블 조각을 도착하는 대로 row group으로 이어 씁니다. 임시 파일에 쓴 뒤 교체하며, 기록한 행 수를 반환합니다.
+    메모리에는 한 번에 조각 하나만 올라가므로 최대 메모리는 파일 크기와 관계없이 일정합니다.
+    """
+    temp_path = f"{output_path}.tmp"
+    rows = 0
     try:
-        df = pd.concat(
-            (pd.read_parquet(f, columns=COLUMNS_TO_LOAD) for f in all_files),
-            ignore_index=True
-        )
-        logging.info(f"Loaded {len(df)} rows for {year}.")
-    except ValueError as e:
-        logging.error(f"Could not read parquet files for year {year}. Error: {e}")
-        return
+        with pq.ParquetWriter(temp_path, OUTPUT_SCHEMA) as writer:
+            for table in tables:
+                if table.num_rows:
+                    writer.write_table(table.cast(OUTPUT_SCHEMA))
+                    rows += table.num_rows
+        os.replace(temp_path, output_path)
+    finally:
+        # 실패하면 쓰다 만 임시 파일을 지웁니다. (기존 파일은 그대로 남습니다)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return rows
 
-    # 데이터 정제 및 변환
-    df_processed = process_and_clean_data(df)
-    logging.info(f"Processed and cleaned data for {year}, resulting in {len(df_processed)} rows.")
-    
-    # 정제된 데이터 저장
+def process_month(year: int, month: int, file_path) -> None:
+    """원본 월 파일 하나를 배치 단위로 정제하여 월별 부분 파일(partials/{YYYY-MM}.parquet)로 저장합니다."""
+    source_file = pq.ParquetFile(file_path)
+    batches = source_file.iter_batches(batch_size=STREAM_BATCH_ROWS, columns=COLUMNS_TO_LOAD)
+    rows = _write_stream(partial_path(TARGET_DIR, year, month, PARTIAL_EXTENSION), (clean_batch(batch) for batch in batches))
+
+    rows_dropped = source_file.metadata.num_rows - rows
+    if rows_dropped > 0:
+        logging.info(f"{rows_dropped} rows with missing values or non-positive usage time removed.")
+    logging.info(f"Saved partial for {year}-{month:02d} ({rows} rows).")
+
+def refresh_partials(years, force: bool = False):
+    """
+    워터마크와 비교해 새로 생기거나 바뀐 원본 월만 다시 정제하고, 원본이 사라진 월의 부분 파일은 지웁니다.
+    정제에 실패한 월이 있는 연도는 이전 부분 파일이 섞이지 않도록 다시 만들 연도에서 뺍니다.
+    (실패한 월은 워터마크가 갱신되지 않으므로 다음 실행에서 다시 정제합니다)
+    Returns:
+        (갱신된 워터마크, 다시 만들어야 할 연도 집합)
+    """
+    watermark = load_watermark(TARGET_DIR)
+    changed, removed = plan_refresh(watermark, list(years), force=force, base_dir=SOURCE_DIR)
+    pathlib.Path(partials_dir(TARGET_DIR)).mkdir(exist_ok=True)
+
+    for year, month in removed:
+        logging.info(f"Source for {year}-{month:02d} is gone. Removing its partial.")
+        forget_month(TARGET_DIR, watermark, year, month, PARTIAL_EXTENSION)
+
+    affected_years = {year for year, _ in removed}
+    failed_years = set()
+    for year, month, file_path in changed:
+        try:
+            fingerprint = source_fingerprint(file_path)
+            process_month(year, month, file_path)
+        except Exception as e:
+            logging.error(f"Could not process {file_path}. Error: {e}")
+            failed_years.add(year)
+            continue
+        record_month(watermark, year, month, fingerprint)
+        save_watermark(TARGET_DIR, watermark, section='months')
+        affected_years.add(year)
+
+    save_watermark(TARGET_DIR, watermark, section='months')
+    for year in sorted(failed_years):
+        logging.warning(f"Some months of {year} failed. Keeping the existing distance_time_{year}.parquet until the next run.")
+    return watermark, affected_years - failed_years
+
+def process_year(year: int, watermark) -> None:
+    """단일 연도의 월별 부분 파일을 배치 단위로 이어 써서 distance_time_{year}.parquet로 저장합니다."""
+    logging.info(f"Merging partials for {year}...")
+    months = recorded_months(watermark, year)
     output_path = TARGET_DIR / f"distance_time_{year}.parquet"
-    df_processed.to_parquet(output_path, index=False)
-    logging.info(f"Successfully saved processed data for {year} to {output_path}")
+    if not months:
+        logging.warning(f"No partials found for year {year}. Skipping.")
+        for file_path in (output_path, pathlib.Path(ipc_path(str(output_path)))):
+            if file_path.exists():
+                file_path.unlink()
+        return
+
+    def partial_tables():
+        for _, month in months:
+            partial_file = pq.ParquetFile(partial_path(TARGET_DIR, year, month, PARTIAL_EXTENSION))
+            for batch in partial_file.iter_batches(batch_size=STREAM_BATCH_ROWS):
+                yield pa.Table.from_batches([batch])
+
+    rows = _write_stream(output_path, partial_tables())
+    logging.info(f"Successfully saved processed data for {year} to {output_path} ({rows} rows)")
 
 def main():
-    """2020년부터 2025년까지 모든 연도의 데이터에 대한 ETL 프로세스를 실행합니다."""
+    """
+    카탈로그에 기록된 원본 연도의 ETL 프로세스를 증분 실행합니다.
+    새로 생기거나 바뀐 원본 월만 정제하고, 그 월이 속한 연도의 파일만 다시 만듭니다.
+    """
+    parser = argparse.ArgumentParser(description="원본 Parquet에서 이용 시간/거리 마트를 생성합니다.")
+    parser.add_argument('--force', action='store_true', help="워터마크와 관계없이 모든 월을 다시 정제")
+    args = parser.parse_args()
+
     logging.info("Starting ETL process for time and distance data...")
-    for year in range(2020, 2026):
-        process_year(year)
+    refresh_catalog()
+    years = available_years(default=YEARS_TO_PROCESS)
+    watermark, affected_years = refresh_partials(years, force=args.force)
+    if not affected_years:
+        logging.info("No years to rebuild. Existing outputs are kept.")
+    for year in sorted(affected_years):
+        process_year(year, watermark)
+
+    # 대시보드가 메모리 맵으로 읽을 비압축 IPC 사본
+    export_marts_ipc([DISTANCE_DATA_DIR])
+    # 대시보드의 연도 선택이 새 distance_time_{year} 파일을 바로 반영하도록 카탈로그를 갱신합니다.
+    refresh_catalog()
     logging.info("ETL process finished.")
 
 if __name__ == "__main__":
@@ -1,15 +1,34 @@
+import argparse
 import pandas as pd
 import numpy as np
 import os
-from collections import defaultdict
-
+import pyarrow as pa
+
+from src.data_mart.mart_partials import (
+    forget_month, load_watermark, partial_path, partials_dir, plan_refresh, record_month, recorded_months,
+    save_watermark, source_fingerprint
+)
+from src.load_data.arrow_compute import combine_group_sums, group_sum
+from src.load_data.catalog import available_years, refresh_catalog
+from src.load_data.mart_io import export_marts_ipc
 from src.load_data.data_load import load_parquet_year_data, load_station_data
+from src.load_data.station_day_index import STATION_DAY_DIR, save_station_day_index
+from src.load_data.station_dictionary import FIRST_STATION_CODE, load_station_dictionary
 
 BASE_DIR = '.'
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 OUTPUT_DIR = os.path.join(DATA_DIR, '03')
 MASTER_FILE_PATH = os.path.join(DATA_DIR, 'bcycle_master_location.csv')
+# 처리할 연도 범위 (카탈로그가 비어 있을 때 사용)
 YEARS_TO_PROCESS = range(2020, 2026)
+# 청크별 경로 집계를 몇 개마다 합칠지 (메모리 사용량 제한)
+ROUTE_COMBINE_INTERVAL = 20
+# 백그라운드에서 미리 읽어 둘 청크 수
+PREFETCH_BATCHES = 4
+# 월별 부분 집계 파일 형식 (OUTPUT_DIR/partials/{YYYY-MM}.npz)
+#   버전 2: 대여소 × 일 대여/반납 행렬 포함. 버전이 다른 부분 집계는 모두 다시 만듭니다.
+PARTIAL_EXTENSION = 'npz'
+PARTIAL_VERSION = 2
 
 
 def load_and_preprocess_master_data():
@@ -37,76 +56,244 @@ def load_and_preprocess_master_data():
         return None
 
 
-def process_raw_data():
+def _add_station_counts(totals, codes, counts):
+    """대여소 코드별 건수를 누적 배열에 더합니다. (코드가 배열 크기를 넘으면 배열을 늘립니다)"""
+    if len(codes) == 0:
+        return totals
+    chunk_totals = np.bincount(codes, weights=counts, minlength=len(totals)).astype(np.int64)
+    chunk_totals[:len(totals)] += totals
+    return chunk_totals
+
+
+def _add_station_day_counts(matrix, days, codes, counts):
+    """(일 × 대여소 코드) 행렬에 건수를 더합니다. (코드가 열 수를 넘으면 행렬을 늘립니다)"""
+    if len(codes) == 0:
+        return matrix
+    num_days, width = matrix.shape[0], max(matrix.shape[1], int(codes.max()) + 1)
+    chunk_matrix = np.bincount(days * width + codes, weights=counts, minlength=num_days * width)
+    chunk_matrix = chunk_matrix.reshape(num_days, width).astype(np.int64)
+    chunk_matrix[:, :matrix.shape[1]] += matrix
+    return chunk_matrix
+
+
+def _month_days(year, month):
+    """그 달 첫날의 epoch 일 수와 그 달의 일 수"""
+    first_month = np.datetime64(f'{year}-{month:02d}', 'M')
+    first_day = first_month.astype('datetime64[D]')
+    next_first_day = (first_month + np.timedelta64(1, 'M')).astype('datetime64[D]')
+    return int(first_day.astype(np.int64)), int((next_first_day - first_day).astype(np.int64))
+
+
+def _combine_routes(route_parts):
+    """청크별 경로 집계(Series: 경로 키 → 건수)를 하나로 합칩니다."""
+    return pd.concat(route_parts).groupby(level=0).sum()
+
+
+def aggregate_month(year, month, num_codes):
     """
-    스트리밍 방식으로 연도별 parquet 데이터를 집계.
-    - 대여소별 총 대여/반납 건수
-    - 경로별 이용 건수
+    원본 월 파일 하나를 집계합니다.
+    대여소_ID는 대여소 사전의 int32 코드이므로 문자열 정리 없이 정수 연산으로 집계합니다.
+
+    Returns:
+        (rentals, returns, routes, rentals_daily, returns_daily)
+        rentals/returns: 대여소 코드별 대여/반납 건수 (int64 배열)
+        routes: 경로 키(시작 코드 << 32 | 종료 코드) → 이용 건수 Series
+        rentals_daily/returns_daily: (그 달의 일 × 대여소 코드) 대여/반납 건수 행렬
     """
-    required_columns = ['시작_대여소_ID', '종료_대여소_ID', '전체_건수']
+    required_columns = ['기준_날짜', '시작_대여소_ID', '종료_대여소_ID', '전체_건수']
+    # pandas 변환 없이 Arrow 배치를 받아 numpy 배열로 바로 집계합니다.
+    # 다음 청크는 백그라운드에서 미리 읽어 두어 집계와 I/O가 겹치게 합니다.
     data_generator = load_parquet_year_data(
-        selected_years=list(YEARS_TO_PROCESS), columns=required_columns
+        selected_years=[year], months=[month], columns=required_columns, output='arrow',
+        prefetch=PREFETCH_BATCHES
     )
 
-    rentals = defaultdict(int)
-    returns = defaultdict(int)
-    routes = defaultdict(int)
-
-    print("스트리밍 방식으로 원본 데이터 처리를 시작합니다...")
-    chunk_count = 0
-    for chunk_df in data_generator:
-        chunk_count += 1
-        if chunk_count % 50 == 0:
-            print(f"  - {chunk_count}개 데이터 청크 처리 중...")
-
-        chunk_df = chunk_df.loc[:, required_columns].copy()
-        chunk_df.dropna(subset=['시작_대여소_ID'], inplace=True)
-        chunk_df['시작_대여소_ID'] = chunk_df['시작_대여소_ID'].astype(str).str.strip()
-        chunk_df = chunk_df[chunk_df['시작_대여소_ID'].str.lower() != 'center']
-
-        # 대여소별 대여 집계
-        grp_rent = chunk_df.groupby('시작_대여소_ID')['전체_건수'].sum()
-        for sid, cnt in grp_rent.items():
-            rentals[sid] += int(cnt)
-
-        # 반납/경로 집계
-        valid_returns = chunk_df[
-            chunk_df['종료_대여소_ID'].notnull() & (chunk_df['종료_대여소_ID'] != 'X')
-        ].copy()
-        if not valid_returns.empty:
-            valid_returns['종료_대여소_ID'] = valid_returns['종료_대여소_ID'].astype(str).str.strip()
-            valid_returns = valid_returns[valid_returns['종료_대여소_ID'].str.lower() != 'center']
-
-            grp_ret = valid_returns.groupby('종료_대여소_ID')['전체_건수'].sum()
-            for eid, cnt in grp_ret.items():
-                returns[eid] += int(cnt)
-
-            grp_route = valid_returns.groupby(['시작_대여소_ID', '종료_대여소_ID'])['전체_건수'].sum()
-            for (sid, eid), cnt in grp_route.items():
-                routes[(sid, eid)] += int(cnt)
-
-    print(f"\n✅ 총 {chunk_count:,}개의 청크 처리 완료. 최종 데이터 집계를 시작합니다.")
-
-    if not rentals:
-        print("🚨 처리된 데이터가 없습니다.")
-        return None, None
+    first_day, num_days = _month_days(year, month)
+    rentals = np.zeros(num_codes, dtype=np.int64)
+    returns = np.zeros(num_codes, dtype=np.int64)
+    rentals_daily = np.zeros((num_days, num_codes), dtype=np.int64)
+    returns_daily = np.zeros((num_days, num_codes), dtype=np.int64)
+    route_parts = []
+
+    for chunk in data_generator:
+        days = chunk['기준_날짜'].cast(pa.int32()).to_numpy(zero_copy_only=False).astype(np.int64) - first_day
+        start_codes = chunk['시작_대여소_ID'].to_numpy(zero_copy_only=False).astype(np.int64)
+        end_codes = chunk['종료_대여소_ID'].to_numpy(zero_copy_only=False).astype(np.int64)
+        counts = chunk['전체_건수'].to_numpy(zero_copy_only=False).astype(np.int64)
+
+        # 'X'/결측(STATION_CODE_NONE), 'center'(STATION_CODE_CENTER)는 실제 대여소가 아니므로 제외
+        valid_start = start_codes >= FIRST_STATION_CODE
+        valid_route = valid_start & (end_codes >= FIRST_STATION_CODE)
+
+        # 대여소별 대여/반납 집계
+        rentals = _add_station_counts(rentals, start_codes[valid_start], counts[valid_start])
+        returns = _add_station_counts(returns, end_codes[valid_route], counts[valid_route])
+
+        # 대여소 × 일 집계 (그 달 밖의 날짜는 제외)
+        in_month = (days >= 0) & (days < num_days)
+        daily_start, daily_route = valid_start & in_month, valid_route & in_month
+        rentals_daily = _add_station_day_counts(
+            rentals_daily, days[daily_start], start_codes[daily_start], counts[daily_start]
+        )
+        returns_daily = _add_station_day_counts(
+            returns_daily, days[daily_route], end_codes[daily_route], counts[daily_route]
+        )
+
+        # 경로 집계: (시작, 종료) 코드 쌍을 int64 키 하나로 묶어 Arrow group by로 합칩니다.
+        route_keys = (start_codes[valid_route] << 32) | end_codes[valid_route]
+        route_table = pa.table({'route_key': route_keys, '이용_건수': counts[valid_route]})
+        route_parts.append(group_sum(route_table, ['route_key'], '이용_건수'))
+        if len(route_parts) >= ROUTE_COMBINE_INTERVAL:
+            route_parts = [combine_group_sums(route_parts, ['route_key'], '이용_건수')]
+
+    routes = combine_group_sums(route_parts, ['route_key'], '이용_건수')
+    if routes is None:
+        routes = pd.Series(dtype=np.int64)
+    else:
+        routes = pd.Series(routes['이용_건수'].to_numpy(), index=routes['route_key'].to_numpy())
+    return rentals, returns, routes, rentals_daily, returns_daily
 
-    # 결과 DataFrame 생성
-    final_rentals = pd.DataFrame(list(rentals.items()), columns=['대여소_ID', '총_대여건수'])
-    final_returns = pd.DataFrame(list(returns.items()), columns=['대여소_ID', '총_반납건수'])
-    final_routes = pd.DataFrame(
-        [{'시작_대여소_ID': s, '종료_대여소_ID': e, '이용_건수': cnt} for (s, e), cnt in routes.items()]
+
+def save_month_partial(year, month, rentals, returns, routes, rentals_daily, returns_daily):
+    """월별 부분 집계를 OUTPUT_DIR/partials/{YYYY-MM}.npz로 저장합니다. (일별 행렬은 int32)"""
+    np.savez(
+        partial_path(OUTPUT_DIR, year, month, PARTIAL_EXTENSION),
+        rentals=rentals, returns=returns,
+        route_keys=routes.index.to_numpy(dtype=np.int64), route_counts=routes.to_numpy(dtype=np.int64),
+        rentals_daily=rentals_daily.astype(np.int32), returns_daily=returns_daily.astype(np.int32),
     )
 
-    final_rentals['총_대여건수'] = final_rentals['총_대여건수'].astype('int64')
-    if not final_returns.empty:
-        final_returns['총_반납건수'] = final_returns['총_반납건수'].astype('int64')
-    if not final_routes.empty:
-        final_routes['이용_건수'] = final_routes['이용_건수'].astype('int64')
+
+def refresh_month_partials(years=YEARS_TO_PROCESS, force=False):
+    """
+    워터마크와 비교해 새로 생기거나 바뀐 원본 월만 다시 집계하고, 원본이 사라진 월의 부분 집계는 지웁니다.
+    집계에 실패한 월은 건너뛰고 워터마크를 갱신하지 않으므로 다음 실행에서 다시 집계합니다.
+    Returns:
+        (갱신된 워터마크, 집계에 실패한 연도 집합)
+    """
+    watermark = load_watermark(OUTPUT_DIR, version=PARTIAL_VERSION)
+    changed, removed = plan_refresh(watermark, list(years), force=force)
+
+    for year, month in removed:
+        print(f"  🗑️ 원본이 사라진 {year}년 {month}월 부분 집계를 삭제합니다.")
+        forget_month(OUTPUT_DIR, watermark, year, month, PARTIAL_EXTENSION)
+    if not changed:
+        print("⏩ 새로 생기거나 바뀐 원본 월이 없습니다. 저장된 부분 집계를 그대로 사용합니다.")
+        save_watermark(OUTPUT_DIR, watermark)
+        return watermark, set()
+
+    station_dictionary = load_station_dictionary()
+    os.makedirs(partials_dir(OUTPUT_DIR), exist_ok=True)
+    print(f"새로 생기거나 바뀐 {len(changed)}개 월 파일을 스트리밍 방식으로 처리합니다...")
+    failed_years = set()
+    for done, (year, month, file_path) in enumerate(changed, start=1):
+        try:
+            fingerprint = source_fingerprint(file_path)
+            save_month_partial(year, month, *aggregate_month(year, month, station_dictionary.max_code + 1))
+        except Exception as e:
+            print(f"  ❌ [{done}/{len(changed)}] {year}년 {month}월 실패 - {type(e).__name__}: {e}. 이 파일은 건너뜁니다.")
+            failed_years.add(year)
+            continue
+        record_month(watermark, year, month, fingerprint)
+        save_watermark(OUTPUT_DIR, watermark)
+        print(f"  - [{done}/{len(changed)}] {year}년 {month}월 집계 완료")
+    save_watermark(OUTPUT_DIR, watermark)
+    return watermark, failed_years
+
+
+def _pad(counts, size):
+    """대여소 코드별 배열을 size 길이로 늘립니다. (월마다 등장한 최대 코드가 다를 수 있습니다)"""
+    return np.pad(counts, (0, size - len(counts)))
+
+
+def process_raw_data(years=YEARS_TO_PROCESS, force=False):
+    """
+    월별 부분 집계를 증분 갱신한 뒤 모두 합쳐 연도 전체를 집계.
+    - 대여소별 총 대여/반납 건수
+    - 경로별 이용 건수
+    요약은 모든 연도를 합친 값이므로, 집계에 실패한 월이 있으면 이전 부분 집계가 섞이지 않도록
+    요약을 다시 만들지 않고 (None, None)을 반환합니다. (다음 실행에서 재시도)
+    """
+    watermark, failed_years = refresh_month_partials(years, force=force)
+    if failed_years:
+        print(f"⚠️ {sorted(failed_years)}년에 집계에 실패한 월이 있어 요약 마트를 다시 기록하지 않습니다. (다음 실행에서 재시도)")
+        return None, None
+    months = recorded_months(watermark)
+    station_dictionary = load_station_dictionary()
+
+    rentals = np.zeros(station_dictionary.max_code + 1, dtype=np.int64)
+    returns = np.zeros(station_dictionary.max_code + 1, dtype=np.int64)
+    route_parts = []
+    for year, month in months:
+        with np.load(partial_path(OUTPUT_DIR, year, month, PARTIAL_EXTENSION)) as partial:
+            size = max(len(rentals), len(partial['rentals']), len(partial['returns']))
+            rentals = _pad(rentals, size) + _pad(partial['rentals'], size)
+            returns = _pad(returns, size) + _pad(partial['returns'], size)
+            route_parts.append(pd.Series(partial['route_counts'], index=partial['route_keys']))
+        if len(route_parts) >= ROUTE_COMBINE_INTERVAL:
+            route_parts = [_combine_routes(route_parts)]
+
+    print(f"\n✅ 총 {len(months):,}개 월의 부분 집계를 합쳤습니다. 최종 데이터 집계를 시작합니다.")
+
+    if not rentals.any():
+        print("🚨 처리된 데이터가 없습니다.")
+        return None, None
+
+    # 결과 DataFrame 생성 (코드를 원래의 대여소_ID로 되돌립니다)
+    rental_codes = np.flatnonzero(rentals)
+    return_codes = np.flatnonzero(returns)
+    final_rentals = pd.DataFrame({
+        '대여소_ID': station_dictionary.decode(rental_codes),
+        '총_대여건수': rentals[rental_codes],
+    })
+    final_returns = pd.DataFrame({
+        '대여소_ID': station_dictionary.decode(return_codes),
+        '총_반납건수': returns[return_codes],
+    })
+
+    routes = _combine_routes(route_parts)
+    route_keys = routes.index.to_numpy(dtype=np.int64)
+    final_routes = pd.DataFrame({
+        '시작_대여소_ID': station_dictionary.decode(route_keys >> 32),
+        '종료_대여소_ID': station_dictionary.decode(route_keys & 0xFFFFFFFF),
+        '이용_건수': routes.to_numpy(dtype=np.int64),
+    })
 
     return (final_rentals, final_returns), final_routes
 
 
+def create_station_day_index():
+    """
+    월별 부분 집계의 대여소 × 일 행렬을 이어 붙여 기간별 순위용 누적합 행렬을 만듭니다.
+    첫 연도 1월 1일부터 마지막 연도 말까지의 연속된 일 축을 쓰며, 부분 집계가 없는 달은 0으로 채웁니다.
+    """
+    watermark = load_watermark(OUTPUT_DIR, version=PARTIAL_VERSION)
+    months = recorded_months(watermark)
+    if not months:
+        print("🚨 대여소 × 일 행렬을 만들 부분 집계가 없습니다.")
+        return
+
+    start = np.datetime64(f'{months[0][0]}-01-01', 'D')
+    num_days = int((np.datetime64(f'{months[-1][0] + 1}-01-01', 'D') - start).astype(np.int64))
+    num_codes = load_station_dictionary().max_code + 1
+    for year, month in months:
+        with np.load(partial_path(OUTPUT_DIR, year, month, PARTIAL_EXTENSION)) as partial:
+            num_codes = max(num_codes, partial['rentals_daily'].shape[1], partial['returns_daily'].shape[1])
+    rentals_daily = np.zeros((num_days, num_codes), dtype=np.int32)
+    returns_daily = np.zeros((num_days, num_codes), dtype=np.int32)
+
+    for year, month in months:
+        first_day, _ = _month_days(year, month)
+        offset = first_day - int(start.astype(np.int64))
+        with np.load(partial_path(OUTPUT_DIR, year, month, PARTIAL_EXTENSION)) as partial:
+            for daily, month_daily in ((rentals_daily, partial['rentals_daily']), (returns_daily, partial['returns_daily'])):
+                daily[offset:offset + len(month_daily), :month_daily.shape[1]] = month_daily
+
+    save_station_day_index(start, rentals_daily, returns_daily)
+    size_mb = rentals_daily.nbytes * 2 / 1024 ** 2
+    print(f"✅ 대여소 × 일 누적합 행렬 생성 완료: {num_days:,}일 × {num_codes:,}개 코드 (~{size_mb:.0f}MB, {STATION_DAY_DIR})")
+
+
 def create_station_summary(station_data, master_df):
     """대여소별 이용 현황 요약 생성 (대여소명은 제외)"""
     final_rentals, final_returns = station_data
@@ -178,14 +365,24 @@ def create_route_summary(route_data, master_df):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="원본 Parquet에서 대여소/경로 요약 마트를 생성합니다.")
+    parser.add_argument('--force', action='store_true', help="워터마크와 관계없이 모든 월을 다시 집계")
+    args = parser.parse_args()
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     master_df = load_and_preprocess_master_data()
 
     if master_df is not None:
-        station_data, route_data = process_raw_data()
+        # 처리할 연도는 카탈로그에 기록된 원본 연도를 사용합니다.
+        refresh_catalog()
+        station_data, route_data = process_raw_data(available_years(default=YEARS_TO_PROCESS), force=args.force)
 
         if station_data and route_data is not None:
             create_station_summary(station_data, master_df)
             create_route_summary(route_data, master_df)
+            create_station_day_index()
+            # 대시보드가 메모리 맵으로 읽을 비압축 IPC 사본
+            export_marts_ipc([OUTPUT_DIR])
+            refresh_catalog()
             print("\n🎉 모든 데이터 처리 파이프라인이 성공적으로 완료되었습니다.")
\ No newline at end of file
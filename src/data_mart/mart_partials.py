@@ -0,0 +1,143 @@
+import json
+import os
+
+from src.load_data.catalog import dataset_name_and_period
+from src.load_data.raw_dataset import RAW_DATA_DIR, list_raw_files
+from src.translate_data.ingest_manifest import file_sha256, manifest_key
+
+# 데이터 마트의 월별 부분 집계와 워터마크(어떤 원본 파일로 만들었는지)의 저장 위치
+#   {마트 폴더}/partials/{YYYY-MM}.{확장자}
+#   {마트 폴더}/partials/watermark.json
+# 마트를 갱신할 때는 새로 생기거나 바뀐 원본 월만 다시 집계하고, 나머지는 저장된 부분 집계를 그대로 씁니다.
+PARTIALS_DIRNAME = 'partials'
+WATERMARK_FILENAME = 'watermark.json'
+
+
+def partials_dir(mart_dir):
+    return os.path.join(mart_dir, PARTIALS_DIRNAME)
+
+
+def month_key(year, month):
+    return f'{year}-{month:02d}'
+
+
+def partial_path(mart_dir, year, month, extension):
+    """월별 부분 집계 파일 경로 (예: data/01/partials/2023-04.npz)"""
+    return os.path.join(partials_dir(mart_dir), f'{month_key(year, month)}.{extension}')
+
+
+def load_watermark(mart_dir, version=None):
+    """
+    워터마크를 불러옵니다. 파일이 없거나 부분 집계 형식(version)이 다르면 빈 워터마크를 반환하여
+    모든 월을 다시 집계하게 합니다.
+
+    구조:
+        version: 부분 집계 형식
+        months: {YYYY-MM: {source, size, mtime, hash}}  - 부분 집계에 포함된 원본 파일과 그 지문
+        sources: {이름: {source, size, mtime, hash}}    - 월 단위가 아닌 입력 (예: 연도별 중간 파일)
+    """
+    path = os.path.join(partials_dir(mart_dir), WATERMARK_FILENAME)
+    empty = {'version': version, 'months': {}, 'sources': {}}
+    if not os.path.exists(path):
+        return empty
+    with open(path, 'r', encoding='utf-8') as f:
+        watermark = json.load(f)
+    if watermark.get('version') != version:
+        return empty
+    watermark.setdefault('months', {})
+    watermark.setdefault('sources', {})
+    return watermark
+
+
+def save_watermark(mart_dir, watermark, section=None):
+    """
+    워터마크를 임시 파일에 쓴 뒤 교체하여 저장합니다.
+    section('months' 또는 'sources')을 주면 저장된 파일을 다시 읽어 그 항목만 바꿉니다.
+    한 마트 폴더의 워터마크를 여러 스크립트가 나누어 쓸 때(data/02) 서로의 기록을 덮어쓰지 않게 합니다.
+    """
+    os.makedirs(partials_dir(mart_dir), exist_ok=True)
+    path = os.path.join(partials_dir(mart_dir), WATERMARK_FILENAME)
+    if section is not None:
+        stored = load_watermark(mart_dir, version=watermark.get('version'))
+        stored[section] = watermark[section]
+        watermark = stored
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(watermark, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def source_fingerprint(path):
+    """입력 파일의 경로, 크기, 수정 시각, SHA-256 해시"""
+    stat = os.stat(path)
+    return {'source': manifest_key(path), 'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': file_sha256(path)}
+
+
+def is_source_current(entry, path):
+    """
+    입력 파일이 워터마크 기록(entry) 이후 바뀌지 않았는지 확인합니다.
+    크기와 수정 시각이 같으면 해시 없이 판단하고, 수정 시각만 다르면 내용 해시로 비교합니다.
+    """
+    if entry is None or entry.get('source') != manifest_key(path) or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime == entry['mtime']:
+        return True
+    if file_sha256(path) != entry['hash']:
+        return False
+    entry['mtime'] = stat.st_mtime
+    return True
+
+
+def source_months(years=None, base_dir=RAW_DATA_DIR):
+    """원본 월 파일 목록 [(연도, 월, 경로), ...]"""
+    months = []
+    for file_path in list_raw_files(years=years, base_dir=base_dir):
+        _, year, month = dataset_name_and_period(file_path)
+        months.append((year, month, file_path))
+    return months
+
+
+def plan_refresh(watermark, years=None, force=False, base_dir=RAW_DATA_DIR):
+    """
+    다시 집계해야 할 원본 월과 사라진 월을 찾습니다.
+    years는 보통 카탈로그의 원본 연도이므로, 원본이 모두 사라진 연도는 years에서도 빠집니다.
+    이런 연도도 워터마크에 기록이 남아 있으면 사라진 월로 찾아냅니다.
+
+    Returns:
+        (changed, removed)
+        changed: 새로 생기거나 바뀐 [(연도, 월, 경로), ...]
+        removed: 원본이 사라져 부분 집계를 지워야 할 [(연도, 월), ...]
+    """
+    recorded_years = {year for year, _ in recorded_months(watermark)}
+    sources = source_months(None if years is None else sorted(set(years) | recorded_years), base_dir)
+    changed = [
+        (year, month, path) for year, month, path in sources
+        if (years is None or year in years)
+        and (force or not is_source_current(watermark['months'].get(month_key(year, month)), path))
+    ]
+
+    current_keys = {month_key(year, month) for year, month, _ in sources}
+    removed = [(year, month) for year, month in recorded_months(watermark) if month_key(year, month) not in current_keys]
+    return changed, removed
+
+
+def record_month(watermark, year, month, fingerprint):
+    """부분 집계를 저장한 월의 원본 지문을 워터마크에 기록합니다."""
+    watermark['months'][month_key(year, month)] = fingerprint
+
+
+def forget_month(mart_dir, watermark, year, month, extension):
+    """원본이 사라진 월의 부분 집계 파일과 워터마크 기록을 지웁니다."""
+    watermark['months'].pop(month_key(year, month), None)
+    path = partial_path(mart_dir, year, month, extension)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def recorded_months(watermark, year=None):
+    """워터마크에 기록된 (연도, 월) 목록"""
+    months = sorted(tuple(int(part) for part in key.split('-')) for key in watermark['months'])
+    return [(y, m) for y, m in months if year is None or y == year]
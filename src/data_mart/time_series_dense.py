@@ -0,0 +1,160 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.data_mart.mart_partials import source_fingerprint
+from src.load_data.data_load import load_parquet_year_data
+from src.load_data.summary_data_load import ROLLUP_LEVELS
+
+# 시간대별 이용 마트(data/01)를 만드는 (연중 일자 × 5분 슬롯) 밀집 배열 집계
+# data_mart 하위 폴더의 스크립트는 import할 수 없으므로, 워커 프로세스가 실행할 함수는 이 모듈에 둡니다.
+# 원본의 기준_시간대(HHMM, 5분 단위) 그대로 한 번만 집계하고, 시간별 요약과 롤업 큐브는 이 배열을 합쳐 만듭니다.
+
+# 집계에 필요한 최소한의 컬럼
+REQUIRED_COLUMNS = ['기준_날짜', '기준_시간대', '전체_건수']
+
+# 청크 하나를 처리할 때 사용할 메모리 예산(MB). 청크 크기는 이 값에 맞춰 자동으로 정해집니다.
+MEMORY_BUDGET_MB = 256
+
+HOURS_PER_DAY = 24
+SLOT_MINUTES = 5
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+SLOTS_PER_DAY = HOURS_PER_DAY * SLOTS_PER_HOUR
+MINUTES_PER_DAY = 24 * 60
+
+
+def year_day_range(year):
+    """연도 첫날의 epoch 일 수(1970-01-01 기준)와 그 해의 일 수"""
+    first_day = np.datetime64(f'{year}-01-01', 'D')
+    next_first_day = np.datetime64(f'{year + 1}-01-01', 'D')
+    return int(first_day.astype(np.int64)), int((next_first_day - first_day).astype(np.int64))
+
+
+def accumulate_batch(batch, first_day, num_days, rentals, observed):
+    """
+    배치 하나를 (연중 일자 × 5분 슬롯) 배열에 더합니다.
+    기준_날짜(date32)는 epoch 일 수 정수로, 기준_시간대(HHMM)는 시와 분으로 나누어 슬롯 번호를 구하며
+    날짜 파싱이나 Python 반복 없이 np.bincount로 누적합니다.
+    """
+    days = batch.column('기준_날짜').cast(pa.int32()).to_numpy(zero_copy_only=False).astype(np.int64) - first_day
+    time_slots = batch.column('기준_시간대').to_numpy(zero_copy_only=False).astype(np.int64)
+    hours, minutes = time_slots // 100, time_slots % 100
+    counts = batch.column('전체_건수').to_numpy(zero_copy_only=False)
+
+    # 해당 연도 밖의 날짜나 잘못된 시간대는 제외합니다.
+    valid = (days >= 0) & (days < num_days) & (hours >= 0) & (hours < HOURS_PER_DAY) & (minutes < 60)
+    slots = hours[valid] * SLOTS_PER_HOUR + minutes[valid] // SLOT_MINUTES
+    cells = days[valid] * SLOTS_PER_DAY + slots
+    size = num_days * SLOTS_PER_DAY
+    rentals += np.bincount(cells, weights=counts[valid], minlength=size).astype(np.int64)
+    observed += np.bincount(cells, minlength=size)
+
+
+def to_hourly(slot_values):
+    """(연중 일자 × 5분 슬롯) 배열을 (연중 일자 × 시) 배열로 합칩니다."""
+    return slot_values.reshape(-1, SLOTS_PER_HOUR).sum(axis=1)
+
+
+def dense_to_frames(year, first_day, rentals, observed):
+    """
+    (연중 일자 × 5분 슬롯) 배열을 일별/시간별 요약과 월별 요약 DataFrame으로 변환합니다.
+    원본에 한 번이라도 나타난 (일, 시)만 남겨 기존 groupby 결과와 같은 행 구성을 유지합니다.
+    """
+    rentals, observed = to_hourly(rentals), to_hourly(observed)
+    num_days = len(rentals) // HOURS_PER_DAY
+    dates = np.datetime64('1970-01-01', 'D') + first_day + np.arange(num_days)
+    months = (dates.astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8)
+    day_of_month = ((dates - dates.astype('datetime64[M]')).astype(np.int64) + 1).astype(np.int8)
+
+    cell_months = np.repeat(months, HOURS_PER_DAY)
+    present = observed > 0
+    daily_df = pd.DataFrame({
+        'year': np.full(int(present.sum()), year, dtype=np.int16),
+        'month': cell_months[present],
+        'day': np.repeat(day_of_month, HOURS_PER_DAY)[present],
+        'hour': np.tile(np.arange(HOURS_PER_DAY, dtype=np.int8), num_days)[present],
+        'total_rentals': rentals[present],
+    })
+
+    monthly_rentals = np.bincount(cell_months, weights=rentals, minlength=13).astype(np.int64)
+    monthly_observed = np.bincount(cell_months, weights=observed, minlength=13)
+    present_months = np.flatnonzero(monthly_observed > 0)
+    monthly_df = pd.DataFrame({
+        'year': np.full(len(present_months), year, dtype=np.int16),
+        'month': present_months.astype(np.int8),
+        'total_rentals': monthly_rentals[present_months],
+    })
+
+    for df in (daily_df, monthly_df):
+        df['total_rentals'] = pd.to_numeric(df['total_rentals'], downcast='unsigned')
+    return daily_df, monthly_df
+
+
+def _bucket_starts(slot_starts, level):
+    """각 5분 슬롯 시작 시각(epoch 분)이 속한 레벨 버킷의 시작 시각(epoch 분)"""
+    if level == 'week':
+        # 1970-01-01은 목요일이므로 (일 수 + 3) % 7이 월요일부터 지난 일 수입니다.
+        days = slot_starts // MINUTES_PER_DAY
+        return (days - (days + 3) % 7) * MINUTES_PER_DAY
+    if level == 'month':
+        month_starts = slot_starts.astype('datetime64[m]').astype('datetime64[M]')
+        return month_starts.astype('datetime64[m]').astype(np.int64)
+    size = ROLLUP_LEVELS[level]
+    return slot_starts - slot_starts % size
+
+
+def dense_to_rollups(first_day, rentals, observed):
+    """
+    (연중 일자 × 5분 슬롯) 배열을 롤업 큐브의 모든 레벨(5분 → 15분 → 시 → 일 → 주 → 월)로 합칩니다.
+    이용 기록이 있는 버킷만 남깁니다.
+
+    Returns:
+        {레벨: DataFrame[time, total_rentals]}
+    """
+    slot_starts = first_day * MINUTES_PER_DAY + np.arange(len(rentals), dtype=np.int64) * SLOT_MINUTES
+    rollups = {}
+    for level in ROLLUP_LEVELS:
+        starts, buckets = np.unique(_bucket_starts(slot_starts, level), return_inverse=True)
+        bucket_rentals = np.bincount(buckets, weights=rentals, minlength=len(starts)).astype(np.int64)
+        present = np.bincount(buckets, weights=observed, minlength=len(starts)) > 0
+        df = pd.DataFrame({
+            'time': starts[present].astype('datetime64[m]').astype('datetime64[s]'),
+            'total_rentals': bucket_rentals[present],
+        })
+        df['total_rentals'] = pd.to_numeric(df['total_rentals'], downcast='unsigned')
+        rollups[level] = df
+    return rollups
+
+
+def aggregate_month(year, month):
+    """
+    (map 단계) 원본 월 파일 하나를 그 연도 크기의 (일자 × 5분 슬롯) 부분 배열 (rentals, observed)로 집계합니다.
+    청크는 메모리 예산에 맞는 크기로 스트리밍됩니다.
+    """
+    first_day, num_days = year_day_range(year)
+    rentals = np.zeros(num_days * SLOTS_PER_DAY, dtype=np.int64)
+    observed = np.zeros(num_days * SLOTS_PER_DAY, dtype=np.int64)
+
+    batches = load_parquet_year_data(
+        year, months=[month], columns=REQUIRED_COLUMNS, output='arrow', memory_budget_mb=MEMORY_BUDGET_MB
+    )
+    for batch in batches:
+        accumulate_batch(batch, first_day, num_days, rentals, observed)
+    return rentals, observed
+
+
+def aggregate_month_job(year, month, file_path):
+    """
+    워커 프로세스에서 실행되는 map 작업. 집계 전에 원본 파일의 지문(워터마크 기록용)을 계산합니다.
+    실패해도 예외 대신 오류 메시지를 결과로 돌려줍니다.
+    """
+    start_time = time.perf_counter()
+    try:
+        fingerprint = source_fingerprint(file_path)
+        rentals, observed = aggregate_month(year, month)
+        error = None
+    except Exception as e:
+        rentals, observed, fingerprint, error = None, None, None, f"{type(e).__name__}: {e}"
+    return year, month, rentals, observed, fingerprint, error, time.perf_counter() - start_time
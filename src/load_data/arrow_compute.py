@@ -0,0 +1,59 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# pandas로 변환하지 않고 Arrow 배치/테이블에서 바로 수행하는 청크 단위 집계 도구
+
+
+def date_parts(dates):
+    """date32 배열에서 (year, month, day) 배열을 계산합니다."""
+    return (
+        pc.cast(pc.year(dates), pa.int16()),
+        pc.cast(pc.month(dates), pa.int8()),
+        pc.cast(pc.day(dates), pa.int8()),
+    )
+
+
+def weekday(dates):
+    """date32 배열의 요일(월요일=0 ... 일요일=6)을 int8 배열로 계산합니다."""
+    return pc.cast(pc.day_of_week(dates), pa.int8())
+
+
+def slot_to_hour(slots):
+    """5분 단위 시간대(HHMM 정수, 예: 1755)를 시(0~23)로 변환합니다."""
+    return pc.cast(pc.divide(slots, 100), pa.int8())
+
+
+def add_time_columns(data, date_column='기준_날짜', slot_column='기준_시간대'):
+    """
+    배치/테이블에 year, month, day, hour 컬럼을 추가한 테이블을 반환합니다.
+    원본 컬럼 버퍼는 복사하지 않고 그대로 공유합니다.
+    """
+    table = pa.Table.from_batches([data]) if isinstance(data, pa.RecordBatch) else data
+    year, month, day = date_parts(table.column(date_column))
+    table = table.append_column('year', year)
+    table = table.append_column('month', month)
+    table = table.append_column('day', day)
+    if slot_column in table.column_names:
+        table = table.append_column('hour', slot_to_hour(table.column(slot_column)))
+    return table
+
+
+def group_sum(data, keys, value_column, output_column=None):
+    """
+    keys로 묶어 value_column의 합계를 계산합니다. 결과 컬럼 이름은 output_column(기본: value_column)입니다.
+    """
+    table = pa.Table.from_batches([data]) if isinstance(data, pa.RecordBatch) else data
+    output_column = output_column or value_column
+    result = table.group_by(keys).aggregate([(value_column, 'sum')])
+    result = result.rename_columns([
+        output_column if name == f'{value_column}_sum' else name for name in result.column_names
+    ])
+    return result.select(list(keys) + [output_column])
+
+
+def combine_group_sums(partials, keys, value_column):
+    """청크별 group_sum 결과들을 하나로 합쳐 keys 순으로 정렬된 최종 합계를 만듭니다."""
+    if not partials:
+        return None
+    combined = group_sum(pa.concat_tables(partials), keys, value_column)
+    return combined.sort_by([(key, 'ascending') for key in keys])
@@ -0,0 +1,220 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+import pyarrow.parquet as pq
+
+from .mart_io import MART_DIRS
+from .raw_dataset import RAW_DATA_DIR, list_raw_files
+
+# 원본/마트 Parquet 파일의 메타데이터 색인
+CATALOG_PATH = os.path.join('data', 'catalog.json')
+
+RAW_DATASET = 'raw'
+DATE_COLUMN = '기준_날짜'
+
+_RAW_PARTITION_PATTERN = re.compile(r'year=(\d{4})[\\/]month=(\d{1,2})')
+_MART_YEAR_PATTERN = re.compile(r'^(.*)_(\d{4})$')
+
+# load_catalog() 결과 (catalog.json 수정 시각이 같으면 다시 읽지 않습니다)
+_loaded_catalog = {'mtime': None, 'catalog': None, 'index': None}
+
+
+def _catalog_key(path):
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def dataset_name_and_period(path):
+    """
+    파일 경로에서 (데이터셋 이름, 연도, 월)을 추출합니다.
+    원본은 ('raw', year, month), 연도별 마트(summary_monthly_2023.parquet)는 ('summary_monthly', 2023, None)
+    """
+    match = _RAW_PARTITION_PATTERN.search(path)
+    if match:
+        return RAW_DATASET, int(match.group(1)), int(match.group(2))
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = _MART_YEAR_PATTERN.match(stem)
+    if match:
+        return match.group(1), int(match.group(2)), None
+    return stem, None, None
+
+
+def schema_fingerprint(schema):
+    """스키마(컬럼 이름과 타입)의 짧은 해시. 메타데이터는 제외합니다."""
+    text = schema.to_string(show_field_metadata=False, show_schema_metadata=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _date_range(metadata, schema):
+    """row group 통계에서 기준_날짜의 (최소, 최대)를 구합니다. 통계가 없으면 (None, None)"""
+    if DATE_COLUMN not in schema.names:
+        return None, None
+    column_index = schema.get_field_index(DATE_COLUMN)
+    minimums, maximums = [], []
+    for index in range(metadata.num_row_groups):
+        statistics = metadata.row_group(index).column(column_index).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None, None
+        minimums.append(statistics.min)
+        maximums.append(statistics.max)
+    if not minimums:
+        return None, None
+    return min(minimums).isoformat(), max(maximums).isoformat()
+
+
+def describe_file(path):
+    """Parquet 파일 하나의 카탈로그 항목을 만듭니다. (footer만 읽습니다)"""
+    stat = os.stat(path)
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    dataset, year, month = dataset_name_and_period(path)
+    min_date, max_date = _date_range(parquet_file.metadata, schema)
+    return {
+        'dataset': dataset,
+        'year': year,
+        'month': month,
+        'rows': parquet_file.metadata.num_rows,
+        'min_date': min_date,
+        'max_date': max_date,
+        'schema': schema_fingerprint(schema),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+    }
+
+
+def catalog_files(raw_dir=RAW_DATA_DIR, mart_dirs=MART_DIRS):
+    """카탈로그에 넣을 원본/마트 Parquet 파일 목록"""
+    files = list_raw_files(base_dir=raw_dir)
+    for mart_dir in mart_dirs:
+        files.extend(sorted(glob.glob(os.path.join(mart_dir, '*.parquet'))))
+    return files
+
+
+def load_catalog(path=CATALOG_PATH):
+    """카탈로그를 불러옵니다. 파일이 없으면 빈 카탈로그를 반환합니다. 구조: {files: {경로: 항목}}"""
+    if not os.path.exists(path):
+        return {'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    catalog.setdefault('files', {})
+    return catalog
+
+
+def save_catalog(catalog, path=CATALOG_PATH):
+    """카탈로그를 임시 파일에 쓴 뒤 교체하여 저장합니다."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def refresh_catalog(path=CATALOG_PATH, raw_dir=RAW_DATA_DIR, mart_dirs=MART_DIRS):
+    """
+    카탈로그를 증분 갱신합니다.
+    크기와 수정 시각이 기록과 같은 파일은 건너뛰고, 바뀌거나 새로 생긴 파일만 footer를 읽으며,
+    사라진 파일은 카탈로그에서 지웁니다.
+
+    Returns:
+        (갱신된 파일 수, 삭제된 파일 수)
+    """
+    catalog = load_catalog(path)
+    entries = catalog['files']
+    current = {_catalog_key(file_path): file_path for file_path in catalog_files(raw_dir, mart_dirs)}
+
+    removed = [key for key in entries if key not in current]
+    for key in removed:
+        del entries[key]
+
+    updated = 0
+    for key, file_path in current.items():
+        stat = os.stat(file_path)
+        entry = entries.get(key)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            continue
+        try:
+            entries[key] = describe_file(file_path)
+        except Exception as e:
+            print(f"  ❌ 카탈로그 항목 생성 실패: {file_path} - {e}")
+            entries.pop(key, None)
+            continue
+        updated += 1
+
+    if updated or removed or not os.path.exists(path):
+        save_catalog(catalog, path)
+    return updated, len(removed)
+
+
+def _build_index(catalog):
+    """{데이터셋: {연도: {월: [항목, ...]}}} 색인"""
+    index = {}
+    for key, entry in catalog['files'].items():
+        months = index.setdefault(entry['dataset'], {}).setdefault(entry['year'], {})
+        months.setdefault(entry['month'], []).append(dict(entry, path=key))
+    return index
+
+
+def catalog_index(path=CATALOG_PATH):
+    """카탈로그 색인을 반환합니다. catalog.json이 바뀌지 않았으면 메모리의 색인을 그대로 씁니다."""
+    mtime = os.stat(path).st_mtime if os.path.exists(path) else None
+    if _loaded_catalog['index'] is None or _loaded_catalog['mtime'] != mtime:
+        catalog = load_catalog(path)
+        _loaded_catalog.update(mtime=mtime, catalog=catalog, index=_build_index(catalog))
+    return _loaded_catalog['index']
+
+
+def available_years(dataset=RAW_DATASET, default=None, path=CATALOG_PATH):
+    """데이터셋에 있는 연도 목록. 카탈로그에 없으면 default(기본: 빈 목록)를 반환합니다."""
+    years = sorted(year for year in catalog_index(path).get(dataset, {}) if year is not None)
+    if not years and default is not None:
+        return list(default)
+    return years
+
+
+def available_months(year, dataset=RAW_DATASET, path=CATALOG_PATH):
+    """데이터셋의 해당 연도에 있는 월 목록"""
+    months = catalog_index(path).get(dataset, {}).get(year, {})
+    return sorted(month for month in months if month is not None)
+
+
+def catalog_entries(dataset=RAW_DATASET, years=None, months=None, path=CATALOG_PATH):
+    """조건에 맞는 카탈로그 항목 목록 (각 항목에 path 포함)"""
+    entries = []
+    for year, by_month in catalog_index(path).get(dataset, {}).items():
+        if years is not None and year not in years:
+            continue
+        for month, month_entries in by_month.items():
+            if months is not None and month not in months:
+                continue
+            entries.extend(month_entries)
+    return sorted(entries, key=lambda entry: entry['path'])
+
+
+def row_count(dataset=RAW_DATASET, years=None, months=None, path=CATALOG_PATH):
+    """조건에 맞는 파일들의 총 행 수 (파일을 열지 않고 카탈로그에서 계산)"""
+    return sum(entry['rows'] for entry in catalog_entries(dataset, years, months, path))
+
+
+def date_coverage(dataset=RAW_DATASET, path=CATALOG_PATH):
+    """데이터셋의 (최소 기준_날짜, 최대 기준_날짜) 문자열. 기록이 없으면 (None, None)"""
+    entries = [entry for entry in catalog_entries(dataset, path=path) if entry['min_date'] is not None]
+    if not entries:
+        return None, None
+    return min(entry['min_date'] for entry in entries), max(entry['max_date'] for entry in entries)
+
+
+def main():
+    print("--- 🗂️ 데이터 카탈로그 갱신 ---")
+    updated, removed = refresh_catalog()
+    index = catalog_index()
+    print(f"✅ 갱신 {updated}개, 삭제 {removed}개 → {CATALOG_PATH}")
+    for dataset in sorted(index):
+        years = available_years(dataset)
+        print(f"  - {dataset}: {row_count(dataset):,}행, 연도 {years}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,52 +1,187 @@
-import glob
 import pandas as pd
-import pyarrow.parquet as pq
 import os
 import numbers
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .raw_dataset import (
+    open_raw_dataset, build_raw_filter, raw_data_columns, raw_to_pandas, convert_raw_batch, OUTPUT_FORMATS
+)
+from .memory_budget import OUTPUT_OVERHEAD, SCAN_BATCH_ROWS, budgeted_batches, current_rss, estimate_row_width
+from .prefetch import DEFAULT_PREFETCH_MEMORY_MB, prefetch_batches
+
+
+def load_parquet_year_data(selected_years, columns=None, chunk_size=100_000,
+                           months=None, start_date=None, end_date=None, output='pandas',
+                           prefetch=0, prefetch_memory_mb=DEFAULT_PREFETCH_MEMORY_MB,
+                           memory_budget_mb=None, stats=None, memory_map=None):
+    """
+    원본 이용 내역을 청크 단위로 스트리밍합니다.
+
+    year=/month= 파티션과 기준_날짜 조건(start_date, end_date: yyyymmdd 또는 날짜)을
+    dataset 필터로 전달하므로, 조건에 맞지 않는 파일과 row group은 디코딩 전에 건너뜁니다.
+
+    output:
+        'pandas'       - RAW_SCHEMA에 맞는 좁은 dtype(datetime64, int16, uint16, float32, category) DataFrame
+        'arrow'        - pyarrow.RecordBatch (변환/복사 없음, load_data.arrow_compute로 집계)
+        'pandas_arrow' - pd.ArrowDtype 컬럼의 DataFrame (Arrow 버퍼를 복사하지 않음)
 
-def load_parquet_year_data(selected_years, columns=None, chunk_size=100_000):
+    prefetch:
+        0보다 크면 백그라운드 스레드가 다음 청크를 최대 prefetch개(합계 prefetch_memory_mb MB 이하)까지
+        미리 읽고 변환해 두므로, 소비자의 집계와 다음 청크의 I/O/디코딩이 겹쳐서 진행됩니다.
+
+    memory_budget_mb:
+        주면 chunk_size 대신 읽을 컬럼의 행당 크기로 첫 청크 행 수를 정하고,
+        청크를 처리할 때마다 관측한 RSS 증가분이 예산 안에 들도록 청크 크기를 조정합니다.
+        prefetch와 함께 주면 측정 시점이 소비자의 처리와 맞지 않으므로 첫 청크 크기를 그대로 씁니다.
+        RSS를 측정할 수 없는 환경(psutil이 없고 /proc/self/statm도 없는 경우)에서도 첫 청크 크기를 그대로 씁니다.
+
+    stats:
+        dict를 주면 선택된 청크 행 수(chunk_rows), 처리한 청크/행 수, 최대 메모리(peak_rss_mb) 등을 기록합니다.
+        (항목은 load_data.memory_budget.budgeted_batches 참고)
+
+    memory_map:
+        True이면 원본 파일을 메모리 맵으로 읽습니다. (기본: load_data.mart_io.MEMORY_MAP)
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"output은 {OUTPUT_FORMATS} 중 하나여야 합니다: {output!r}")
     if isinstance(selected_years, numbers.Number):
         selected_years = [selected_years]
 
-    target_files = []
-    for year in selected_years:
-        year_folder = os.path.join('data', 'parquet', str(year))
-        file_pattern = os.path.join(year_folder, '*.parquet')
-        monthly_files = sorted(glob.glob(file_pattern))
-        target_files.extend(monthly_files)
+    dataset = open_raw_dataset(years=selected_years, months=months, memory_map=memory_map)
+    if dataset is None:
+        print(f"Warning: {list(selected_years)}년 원본 Parquet 파일을 찾을 수 없습니다.")
+        return
+
+    if columns is None:
+        columns = raw_data_columns(dataset)
+
+    scan_filter = build_raw_filter(selected_years, months, start_date, end_date)
+    if memory_budget_mb is not None:
+        scan_batches = budgeted_batches(
+            dataset.to_batches(columns=columns, filter=scan_filter, batch_size=SCAN_BATCH_ROWS),
+            memory_budget_mb, estimate_row_width(dataset.schema, columns), OUTPUT_OVERHEAD[output], stats,
+            adapt=prefetch <= 0,
+        )
+    else:
+        scan_batches = _counted_batches(
+            dataset.to_batches(columns=columns, filter=scan_filter, batch_size=chunk_size), chunk_size, stats
+        )
+    batches = (convert_raw_batch(batch, output) for batch in scan_batches)
+    if prefetch > 0:
+        batches = prefetch_batches(batches, max_batches=prefetch, max_memory_mb=prefetch_memory_mb)
+    yield from batches
+
+def _counted_batches(batches, chunk_size, stats):
+    """고정 chunk_size로 읽을 때도 stats에 청크 행 수, 처리량, 최대 RSS를 기록합니다."""
+    if stats is None:
+        yield from batches
+        return
+    stats.update(chunk_rows=chunk_size, chunks=0, rows=0, peak_rss_mb=None)
+    for batch in batches:
+        yield batch
+        stats['chunks'] += 1
+        stats['rows'] += batch.num_rows
+        rss = current_rss()
+        if rss is not None:
+            stats['peak_rss_mb'] = max(stats['peak_rss_mb'] or 0, rss / 1024 ** 2)
+
+def load_parquet_month_data(year, month, columns=None, chunk_size=100_000, memory_map=None):
+    dataset = open_raw_dataset(years=[year], months=[month], memory_map=memory_map)
+    if dataset is None:
+        raise FileNotFoundError(f"{year}년 {month}월 원본 Parquet 파일을 찾을 수 없습니다.")
 
-    # 2. 타겟팅된 파일들에 대해서만 스트리밍을 수행합니다.
-    for file in target_files:
+    if columns is None:
+        columns = raw_data_columns(dataset)
+
+    scan_filter = build_raw_filter([year], [month])
+    return raw_to_pandas(dataset.to_table(columns=columns, filter=scan_filter, batch_size=chunk_size))
+
+# CSV 원본을 다시 파싱하지 않도록 타입이 지정된 Parquet 사본(sidecar)을 보관하는 경로
+CACHE_DIR = os.path.join('data', 'cache')
+STATION_FILE_PATH = os.path.join('data', 'bcycle_master_location.csv')
+POPULATION_FILE_PATH = os.path.join('data', 'registered_population.csv')
+SIDECAR_MTIME_KEY = b'source_mtime_ns'
+
+# 인구 통계 분기 표기 ('2020 1/4' = 2020년 1분기, '2021' = 2020년 4분기)
+QUARTER_LABELS = {'1/4': 1, '1/2': 2, '2/4': 2, '3/4': 3}
+
+
+def _load_with_sidecar(source_path, build):
+    """
+    source_path의 Parquet sidecar(data/cache/{파일명}.parquet)를 읽습니다.
+    sidecar가 없거나 기록된 원본 수정 시각이 현재와 다르면 build()로 다시 만들어 저장합니다.
+    """
+    source_mtime = str(os.stat(source_path).st_mtime_ns).encode()
+    sidecar_path = os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(source_path))[0] + '.parquet')
+
+    if os.path.exists(sidecar_path):
         try:
-            parquet_file = pq.ParquetFile(file)
-            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
-                yield batch.to_pandas()
-        except Exception:
-            continue
+            table = pq.read_table(sidecar_path)
+            if (table.schema.metadata or {}).get(SIDECAR_MTIME_KEY) == source_mtime:
+                return table.to_pandas()
+        except (OSError, pa.ArrowInvalid):
+            pass  # 손상된 sidecar는 다시 만듭니다.
+
+    df = build()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SIDECAR_MTIME_KEY: source_mtime})
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = f'{sidecar_path}.tmp'
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, sidecar_path)
+    return df
 
-def load_parquet_month_data(year, month, columns=None, chunk_size=100_000):
-    year_folder = os.path.join('data', 'parquet', str(year))
-    file = os.path.join(year_folder, f'bycle_{year}{month:02d}.parquet')
-    return pd.read_parquet(file, columns=columns)
 
 def load_station_data():
-    file = os.path.join('data','bcycle_master_location.csv')
-    return pd.read_csv(file, encoding='cp949')
+    """대여소 마스터(대여소_ID, 주소1, 주소2, 위도, 경도)를 sidecar에서 읽습니다."""
+    return _load_with_sidecar(
+        STATION_FILE_PATH,
+        lambda: pd.read_csv(
+            STATION_FILE_PATH, encoding='cp949',
+            dtype={'대여소_ID': 'string', '주소1': 'string', '주소2': 'string', '위도': 'float64', '경도': 'float64'},
+        ),
+    )
+
+
+def parse_quarter_label(label):
+    """인구 통계 컬럼 표기를 (연도, 분기)로 변환합니다. 연도만 있는 컬럼은 전년도 4분기입니다."""
+    parts = str(label).split()
+    if len(parts) == 2:
+        return int(parts[0]), QUARTER_LABELS[parts[1]]
+    return int(parts[0]) - 1, 4
+
+
+def _build_population_long(file):
+    """2단 헤더 인구 CSV를 (자치구, 연도, 분기, 인구수) 형태의 긴 표로 변환합니다."""
+    df = pd.read_csv(file, header=None, skiprows=2)
+    labels = pd.read_csv(file, header=None, nrows=1).iloc[0, 2:]
+    quarters = [parse_quarter_label(label) for label in labels]
+
+    values = df.iloc[:, 2:].to_numpy()
+    districts = df.iloc[:, 1].astype(str).str.strip().to_numpy()
+    return pd.DataFrame({
+        '자치구': pd.Series(districts.repeat(len(quarters)), dtype='string'),
+        '연도': pd.Series([year for year, _ in quarters] * len(df), dtype='int16'),
+        '분기': pd.Series([quarter for _, quarter in quarters] * len(df), dtype='int8'),
+        '인구수': pd.Series(values.reshape(-1), dtype='int64'),
+    })
 
 
 def load_population_data():
-    file = os.path.join('data','registered_population.csv')
-    df = pd.read_csv(file, header=[0, 1])
-
-    # 2. 컬럼 이름의 공백을 제거하는 로직
-    cleaned_columns = []
-    for col_level1, col_level2 in df.columns:
-        # 각 레벨의 문자열 앞뒤 공백(whitespace)을 제거(strip)합니다.
-        cleaned_level1 = str(col_level1).strip()
-        cleaned_level2 = str(col_level2).strip()
-        cleaned_columns.append((cleaned_level1, cleaned_level2))
-    
-    df.columns = pd.MultiIndex.from_tuples(cleaned_columns)
-    
-    return df
\ No newline at end of file
+    """
+    서울시 자치구별 분기 주민등록 인구를 긴 표로 반환합니다.
+    컬럼: 자치구('소계'는 서울시 전체), 연도, 분기, 인구수
+    """
+    return _load_with_sidecar(POPULATION_FILE_PATH, lambda: _build_population_long(POPULATION_FILE_PATH))
+
+
+def seoul_yearly_population(population_df):
+    """긴 표의 인구 데이터에서 연도별 서울시 전체 4분기 인구(연말 인구)를 뽑습니다. 컬럼: 연도, 총_인구수"""
+    year_end = population_df[(population_df['자치구'] == '소계') & (population_df['분기'] == 4)]
+    return (year_end[['연도', '인구수']]
+            .rename(columns={'인구수': '총_인구수'})
+            .astype({'연도': 'int64'})
+            .sort_values('연도')
+            .reset_index(drop=True))
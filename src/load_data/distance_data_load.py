@@ -3,6 +3,8 @@ import os
 import glob
 from typing import List
 
+from .mart_io import read_mart
+
 # 정제된 거리/시간 데이터가 저장된 디렉터리
 DISTANCE_DATA_DIR = 'data/02'
 
@@ -18,7 +20,7 @@ def load_distance_time_data() -> pd.DataFrame:
         print(f"Warning: No data files found matching pattern in {DISTANCE_DATA_DIR}")
         return pd.DataFrame()
         
-    df_list = [pd.read_parquet(file) for file in files]
+    df_list = [read_mart(file) for file in files]
     
     if not df_list:
         return pd.DataFrame()
@@ -37,7 +39,7 @@ def load_distance_time_data_by_year(year: int) -> pd.DataFrame:
         print(f"Warning: Data file for year {year} not found at {file_path}")
         return pd.DataFrame()
     
-    df = pd.read_parquet(file_path)
+    df = read_mart(file_path)
     return df
 
 def load_distance_time_summary_data() -> pd.DataFrame:
@@ -45,7 +47,7 @@ def load_distance_time_summary_data() -> pd.DataFrame:
     if not os.path.exists(file_path):
         print(f"Warning: Summary data file not found at {file_path}")
         return pd.DataFrame()
-    df = pd.read_parquet(file_path)
+    df = read_mart(file_path)
     return df
 
 def load_yearly_summary_data() -> pd.DataFrame:
@@ -0,0 +1,91 @@
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 메모리 맵 읽기 사용 여부 (대시보드 워커를 여러 개 띄우는 서버에서 DDAREUNGI_MEMORY_MAP=1로 켭니다)
+# 켜면 마트는 비압축 Arrow IPC 사본(.arrow)을 메모리 맵으로 열어 같은 호스트의 프로세스들이
+# OS 페이지 캐시를 공유하고, Parquet 파일도 메모리 맵으로 읽습니다.
+MEMORY_MAP = os.environ.get('DDAREUNGI_MEMORY_MAP', '0') == '1'
+
+# IPC 사본을 만들 작은 데이터 마트 폴더
+MART_DIRS = [os.path.join('data', '01'), os.path.join('data', '02'), os.path.join('data', '03')]
+IPC_SUFFIX = '.arrow'
+
+
+def use_memory_map(memory_map=None):
+    """memory_map 인자가 None이면 MEMORY_MAP 설정을 따릅니다."""
+    return MEMORY_MAP if memory_map is None else memory_map
+
+
+def ipc_path(parquet_path):
+    """Parquet 마트의 IPC 사본 경로 (summary_monthly_2023.parquet → summary_monthly_2023.arrow)"""
+    return os.path.splitext(parquet_path)[0] + IPC_SUFFIX
+
+
+def is_ipc_current(parquet_path):
+    """IPC 사본이 있고 Parquet 원본보다 오래되지 않았는지 확인합니다."""
+    arrow_path = ipc_path(parquet_path)
+    if not os.path.exists(arrow_path):
+        return False
+    if not os.path.exists(parquet_path):
+        return True
+    return os.stat(arrow_path).st_mtime_ns >= os.stat(parquet_path).st_mtime_ns
+
+
+def export_mart_ipc(parquet_path):
+    """Parquet 마트를 비압축 Arrow IPC 파일로 기록합니다. 기록한 경로를 반환합니다."""
+    table = pq.read_table(parquet_path)
+    arrow_path = ipc_path(parquet_path)
+    temp_path = f'{arrow_path}.tmp'
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, arrow_path)
+    return arrow_path
+
+
+def export_marts_ipc(mart_dirs=MART_DIRS, force=False):
+    """마트 폴더의 Parquet 파일 중 IPC 사본이 없거나 오래된 것만 다시 기록합니다. 기록한 파일 수를 반환합니다."""
+    exported = 0
+    for mart_dir in mart_dirs:
+        for parquet_path in sorted(glob.glob(os.path.join(mart_dir, '*.parquet'))):
+            if not force and is_ipc_current(parquet_path):
+                continue
+            export_mart_ipc(parquet_path)
+            exported += 1
+    return exported
+
+
+def read_mart(file_path, columns=None, filters=None, memory_map=None):
+    """
+    마트 Parquet 파일을 DataFrame으로 읽습니다. filters는 pd.read_parquet와 같은 [(컬럼, 연산자, 값), ...] 형식입니다.
+
+    메모리 맵을 켜면 최신 IPC 사본을 메모리 맵으로 열고 pd.ArrowDtype 컬럼으로 변환하여
+    디코딩/복사 없이 페이지 캐시의 버퍼를 그대로 씁니다. IPC 사본이 없으면 Parquet를 메모리 맵으로 읽습니다.
+    """
+    if not use_memory_map(memory_map):
+        return pd.read_parquet(file_path, columns=columns, filters=filters)
+
+    if not is_ipc_current(file_path):
+        return pd.read_parquet(file_path, columns=columns, filters=filters, memory_map=True)
+
+    source = pa.memory_map(ipc_path(file_path), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def main():
+    print("--- 🗺️ 데이터 마트 Arrow IPC 사본 생성 ---")
+    exported = export_marts_ipc()
+    print(f"✅ {exported}개 마트를 IPC 파일로 기록했습니다. ({', '.join(MART_DIRS)})")
+
+
+if __name__ == '__main__':
+    main()
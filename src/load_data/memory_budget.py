@@ -0,0 +1,152 @@
+import os
+
+import pyarrow as pa
+
+# psutil은 필수 의존성이 아닙니다. 없으면 /proc/self/statm(Linux)으로 RSS를 측정하고,
+# 둘 다 없는 환경(예: psutil 없는 Windows/macOS)에서는 RSS를 측정하지 않고 행당 예상 크기로 정한 청크 크기를 그대로 씁니다.
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROC_STATM_PATH = '/proc/self/statm'
+
+# --- 메모리 예산 기반 청크 크기 설정 ---
+
+# 가변 길이 컬럼(문자열 등)의 행당 예상 크기(바이트)
+VARIABLE_WIDTH_ESTIMATE = 24
+
+# 청크 하나를 처리하는 동안 Arrow 버퍼 외에 추가로 쓰이는 메모리 배수 (output 형식별)
+#   'pandas'는 Arrow 배치와 변환된 DataFrame을 동시에 보유합니다.
+OUTPUT_OVERHEAD = {'pandas': 2.5, 'arrow': 1.5, 'pandas_arrow': 1.5}
+
+# 청크 행 수의 범위와 조정 기준
+MIN_CHUNK_ROWS = 10_000
+MAX_CHUNK_ROWS = 4_000_000
+SCAN_BATCH_ROWS = 65_536      # 청크를 조립하는 스캔 단위 (이 단위로 청크 크기를 바꿀 수 있습니다)
+SHRINK_THRESHOLD = 1.0        # 사용량이 예산을 넘으면 줄입니다.
+GROW_THRESHOLD = 0.5          # 사용량이 예산의 절반 미만이면 늘립니다.
+GROW_FACTOR = 1.5
+
+
+def column_width(data_type):
+    """Arrow 타입 한 값의 예상 크기(바이트)"""
+    if pa.types.is_dictionary(data_type):
+        return data_type.index_type.bit_width // 8
+    try:
+        return max(data_type.bit_width // 8, 1)
+    except ValueError:  # 문자열/바이너리 등 가변 길이 타입
+        return VARIABLE_WIDTH_ESTIMATE
+
+
+def estimate_row_width(schema, columns=None):
+    """스키마에서 읽을 컬럼(columns, 기본: 전체)의 행당 예상 크기(바이트)를 계산합니다."""
+    names = columns if columns is not None else schema.names
+    return sum(column_width(schema.field(name).type) for name in names)
+
+
+def current_rss():
+    """현재 프로세스의 RSS(바이트). psutil도 /proc/self/statm도 없어 측정할 수 없으면 None"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if not os.path.exists(PROC_STATM_PATH):
+        return None
+    try:
+        with open(PROC_STATM_PATH) as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def initial_chunk_rows(memory_budget_bytes, row_width, overhead):
+    """메모리 예산과 행당 크기로 첫 청크 행 수를 정합니다."""
+    rows = int(memory_budget_bytes / max(row_width * overhead, 1))
+    return min(max(rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+
+def adapt_chunk_rows(chunk_rows, used_bytes, memory_budget_bytes):
+    """
+    직전 청크의 메모리 사용량(used_bytes)으로 다음 청크 행 수를 조정합니다.
+    예산을 넘으면 넘은 비율만큼 줄이고, 절반도 쓰지 않으면 GROW_FACTOR배로 늘립니다.
+    """
+    if used_bytes > memory_budget_bytes * SHRINK_THRESHOLD:
+        chunk_rows = int(chunk_rows * memory_budget_bytes / used_bytes * 0.8)
+    elif used_bytes < memory_budget_bytes * GROW_THRESHOLD:
+        chunk_rows = int(chunk_rows * GROW_FACTOR)
+    return min(max(chunk_rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+
+def _combine(pieces):
+    """스캔 배치 조각들을 하나의 RecordBatch로 합칩니다. (조각이 하나면 복사하지 않습니다)"""
+    if len(pieces) == 1:
+        return pieces[0]
+    return pa.Table.from_batches(pieces).combine_chunks().to_batches()[0]
+
+
+def budgeted_batches(scan_batches, memory_budget_mb, row_width, overhead=1.0, stats=None, adapt=True):
+    """
+    스캔 배치(SCAN_BATCH_ROWS 단위)를 메모리 예산에 맞는 크기의 청크로 묶어 내보냅니다.
+    청크를 하나 내보내고 소비자가 처리를 마칠 때마다 RSS를 측정하여 다음 청크 크기를 조정합니다.
+
+    청크 사용량은 직전 측정 대비 RSS 증가분으로 봅니다. RSS는 해제한 메모리를 잘 돌려주지 않아
+    시작 시점 대비 증가분은 줄어들지 않고, 반대로 재사용된 메모리는 증가분에 드러나지 않으므로
+    청크의 예상 크기(행 수 × 행당 크기 × overhead)보다 작게 잡지는 않습니다.
+
+    adapt=False이면 청크 크기를 바꾸지 않고 RSS만 기록합니다. 이 제너레이터를 prefetch 스레드가
+    소비하면 측정 시점이 소비자가 청크 처리를 마친 때가 아니라 미리 읽어 큐에 넣은 때가 되므로,
+    prefetch와 함께 쓸 때는 adapt=False로 호출합니다.
+
+    RSS를 측정할 수 없는 환경(current_rss()가 None)에서도 adapt=False와 같이 동작합니다.
+    첫 청크 크기(메모리 예산 / (행당 크기 × overhead))를 끝까지 쓰며, stats의 rss_available이 False가 됩니다.
+
+    stats(dict)를 주면 다음 값을 기록합니다.
+        row_width_bytes, initial_chunk_rows, chunk_rows(현재 청크 행 수), chunks, rows,
+        adjustments(청크 크기 변경 횟수), rss_available(RSS 측정 가능 여부), baseline_rss_mb, peak_rss_mb, peak_used_mb
+    """
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    stats = {} if stats is None else stats
+    baseline_rss = current_rss()
+    previous_rss = baseline_rss
+    adapt = adapt and baseline_rss is not None
+    chunk_rows = initial_chunk_rows(budget_bytes, row_width, overhead)
+    stats.update(
+        row_width_bytes=row_width, initial_chunk_rows=chunk_rows, chunk_rows=chunk_rows,
+        chunks=0, rows=0, adjustments=0, rss_available=baseline_rss is not None,
+        baseline_rss_mb=None if baseline_rss is None else baseline_rss / 1024 ** 2,
+        peak_rss_mb=None if baseline_rss is None else baseline_rss / 1024 ** 2, peak_used_mb=0.0,
+    )
+
+    def emit(pieces):
+        nonlocal chunk_rows, previous_rss
+        chunk = _combine(pieces)
+        yield chunk
+        stats['chunks'] += 1
+        stats['rows'] += chunk.num_rows
+
+        rss = current_rss()
+        if rss is None or baseline_rss is None:
+            return
+        stats['peak_rss_mb'] = max(stats['peak_rss_mb'], rss / 1024 ** 2)
+        stats['peak_used_mb'] = max(stats['peak_used_mb'], max(rss - baseline_rss, 0) / 1024 ** 2)
+        used = max(rss - previous_rss, chunk.num_rows * row_width * overhead)
+        previous_rss = rss
+        if not adapt:
+            return
+        new_rows = adapt_chunk_rows(chunk_rows, used, budget_bytes)
+        if new_rows != chunk_rows:
+            chunk_rows = new_rows
+            stats['chunk_rows'] = chunk_rows
+            stats['adjustments'] += 1
+
+    pieces, pending_rows = [], 0
+    for batch in scan_batches:
+        while batch.num_rows > 0:
+            take = min(chunk_rows - pending_rows, batch.num_rows)
+            pieces.append(batch.slice(0, take))
+            pending_rows += take
+            batch = batch.slice(take)
+            if pending_rows >= chunk_rows:
+                yield from emit(pieces)
+                pieces, pending_rows = [], 0
+    if pieces:
+        yield from emit(pieces)
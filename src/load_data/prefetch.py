@@ -0,0 +1,109 @@
+import threading
+from collections import deque
+
+import pandas as pd
+import pyarrow as pa
+
+# 미리 읽어 둘 청크의 기본 개수와 메모리 상한
+DEFAULT_PREFETCH_BATCHES = 4
+DEFAULT_PREFETCH_MEMORY_MB = 512
+
+_END = object()
+
+
+def batch_nbytes(batch):
+    """청크(RecordBatch/Table/DataFrame)가 차지하는 메모리 크기(바이트)"""
+    if isinstance(batch, (pa.RecordBatch, pa.Table)):
+        return batch.nbytes
+    if isinstance(batch, pd.DataFrame):
+        return int(batch.memory_usage(index=True, deep=False).sum())
+    return 0
+
+
+class _PrefetchQueue:
+    """청크 개수와 바이트 합계로 크기가 제한되는 생산자/소비자 큐"""
+
+    def __init__(self, max_batches, max_bytes):
+        self.max_batches = max_batches
+        self.max_bytes = max_bytes
+        self.items = deque()
+        self.queued_bytes = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, item, nbytes=0):
+        """
+        큐에 여유가 생길 때까지 기다린 뒤 넣습니다.
+        큐가 비어 있으면 상한보다 큰 청크도 받아서 진행이 멈추지 않게 합니다.
+        소비자가 먼저 종료하면 False를 반환합니다.
+        """
+        with self.condition:
+            while not self.closed and self.items and (
+                len(self.items) >= self.max_batches or self.queued_bytes + nbytes > self.max_bytes
+            ):
+                self.condition.wait()
+            if self.closed:
+                return False
+            self.items.append((item, nbytes))
+            self.queued_bytes += nbytes
+            self.condition.notify_all()
+            return True
+
+    def get(self):
+        with self.condition:
+            while not self.items:
+                self.condition.wait()
+            item, nbytes = self.items.popleft()
+            self.queued_bytes -= nbytes
+            self.condition.notify_all()
+            return item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.items.clear()
+            self.queued_bytes = 0
+            self.condition.notify_all()
+
+
+def prefetch_batches(batches, max_batches=DEFAULT_PREFETCH_BATCHES, max_memory_mb=DEFAULT_PREFETCH_MEMORY_MB):
+    """
+    백그라운드 스레드에서 batches를 미리 읽어(디코딩/변환 포함) 큐에 쌓아 두고 순서대로 내보냅니다.
+    소비자가 한 청크를 처리하는 동안 다음 청크들의 I/O와 디코딩이 함께 진행됩니다.
+
+    Args:
+        batches: 청크를 내보내는 이터레이터 (파일 경계와 무관하게 계속 읽습니다)
+        max_batches: 큐에 쌓아 둘 최대 청크 수
+        max_memory_mb: 큐에 쌓인 청크의 메모리 합계 상한(MB)
+    """
+    if max_batches < 1:
+        raise ValueError(f"max_batches는 1 이상이어야 합니다: {max_batches}")
+    queue = _PrefetchQueue(max_batches, max_memory_mb * 1024 * 1024)
+
+    def produce():
+        try:
+            for batch in batches:
+                if not queue.put(batch, batch_nbytes(batch)):
+                    return
+            queue.put(_END)
+        except BaseException as e:  # 소비자 쪽에서 다시 발생시킵니다.
+            queue.put(e)
+        finally:
+            close = getattr(batches, 'close', None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name='raw-data-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # 소비자가 중간에 멈추면 생산 스레드도 정리합니다.
+        queue.close()
+        producer.join()
@@ -0,0 +1,165 @@
+import datetime
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+
+from .mart_io import use_memory_map
+
+# 원본 이용 내역 Parquet 저장소 (year=YYYY/month=MM/bycle_{YYYYMM}.parquet)
+RAW_DATA_DIR = os.path.join('data', 'parquet')
+
+# 원본 Parquet 스키마 (specs/data-model.md 1.1 참고)
+# - 기준_날짜는 date32, 5분 단위 시간대(0~2355)는 int16, 건수는 uint16, 이용 분/거리는 float32
+# - 대여소_ID는 대여소 사전의 int32 코드, 대여소명은 사전(dictionary) 인코딩
+# - 값이 거의 없는 집계_기준 컬럼은 저장하지 않습니다.
+RAW_SCHEMA = pa.schema([
+    ('기준_날짜', pa.date32()),
+    ('기준_시간대', pa.int16()),
+    ('시작_대여소_ID', pa.int32()),
+    ('시작_대여소명', pa.dictionary(pa.int32(), pa.string())),
+    ('종료_대여소_ID', pa.int32()),
+    ('종료_대여소명', pa.dictionary(pa.int32(), pa.string())),
+    ('전체_건수', pa.uint16()),
+    ('전체_이용_분', pa.float32()),
+    ('전체_이용_거리', pa.float32()),
+])
+
+# Hive 스타일 파티션 (디렉터리 이름 'year=2024', 'month=07'에서 값을 읽습니다)
+PARTITION_SCHEMA = pa.schema([('year', pa.int32()), ('month', pa.int32())])
+HIVE_PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+PARTITION_COLUMNS = PARTITION_SCHEMA.names
+
+
+def raw_partition_dir(year, month, base_dir=RAW_DATA_DIR):
+    """연/월 파티션 디렉터리 경로"""
+    return os.path.join(base_dir, f'year={year}', f'month={month:02d}')
+
+
+def raw_file_path(year, month, base_dir=RAW_DATA_DIR):
+    """연/월 원본 Parquet 파일 경로 (bycle_{YYYYMM}.parquet)"""
+    return os.path.join(raw_partition_dir(year, month, base_dir), f'bycle_{year}{month:02d}.parquet')
+
+
+def to_date(value):
+    """20240105, '2024-01-05', datetime.date 등을 datetime.date로 변환합니다."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    yyyymmdd = int(value.replace('-', '').replace('/', '')[:8]) if isinstance(value, str) else int(value)
+    year, month_day = divmod(yyyymmdd, 10000)
+    return datetime.date(year, *divmod(month_day, 100))
+
+
+def _partition_on_or_after(date):
+    """(year, month) >= 해당 날짜의 연월 인 파티션"""
+    return (ds.field('year') > date.year) | \
+        ((ds.field('year') == date.year) & (ds.field('month') >= date.month))
+
+
+def _partition_on_or_before(date):
+    """(year, month) <= 해당 날짜의 연월 인 파티션"""
+    return (ds.field('year') < date.year) | \
+        ((ds.field('year') == date.year) & (ds.field('month') <= date.month))
+
+
+def list_raw_files(years=None, months=None, base_dir=RAW_DATA_DIR):
+    """
+    파티션 디렉터리 이름만으로 대상 파일을 찾습니다. (파일을 열지 않고 파일 단위 가지치기)
+    years/months가 None이면 전체를 대상으로 합니다.
+    """
+    year_patterns = ['*'] if years is None else [str(year) for year in years]
+    month_patterns = ['*'] if months is None else [f'{month:02d}' for month in months]
+
+    files = []
+    for year in year_patterns:
+        for month in month_patterns:
+            pattern = os.path.join(base_dir, f'year={year}', f'month={month}', '*.parquet')
+            files.extend(glob.glob(pattern))
+    return sorted(files)
+
+
+def build_raw_filter(years=None, months=None, start_date=None, end_date=None):
+    """
+    연/월/기간 조건을 dataset 필터 식으로 만듭니다.
+    연/월 조건은 파티션(파일) 단위로, 기준_날짜 조건은 row group 통계로 가지치기됩니다.
+    """
+    start_date, end_date = to_date(start_date), to_date(end_date)
+    conditions = []
+
+    if years is not None:
+        conditions.append(ds.field('year').isin(list(years)))
+    if months is not None:
+        conditions.append(ds.field('month').isin(list(months)))
+
+    # 기간 조건은 연/월 파티션과 기준_날짜 값 양쪽에 걸어 파일과 row group을 모두 가지치기합니다.
+    if start_date is not None:
+        conditions.append(_partition_on_or_after(start_date))
+        conditions.append(ds.field('기준_날짜') >= start_date)
+    if end_date is not None:
+        conditions.append(_partition_on_or_before(end_date))
+        conditions.append(ds.field('기준_날짜') <= end_date)
+
+    if not conditions:
+        return None
+
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def open_raw_dataset(years=None, months=None, base_dir=RAW_DATA_DIR, memory_map=None):
+    """
+    조건에 해당하는 파티션 파일들로 pyarrow Dataset을 구성합니다.
+    대상 파일이 하나도 없으면 None을 반환합니다.
+    memory_map(기본: mart_io.MEMORY_MAP)을 켜면 파일을 메모리 맵으로 읽습니다.
+    """
+    files = list_raw_files(years, months, base_dir)
+    if not files:
+        return None
+
+    return ds.dataset(
+        files,
+        format='parquet',
+        partitioning=HIVE_PARTITIONING,
+        partition_base_dir=base_dir,
+        filesystem=fs.LocalFileSystem(use_mmap=use_memory_map(memory_map)),
+    )
+
+
+def raw_data_columns(dataset):
+    """파티션 컬럼(year, month)을 제외한 원본 컬럼 목록"""
+    return [name for name in dataset.schema.names if name not in PARTITION_COLUMNS]
+
+
+# load_parquet_year_data의 청크 형식
+#   'pandas'       : 좁은 numpy dtype DataFrame (변환 시 복사)
+#   'arrow'        : pyarrow.RecordBatch 그대로 (변환 없음)
+#   'pandas_arrow' : pd.ArrowDtype 컬럼의 DataFrame (Arrow 버퍼를 그대로 사용)
+OUTPUT_FORMATS = ('pandas', 'arrow', 'pandas_arrow')
+
+
+def convert_raw_batch(batch, output='pandas'):
+    """원본 배치를 output 형식(OUTPUT_FORMATS)으로 변환합니다."""
+    if output == 'arrow':
+        return batch
+    if output == 'pandas_arrow':
+        return batch.to_pandas(types_mapper=pd.ArrowDtype)
+    if output == 'pandas':
+        return raw_to_pandas(batch)
+    raise ValueError(f"output은 {OUTPUT_FORMATS} 중 하나여야 합니다: {output!r}")
+
+
+def raw_to_pandas(data):
+    """
+    원본 Arrow 테이블/배치를 좁은 dtype의 DataFrame으로 변환합니다.
+    기준_날짜는 datetime64, 정수/실수 컬럼은 int16/uint16/float32, 대여소명은 category가 됩니다.
+    """
+    return data.to_pandas(date_as_object=False)
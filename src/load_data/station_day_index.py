@@ -0,0 +1,128 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .station_dictionary import FIRST_STATION_CODE, load_station_dictionary
+
+# 대여소 × 일 누적합(prefix sum) 행렬
+# 임의 기간의 대여소별 대여/반납 건수를 두 행의 차이로 계산하므로, 원본을 다시 집계하지 않고
+# 기간별 순위, 순이동량, 쏠림_비율을 바로 구할 수 있습니다. 열은 대여소 사전의 코드입니다.
+#   rentals_cumsum.npy  (일 수 + 1, 코드 수)  대여소별 대여 건수의 일 단위 누적합
+#   returns_cumsum.npy  (일 수 + 1, 코드 수)  대여소별 반납 건수의 일 단위 누적합
+STATION_DAY_DIR = os.path.join('data', '03', 'station_day')
+STATION_DAY_META_FILENAME = 'meta.json'
+STATION_DAY_ARRAYS = ['rentals_cumsum', 'returns_cumsum']
+
+# load_station_day_index() 결과 (meta.json 수정 시각이 같으면 다시 열지 않습니다)
+_loaded_index = {'mtime': None, 'index': None}
+
+
+def _station_day_path(name, index_dir=STATION_DAY_DIR):
+    return os.path.join(index_dir, f'{name}.npy')
+
+
+def _cumsum_dtype(daily):
+    """누적합이 int32 범위에 들어가면 int32를 씁니다. (대여소당 전체 기간 합계 기준)"""
+    if daily.size and daily.sum(axis=0).max() > np.iinfo(np.int32).max:
+        return np.int64
+    return np.int32
+
+
+def save_station_day_index(start, rentals_daily, returns_daily, index_dir=STATION_DAY_DIR):
+    """
+    (일 × 대여소 코드) 일별 대여/반납 건수 행렬을 누적합으로 바꾸어 저장합니다.
+    start는 첫 행의 날짜(np.datetime64[D])입니다.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    for name, daily in zip(STATION_DAY_ARRAYS, (rentals_daily, returns_daily)):
+        cumsum = np.zeros((daily.shape[0] + 1, daily.shape[1]), dtype=_cumsum_dtype(daily))
+        np.cumsum(daily, axis=0, out=cumsum[1:], dtype=cumsum.dtype)
+        path = _station_day_path(name, index_dir)
+        with open(f'{path}.tmp', 'wb') as f:
+            np.save(f, cumsum)
+        os.replace(f'{path}.tmp', path)
+
+    # meta.json을 마지막에 기록하여, 읽는 쪽이 배열 교체가 끝난 뒤에만 새 색인을 엽니다.
+    meta_path = os.path.join(index_dir, STATION_DAY_META_FILENAME)
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'start': str(start), 'num_days': int(rentals_daily.shape[0]),
+                   'num_codes': int(rentals_daily.shape[1])}, f, ensure_ascii=False, indent=2)
+    os.replace(f'{meta_path}.tmp', meta_path)
+
+
+def load_station_day_index(index_dir=STATION_DAY_DIR):
+    """
+    대여소 × 일 누적합 행렬을 메모리 맵으로 엽니다. 색인이 없으면 None을 반환합니다.
+    meta.json이 바뀌지 않았으면 이미 연 배열을 그대로 씁니다.
+    """
+    meta_path = os.path.join(index_dir, STATION_DAY_META_FILENAME)
+    try:
+        mtime = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _loaded_index['index'] is None or _loaded_index['mtime'] != mtime:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index = {name: np.load(_station_day_path(name, index_dir), mmap_mode='r') for name in STATION_DAY_ARRAYS}
+        index['start'] = np.datetime64(meta['start'], 'D')
+        index['num_days'] = meta['num_days']
+        _loaded_index.update(mtime=mtime, index=index)
+    return _loaded_index['index']
+
+
+def station_day_range(index):
+    """색인이 다루는 (첫 날짜, 마지막 날짜)"""
+    return index['start'], index['start'] + index['num_days'] - 1
+
+
+def _period_counts(cumsum, first, last, weekday_mask):
+    """[first, last) 일 구간의 대여소별 합계. 요일 조건이 있으면 일별 행으로 되돌려 해당 요일만 더합니다."""
+    if weekday_mask is None:
+        return cumsum[last].astype(np.int64) - cumsum[first]
+    rows = cumsum[first:last + 1].astype(np.int64)
+    return np.diff(rows, axis=0)[weekday_mask].sum(axis=0)
+
+
+def station_period_summary(start_date, end_date, weekdays=None, index=None):
+    """
+    [start_date, end_date] 기간(양 끝 포함)의 대여소별 이용 현황.
+    weekdays를 주면 해당 요일(월=0 ... 일=6)만 집계합니다. (예: 평일 range(5))
+
+    Returns:
+        DataFrame[대여소_ID, 총_대여건수, 총_반납건수, 총_이용건수, 순이동량, 쏠림_비율]
+        기간 내 이용이 있는 대여소만 포함합니다. 색인이 없으면 None
+    """
+    index = load_station_day_index() if index is None else index
+    if index is None:
+        return None
+
+    first = int((np.datetime64(pd.Timestamp(start_date).date(), 'D') - index['start']).astype(np.int64))
+    last = int((np.datetime64(pd.Timestamp(end_date).date(), 'D') - index['start']).astype(np.int64)) + 1
+    first = min(max(first, 0), index['num_days'])
+    last = min(max(last, first), index['num_days'])
+
+    weekday_mask = None
+    if weekdays is not None:
+        # 1970-01-01(epoch 0일)은 목요일이므로 (epoch 일 수 + 3) % 7이 월=0 기준 요일입니다.
+        epoch_days = index['start'].astype(np.int64) + np.arange(first, last)
+        weekday_mask = np.isin((epoch_days + 3) % 7, list(weekdays))
+
+    rentals = _period_counts(index['rentals_cumsum'], first, last, weekday_mask)
+    returns = _period_counts(index['returns_cumsum'], first, last, weekday_mask)
+    usage = rentals + returns
+    codes = np.flatnonzero(usage > 0)
+    codes = codes[codes >= FIRST_STATION_CODE]
+
+    net_flow = rentals[codes] - returns[codes]
+    return pd.DataFrame({
+        '대여소_ID': load_station_dictionary().decode(codes),
+        '총_대여건수': rentals[codes],
+        '총_반납건수': returns[codes],
+        '총_이용건수': usage[codes],
+        '순이동량': net_flow,
+        # 순이동량 / 총_이용건수 (+1에 가까울수록 대여만, -1에 가까울수록 반납만 일어남)
+        '쏠림_비율': net_flow / usage[codes],
+    })
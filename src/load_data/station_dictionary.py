@@ -0,0 +1,182 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# 정규화된 대여소_ID ↔ int32 코드 사전
+STATION_DICTIONARY_PATH = os.path.join('data', 'station_dictionary.parquet')
+MASTER_FILE_PATH = os.path.join('data', 'bcycle_master_location.csv')
+
+# 예약 코드
+STATION_CODE_NONE = 0     # 반납 정보 없음('X') 또는 결측/빈 값
+STATION_CODE_CENTER = 1   # 'center' (센터 회수/배치 등 실제 대여소가 아닌 값)
+FIRST_STATION_CODE = 2
+
+RESERVED_STATION_IDS = {STATION_CODE_NONE: 'X', STATION_CODE_CENTER: 'center'}
+STATION_ID_COLUMNS = ['시작_대여소_ID', '종료_대여소_ID']
+
+DICTIONARY_SCHEMA = pa.schema([('station_code', pa.int32()), ('대여소_ID', pa.string())])
+
+# 여러 워커 프로세스가 동시에 새 대여소를 등록할 때 사용할 잠금 (ingest_runner에서 설정)
+_registration_lock = None
+
+
+def set_registration_lock(lock):
+    """프로세스 간 공유 잠금을 설정합니다. (multiprocessing.Lock)"""
+    global _registration_lock
+    _registration_lock = lock
+
+
+def normalize_station_ids(values):
+    """대여소_ID 배열의 앞뒤 공백을 제거합니다. (문자열이 아닌 값은 문자열로 변환)"""
+    values = pa.array(values) if not isinstance(values, (pa.Array, pa.ChunkedArray)) else values
+    if not pa.types.is_string(values.type) and not pa.types.is_large_string(values.type):
+        values = values.cast(pa.string())
+    return pc.utf8_trim_whitespace(values)
+
+
+class StationDictionary:
+    """
+    정규화된 대여소_ID를 조밀한 int32 코드로 바꾸는 영구 사전입니다.
+    코드는 한 번 부여되면 바뀌지 않으며, 새 대여소는 파일 끝에 추가됩니다.
+    """
+
+    def __init__(self, path=STATION_DICTIONARY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            table = pq.read_table(self.path)
+            ids = table.column('대여소_ID').to_pylist()
+            codes = table.column('station_code').to_pylist()
+        else:
+            ids, codes = [], []
+
+        self._ids = pa.array(ids, type=pa.string())
+        self._codes = pa.array(codes, type=pa.int32())
+        self._id_to_code = dict(zip(ids, codes))
+        self._next_code = max(codes, default=FIRST_STATION_CODE - 1) + 1
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        table = pa.Table.from_arrays([self._codes, self._ids], schema=DICTIONARY_SCHEMA)
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, self.path)
+
+    def __len__(self):
+        return len(self._id_to_code)
+
+    @property
+    def max_code(self):
+        return self._next_code - 1
+
+    def register(self, station_ids):
+        """새 대여소_ID에 코드를 부여하고 사전 파일에 저장합니다."""
+        with self._lock:
+            if _registration_lock is not None:
+                _registration_lock.acquire()
+            try:
+                # 다른 프로세스가 먼저 등록했을 수 있으므로 최신 사전을 다시 읽습니다.
+                self._load()
+                new_ids = sorted({sid for sid in station_ids if sid not in self._id_to_code})
+                if not new_ids:
+                    return
+
+                new_codes = list(range(self._next_code, self._next_code + len(new_ids)))
+                self._ids = pa.concat_arrays([self._ids, pa.array(new_ids, type=pa.string())])
+                self._codes = pa.concat_arrays([self._codes, pa.array(new_codes, type=pa.int32())])
+                self._id_to_code.update(zip(new_ids, new_codes))
+                self._next_code += len(new_ids)
+                self._save()
+            finally:
+                if _registration_lock is not None:
+                    _registration_lock.release()
+
+    def encode(self, values):
+        """
+        대여소_ID 배열을 int32 코드 배열(pyarrow)로 변환합니다.
+        'X'/결측/빈 값은 STATION_CODE_NONE, 'center'는 STATION_CODE_CENTER로 바뀝니다.
+        """
+        normalized = normalize_station_ids(values)
+        if isinstance(normalized, pa.ChunkedArray):
+            normalized = normalized.combine_chunks()
+
+        is_none = pc.fill_null(pc.or_(pc.equal(normalized, 'X'), pc.equal(normalized, '')), True)
+        is_center = pc.fill_null(pc.equal(pc.utf8_lower(normalized), 'center'), False)
+        is_station = pc.invert(pc.or_(is_none, is_center))
+
+        unknown = pc.unique(pc.filter(normalized, is_station)).to_pylist()
+        unknown = [sid for sid in unknown if sid not in self._id_to_code]
+        if unknown:
+            self.register(unknown)
+
+        positions = pc.index_in(normalized, value_set=self._ids)
+        codes = pc.take(self._codes, pc.fill_null(positions, 0)) if len(self._ids) else \
+            pa.nulls(len(normalized), pa.int32())
+
+        codes = pc.if_else(is_center, pa.scalar(STATION_CODE_CENTER, pa.int32()), codes)
+        codes = pc.if_else(is_none, pa.scalar(STATION_CODE_NONE, pa.int32()), codes)
+        return codes
+
+    def decode(self, codes):
+        """int32 코드 배열을 대여소_ID 문자열 배열(numpy object)로 되돌립니다."""
+        codes = np.asarray(codes, dtype=np.int64)
+        if len(codes) and codes.max() >= self._next_code:
+            # 다른 프로세스가 등록한 코드가 있으면 사전을 다시 읽습니다.
+            self._load()
+
+        lookup = np.empty(self._next_code, dtype=object)
+        lookup[STATION_CODE_NONE] = RESERVED_STATION_IDS[STATION_CODE_NONE]
+        lookup[STATION_CODE_CENTER] = RESERVED_STATION_IDS[STATION_CODE_CENTER]
+        lookup[self._codes.to_numpy()] = self._ids.to_numpy(zero_copy_only=False)
+        return lookup[codes]
+
+
+_default_dictionary = None
+
+
+def load_station_dictionary(path=STATION_DICTIONARY_PATH):
+    """
+    대여소 사전을 불러옵니다. 사전 파일이 없으면 마스터 파일의 대여소_ID로 먼저 채웁니다.
+    기본 경로의 사전은 프로세스 내에서 한 번만 읽습니다.
+    """
+    global _default_dictionary
+    if path == STATION_DICTIONARY_PATH and _default_dictionary is not None:
+        return _default_dictionary
+
+    dictionary = StationDictionary(path)
+    if len(dictionary) == 0 and os.path.exists(MASTER_FILE_PATH):
+        master_ids = pd.read_csv(MASTER_FILE_PATH, encoding='cp949', usecols=['대여소_ID'])['대여소_ID']
+        dictionary.encode(master_ids.dropna().astype(str))
+
+    if path == STATION_DICTIONARY_PATH:
+        _default_dictionary = dictionary
+    return dictionary
+
+
+def encode_station_columns(table, dictionary=None):
+    """Arrow 테이블/배치의 시작/종료 대여소_ID 컬럼을 int32 코드로 바꿉니다."""
+    dictionary = dictionary or load_station_dictionary()
+    for name in STATION_ID_COLUMNS:
+        index = table.schema.get_field_index(name)
+        if index == -1 or pa.types.is_integer(table.schema.field(name).type):
+            continue
+        table = table.set_column(index, pa.field(name, pa.int32()), dictionary.encode(table.column(name)))
+    return table
+
+
+def decode_station_columns(df, dictionary=None):
+    """DataFrame의 대여소 코드 컬럼을 원래의 대여소_ID 문자열로 되돌립니다. (화면 표시/검증용)"""
+    dictionary = dictionary or load_station_dictionary()
+    df = df.copy()
+    for name in STATION_ID_COLUMNS:
+        if name in df.columns and pd.api.types.is_integer_dtype(df[name]):
+            df[name] = dictionary.decode(df[name].to_numpy())
+    return df
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from .mart_io import read_mart
+
 def load_station_summary_data():
     file_path = os.path.join('data', '03', 'station_summary.parquet')
     
@@ -10,7 +12,7 @@ def load_station_summary_data():
         return pd.DataFrame()
         
     try:
-        df = pd.read_parquet(file_path)
+        df = read_mart(file_path)
         print(f"✅ 대여소 요약 데이터 로드 성공: {len(df):,}개 대여소")
         return df
     except Exception as e:
@@ -27,7 +29,7 @@ def load_route_summary_data():
         return pd.DataFrame()
         
     try:
-        df = pd.read_parquet(file_path)
+        df = read_mart(file_path)
         print(f"✅ 경로 요약 데이터 로드 성공: {len(df):,}개 경로")
         return df
     except Exception as e:
@@ -1,25 +1,122 @@
 import pandas as pd
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
 
+from .mart_io import read_mart
+
 SUMMARY_DATA_DIR = 'data/01'
 
+# 디코딩한 요약 테이블을 보관하는 LRU 캐시의 최대 항목 수
+# 키에 파일 수정 시각이 들어가므로 마트를 다시 만들면 자동으로 새로 읽습니다.
+SUMMARY_CACHE_SIZE = 64
+
+# 여러 연도의 파일을 동시에 읽을 스레드 수 (pyarrow는 읽기/디코딩 중 GIL을 해제합니다)
+SUMMARY_READ_WORKERS = 8
+
+# 롤업 큐브 레벨 (세밀한 순서) → 버킷 길이(분). 월은 길이가 달라 None입니다.
+# 각 레벨은 rollup_{level}_{year}.parquet에 (time: 버킷 시작 시각, total_rentals) 두 컬럼으로 저장됩니다.
+ROLLUP_LEVELS = {'5min': 5, '15min': 15, 'hour': 60, 'day': 1440, 'week': 10080, 'month': None}
+
+# 월 단위 이상의 해상도 → pandas 리샘플 규칙 (월 레벨에서 합칩니다)
+CALENDAR_RESOLUTIONS = {'month': 'MS', 'quarter': 'QS', 'year': 'YS'}
+
+# 고정 길이 리샘플의 기준 시각. 월요일 자정이므로 일/주 단위 버킷이 롤업 레벨의 경계와 맞습니다.
+ROLLUP_ORIGIN = pd.Timestamp('2000-01-03')
+
+_summary_cache = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+def _summary_file_path(kind, year):
+    return os.path.join(SUMMARY_DATA_DIR, f'summary_{kind}_{year}.parquet')
+
+
+def rollup_file_path(level, year):
+    return os.path.join(SUMMARY_DATA_DIR, f'rollup_{level}_{year}.parquet')
+
+
+def _cached(file_path, key, compute):
+    """
+    (파일 경로, 수정 시각, key)로 compute() 결과를 캐시합니다. 파일이 없으면 None을 반환합니다.
+    가장 오래 쓰이지 않은 항목부터 SUMMARY_CACHE_SIZE개를 넘지 않도록 지웁니다.
+    """
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cache_key = (file_path, mtime, key)
+    with _summary_cache_lock:
+        if cache_key in _summary_cache:
+            _summary_cache.move_to_end(cache_key)
+            return _summary_cache[cache_key]
+
+    # 읽기는 잠금 밖에서 수행하여 여러 연도를 동시에 읽을 수 있게 합니다.
+    value = compute()
+    with _summary_cache_lock:
+        _summary_cache[cache_key] = value
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return value
+
+
+def _read_years(read, years):
+    """read(year)를 연도별로 스레드 풀에서 동시에 실행하고, 결과를 years 순서대로 반환합니다."""
+    years = list(years)
+    if len(years) <= 1:
+        return [read(year) for year in years]
+    with ThreadPoolExecutor(max_workers=min(SUMMARY_READ_WORKERS, len(years))) as executor:
+        return list(executor.map(read, years))
+
+
+def clear_summary_cache():
+    """요약 테이블 캐시를 비웁니다."""
+    with _summary_cache_lock:
+        _summary_cache.clear()
+
+
+def read_summary(kind, year, month=None, day=None):
+    """
+    summary_{kind}_{year}.parquet를 읽습니다. (kind: 'monthly' 또는 'daily_hourly')
+    month/day 조건은 Parquet 읽기 필터로 전달하며, 결과는 캐시됩니다. 파일이 없으면 None을 반환합니다.
+    """
+    file_path = _summary_file_path(kind, year)
+    filters = [(column, '==', value) for column, value in (('month', month), ('day', day)) if value is not None]
+    return _cached(file_path, ('read', month, day),
+                   lambda: read_mart(file_path, filters=filters or None))
+
+
+def _hourly_mean(year, month=None):
+    """year(의 month) 일별/시간별 요약에서 시간대별 평균 이용 건수를 계산하고 캐시합니다."""
+    def compute():
+        df = read_summary('daily_hourly', year, month=month)
+        if df.empty:
+            return df
+        hourly_avg = df.groupby('hour')['total_rentals'].mean().reset_index()
+        hourly_avg.rename(columns={'total_rentals': 'avg_total_rentals'}, inplace=True)
+        hourly_avg['year'] = year
+        return hourly_avg
+
+    return _cached(_summary_file_path('daily_hourly', year), ('hourly_mean', month), compute)
+
+
 def load_summary_monthly_data(selected_years: Tuple[int, ...]) -> pd.DataFrame:
     df_list = []
-    
-    for year in selected_years:
-        file_path = os.path.join(SUMMARY_DATA_DIR, f'summary_monthly_{year}.parquet')
-        
-        if os.path.exists(file_path):
-            df = pd.read_parquet(file_path)
+
+    monthly_dfs = _read_years(lambda year: read_summary('monthly', year), selected_years)
+    for year, df in zip(selected_years, monthly_dfs):
+        if df is not None:
             df_list.append(df)
         else:
-            print(f"Warning: {file_path} not found. Skipping.")
+            print(f"Warning: {_summary_file_path('monthly', year)} not found. Skipping.")
 
     if not df_list:
         # 데이터가 없을 경우, 빈 DataFrame을 올바른 구조로 반환하여 에러 방지
         return pd.DataFrame(columns=['year', 'month', 'total_rentals'])
-    
+
     # 모든 연도의 데이터를 하나로 합칩니다.
     return pd.concat(df_list, ignore_index=True)
 
@@ -27,21 +124,15 @@ def load_summary_monthly_data(selected_years: Tuple[int, ...]) -> pd.DataFrame:
 def load_summary_daily_data(selected_years: Tuple[int, ...], selected_month: int, selected_day: int) -> pd.DataFrame:
     df_list = []
 
-    for year in selected_years:
-        file_path = os.path.join(SUMMARY_DATA_DIR, f'summary_daily_hourly_{year}.parquet')
-        
-        if os.path.exists(file_path):
-            df = pd.read_parquet(file_path)
-            
-            filtered_df = df[
-                (df['month'] == selected_month) &
-                (df['day'] == selected_day)
-            ]
-            
-            if not filtered_df.empty:
-                df_list.append(filtered_df)
-        else:
-            print(f"Warning: {file_path} not found. Skipping.")
+    # 월/일 조건은 Parquet 읽기 단계에서 걸러집니다.
+    daily_dfs = _read_years(
+        lambda year: read_summary('daily_hourly', year, month=selected_month, day=selected_day), selected_years
+    )
+    for year, filtered_df in zip(selected_years, daily_dfs):
+        if filtered_df is None:
+            print(f"Warning: {_summary_file_path('daily_hourly', year)} not found. Skipping.")
+        elif not filtered_df.empty:
+            df_list.append(filtered_df)
 
     if not df_list:
         return pd.DataFrame(columns=['year', 'month', 'day', 'hour', 'total_rentals'])
@@ -51,45 +142,108 @@ def load_summary_daily_data(selected_years: Tuple[int, ...], selected_month: int
 def load_summary_hourly_for_month(years, month):
     all_year_data = []
 
-    for year in years:
-        file_path = os.path.join(SUMMARY_DATA_DIR, f'summary_daily_hourly_{year}.parquet')
-
-        if os.path.exists(file_path):
-            df = pd.read_parquet(file_path)
-        
-        month_df = df[df['month'] == month]
-        
-        if not month_df.empty:
-            hourly_avg = month_df.groupby('hour')['total_rentals'].mean().reset_index()
-            hourly_avg.rename(columns={'total_rentals': 'avg_total_rentals'}, inplace=True)
-            hourly_avg['year'] = year
+    for year, hourly_avg in zip(years, _read_years(lambda year: _hourly_mean(year, month), years)):
+        if hourly_avg is None:
+            print(f"Warning: {year}년의 summary_daily_hourly 데이터를 찾을 수 없습니다.")
+        elif not hourly_avg.empty:
             all_year_data.append(hourly_avg)
-            
+
     if not all_year_data:
         return pd.DataFrame()
-        
+
     return pd.concat(all_year_data, ignore_index=True)
 
 def load_summary_hourly_for_year(years):
     all_year_data = []
 
-    for year in years:
-        file_path = os.path.join('data', '01', f'summary_daily_hourly_{year}.parquet')
-
-        try:
-            df = pd.read_parquet(file_path)
-
-            if not df.empty:
-                hourly_avg = df.groupby('hour')['total_rentals'].mean().reset_index()
-                hourly_avg.rename(columns={'total_rentals': 'avg_total_rentals'}, inplace=True)
-                hourly_avg['year'] = year
-                all_year_data.append(hourly_avg)
-                
-        except FileNotFoundError:
+    for year, hourly_avg in zip(years, _read_years(_hourly_mean, years)):
+        if hourly_avg is None:
             print(f"Warning: {year}년의 summary_daily_hourly 데이터를 찾을 수 없습니다.")
-            continue
-            
+        elif not hourly_avg.empty:
+            all_year_data.append(hourly_avg)
+
     if not all_year_data:
         return pd.DataFrame()
 
-    return pd.concat(all_year_data, ignore_index=True)
\ No newline at end of file
+    return pd.concat(all_year_data, ignore_index=True)
+
+
+def choose_rollup_level(resolution):
+    """
+    요청 해상도를 그대로 또는 버킷을 합쳐서 만들 수 있는 가장 거친 롤업 레벨을 고릅니다.
+    resolution은 레벨 이름('5min', 'hour', 'week' 등), 'month'/'quarter'/'year',
+    또는 pandas 시간 간격 문자열('30min', '2h', '14D' 등)입니다.
+    """
+    if resolution in ROLLUP_LEVELS:
+        return resolution
+    if resolution in CALENDAR_RESOLUTIONS:
+        return 'month'
+
+    minutes = pd.to_timedelta(resolution).total_seconds() / 60
+    levels = [level for level, size in ROLLUP_LEVELS.items() if size and minutes >= size and minutes % size == 0]
+    if not levels:
+        raise ValueError(f"롤업 큐브로 만들 수 없는 해상도입니다: {resolution}")
+    return levels[-1]
+
+
+def _rollup_table(level, year):
+    """rollup_{level}_{year}.parquet 전체를 읽고 캐시합니다. 파일이 없으면 None"""
+    file_path = rollup_file_path(level, year)
+    return _cached(file_path, ('rollup',), lambda: read_mart(file_path))
+
+
+def query_rollup(start, end, resolution='hour'):
+    """
+    [start, end) 구간의 이용 건수를 resolution 단위로 집계합니다. 원본 Parquet는 읽지 않습니다.
+    요청을 만들 수 있는 가장 거친 레벨의 파일만 읽고, 레벨과 해상도가 다르면 버킷을 합칩니다.
+    버킷은 시작 시각 기준으로 구간에 포함되며, 이용 기록이 없는 버킷은 결과에 없습니다.
+
+    Returns:
+        DataFrame[time, total_rentals]
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    level = choose_rollup_level(resolution)
+    years = list(range(start.year, (end - pd.Timedelta(1, 'ns')).year + 1))
+
+    df_list = []
+    for year, df in zip(years, _read_years(lambda year: _rollup_table(level, year), years)):
+        if df is None:
+            print(f"Warning: {rollup_file_path(level, year)} not found. Skipping.")
+        elif not df.empty:
+            df_list.append(df[(df['time'] >= start) & (df['time'] < end)])
+
+    if not df_list:
+        return pd.DataFrame(columns=['time', 'total_rentals'])
+
+    # 연말/연초에 걸친 주 버킷은 두 연도 파일에 나뉘어 있으므로 시각별로 합칩니다.
+    df = pd.concat(df_list, ignore_index=True).groupby('time', as_index=False)['total_rentals'].sum()
+    # 메모리 맵(IPC) 경로는 pd.ArrowDtype 컬럼을 반환하는데, 이 경우 resample(on='time')이 인덱스 이름을
+    # 잃어 'time' 대신 'index' 컬럼이 생깁니다. 읽는 경로와 관계없이 같은 스키마가 되도록 numpy dtype으로 맞춥니다.
+    df['time'] = df['time'].astype('datetime64[ns]')
+    df['total_rentals'] = df['total_rentals'].astype('int64')
+    if resolution == level:
+        return df
+
+    rule = CALENDAR_RESOLUTIONS.get(resolution)
+    if rule is not None:
+        resampled = df.resample(rule, on='time')['total_rentals'].sum(min_count=1)
+    else:
+        resampled = df.resample(pd.to_timedelta(resolution), on='time', origin=ROLLUP_ORIGIN)['total_rentals'].sum(min_count=1)
+    return resampled.dropna().astype('int64').reset_index()
+
+
+def rollup_time_of_day(start, end, resolution='5min'):
+    """
+    [start, end) 구간에서 하루 중 시각(resolution 단위)별 평균 이용 건수를 계산합니다. (출퇴근 시간대 분석용)
+    평균은 해당 시각에 이용 기록이 있는 날들로 계산합니다.
+
+    Returns:
+        DataFrame[minute_of_day, avg_total_rentals]
+    """
+    df = query_rollup(start, end, resolution)
+    if df.empty:
+        return pd.DataFrame(columns=['minute_of_day', 'avg_total_rentals'])
+    times = pd.to_datetime(df['time'])
+    minute_of_day = (times.dt.hour * 60 + times.dt.minute).rename('minute_of_day')
+    slot_avg = df['total_rentals'].astype('float64').groupby(minute_of_day).mean()
+    return slot_avg.rename('avg_total_rentals').reset_index()
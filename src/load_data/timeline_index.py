@@ -0,0 +1,204 @@
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .summary_data_load import SUMMARY_DATA_DIR
+
+# 전체 기간의 시간 단위 타임라인에 대한 누적합(prefix sum) 색인
+# 임의 기간의 합계/평균은 누적합 배열 두 행의 차이로 계산하므로, 기간 길이와 관계없이 파일을 다시 읽지 않습니다.
+# 배열은 .npy로 저장하여 메모리 맵으로 열며, 마지막 축은 [이용 건수, 관측 수]입니다.
+#   hourly_cumsum.npy       (시간 수 + 1, 2)      시간별 이용 건수 / 이용 기록이 있는 시간 수
+#   hour_of_day_cumsum.npy  (일 수 + 1, 24, 2)    시(0~23)별 이용 건수 / 해당 시에 이용 기록이 있는 일 수
+#   weekday_cumsum.npy      (일 수 + 1, 7, 2)     요일(월=0)별 일 이용 건수 / 이용 기록이 있는 일 수
+TIMELINE_DIR = os.path.join(SUMMARY_DATA_DIR, 'timeline')
+TIMELINE_META_FILENAME = 'meta.json'
+TIMELINE_ARRAYS = ['hourly_cumsum', 'hour_of_day_cumsum', 'weekday_cumsum']
+
+HOURS_PER_DAY = 24
+WEEKDAY_LABELS = ['월', '화', '수', '목', '금', '토', '일']
+
+_DAILY_HOURLY_PATTERN = re.compile(r'summary_daily_hourly_(\d{4})\.parquet$')
+
+# load_timeline_index() 결과 (meta.json 수정 시각이 같으면 다시 열지 않습니다)
+_loaded_index = {'mtime': None, 'index': None}
+
+
+def _timeline_path(name, timeline_dir=TIMELINE_DIR):
+    return os.path.join(timeline_dir, f'{name}.npy')
+
+
+def _save_array(path, array):
+    """배열을 임시 파일에 쓴 뒤 교체하여 저장합니다."""
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(temp_path, path)
+
+
+def _prefix_sum(values):
+    """첫 축을 따라 누적합을 구하고 맨 앞에 0 행을 붙입니다. (합계 = cumsum[끝] - cumsum[시작])"""
+    cumsum = np.zeros((len(values) + 1,) + values.shape[1:], dtype=np.int64)
+    np.cumsum(values, axis=0, out=cumsum[1:])
+    return cumsum
+
+
+def build_timeline_index(summary_dir=SUMMARY_DATA_DIR, timeline_dir=TIMELINE_DIR):
+    """
+    data/01의 일별/시간별 요약 전체로 누적합 색인을 만듭니다. 첫 연도 1월 1일부터 마지막 연도 말까지의
+    연속된 시간 축을 쓰며, 요약 파일이 없는 연도는 0으로 채웁니다.
+
+    Returns:
+        색인에 포함된 연도 목록
+    """
+    years = sorted(
+        int(match.group(1)) for match in
+        (_DAILY_HOURLY_PATTERN.search(path) for path in glob.glob(os.path.join(summary_dir, 'summary_daily_hourly_*.parquet')))
+        if match
+    )
+    if not years:
+        return []
+
+    start = np.datetime64(f'{years[0]}-01-01', 'D')
+    num_days = int((np.datetime64(f'{years[-1] + 1}-01-01', 'D') - start).astype(np.int64))
+    rentals = np.zeros((num_days, HOURS_PER_DAY), dtype=np.int64)
+    observed = np.zeros((num_days, HOURS_PER_DAY), dtype=np.int64)
+
+    for year in years:
+        df = pd.read_parquet(os.path.join(summary_dir, f'summary_daily_hourly_{year}.parquet'))
+        dates = pd.to_datetime(dict(year=df['year'], month=df['month'], day=df['day'])).to_numpy().astype('datetime64[D]')
+        days = (dates - start).astype(np.int64)
+        hours = df['hour'].to_numpy(dtype=np.int64)
+        rentals[days, hours] = df['total_rentals'].to_numpy(dtype=np.int64)
+        observed[days, hours] = 1
+
+    # 요일: 1970-01-01(epoch 0일)은 목요일이므로 (epoch 일 수 + 3) % 7이 월=0 기준 요일입니다.
+    weekdays = (start.astype(np.int64) + np.arange(num_days) + 3) % 7
+    weekday_onehot = np.eye(7, dtype=np.int64)[weekdays]
+    daily_rentals = rentals.sum(axis=1)
+    daily_observed = observed.any(axis=1).astype(np.int64)
+
+    arrays = {
+        'hourly_cumsum': _prefix_sum(np.stack([rentals.ravel(), observed.ravel()], axis=-1)),
+        'hour_of_day_cumsum': _prefix_sum(np.stack([rentals, observed], axis=-1)),
+        'weekday_cumsum': _prefix_sum(np.stack([
+            weekday_onehot * daily_rentals[:, None], weekday_onehot * daily_observed[:, None]
+        ], axis=-1)),
+    }
+
+    os.makedirs(timeline_dir, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(_timeline_path(name, timeline_dir), array)
+
+    # meta.json을 마지막에 기록하여, 읽는 쪽이 배열 교체가 끝난 뒤에만 새 색인을 엽니다.
+    meta_path = os.path.join(timeline_dir, TIMELINE_META_FILENAME)
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'start': str(start), 'num_days': num_days, 'years': years}, f, ensure_ascii=False, indent=2)
+    os.replace(f'{meta_path}.tmp', meta_path)
+    return years
+
+
+def load_timeline_index(timeline_dir=TIMELINE_DIR):
+    """
+    누적합 색인을 메모리 맵으로 엽니다. 색인이 없으면 None을 반환합니다.
+    meta.json이 바뀌지 않았으면 이미 연 배열을 그대로 씁니다.
+    """
+    meta_path = os.path.join(timeline_dir, TIMELINE_META_FILENAME)
+    try:
+        mtime = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _loaded_index['index'] is None or _loaded_index['mtime'] != mtime:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index = {name: np.load(_timeline_path(name, timeline_dir), mmap_mode='r') for name in TIMELINE_ARRAYS}
+        index['start'] = np.datetime64(meta['start'], 'D')
+        index['num_days'] = meta['num_days']
+        index['years'] = meta['years']
+        _loaded_index.update(mtime=mtime, index=index)
+    return _loaded_index['index']
+
+
+def _day_bounds(index, start_date, end_date):
+    """[start_date, end_date] (양 끝 포함) 날짜 구간을 색인의 [시작 일, 끝 일) 위치로 바꿉니다."""
+    first = int((np.datetime64(pd.Timestamp(start_date).date(), 'D') - index['start']).astype(np.int64))
+    last = int((np.datetime64(pd.Timestamp(end_date).date(), 'D') - index['start']).astype(np.int64)) + 1
+    first = min(max(first, 0), index['num_days'])
+    last = min(max(last, first), index['num_days'])
+    return first, last
+
+
+def range_total(start_date, end_date, index=None):
+    """
+    [start_date, end_date] 기간(양 끝 포함)의 총 이용 건수와 이용 기록이 있는 시간 수.
+    Returns:
+        (총 이용 건수, 관측 시간 수). 색인이 없으면 None
+    """
+    index = load_timeline_index() if index is None else index
+    if index is None:
+        return None
+    first, last = _day_bounds(index, start_date, end_date)
+    cumsum = index['hourly_cumsum']
+    total, observed = cumsum[last * HOURS_PER_DAY] - cumsum[first * HOURS_PER_DAY]
+    return int(total), int(observed)
+
+
+def hourly_profile(start_date, end_date, index=None):
+    """
+    [start_date, end_date] 기간의 시간대별 평균 이용 건수 (해당 시에 이용 기록이 있는 날들의 평균).
+    load_summary_hourly_for_month/for_year와 같은 기준의 값을 임의 기간에 대해 계산합니다.
+
+    Returns:
+        DataFrame[hour, avg_total_rentals, total_rentals]
+    """
+    index = load_timeline_index() if index is None else index
+    if index is None:
+        return pd.DataFrame(columns=['hour', 'avg_total_rentals', 'total_rentals'])
+    first, last = _day_bounds(index, start_date, end_date)
+    cumsum = index['hour_of_day_cumsum']
+    totals, observed = (cumsum[last] - cumsum[first]).T
+    present = observed > 0
+    return pd.DataFrame({
+        'hour': np.arange(HOURS_PER_DAY)[present],
+        'avg_total_rentals': totals[present] / observed[present],
+        'total_rentals': totals[present],
+    })
+
+
+def weekday_profile(start_date, end_date, index=None):
+    """
+    [start_date, end_date] 기간의 요일별 일평균 이용 건수 (이용 기록이 있는 날들의 평균).
+
+    Returns:
+        DataFrame[weekday, 요일, avg_daily_rentals, total_rentals]
+    """
+    index = load_timeline_index() if index is None else index
+    if index is None:
+        return pd.DataFrame(columns=['weekday', '요일', 'avg_daily_rentals', 'total_rentals'])
+    first, last = _day_bounds(index, start_date, end_date)
+    cumsum = index['weekday_cumsum']
+    totals, observed = (cumsum[last] - cumsum[first]).T
+    present = np.flatnonzero(observed > 0)
+    return pd.DataFrame({
+        'weekday': present,
+        '요일': [WEEKDAY_LABELS[weekday] for weekday in present],
+        'avg_daily_rentals': totals[present] / observed[present],
+        'total_rentals': totals[present],
+    })
+
+
+def main():
+    print("--- 🧮 시간대별 누적합 색인 생성 ---")
+    years = build_timeline_index()
+    if years:
+        print(f"✅ {years[0]}~{years[-1]}년 색인을 '{TIMELINE_DIR}'에 저장했습니다.")
+    else:
+        print(f"⚠️ '{SUMMARY_DATA_DIR}'에 일별/시간별 요약 파일이 없습니다.")
+
+
+if __name__ == '__main__':
+    main()
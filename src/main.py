@@ -4,6 +4,7 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from src.load_data.data_load import load_parquet_year_data,load_station_data, load_population_data
+from src.load_data.station_dictionary import decode_station_columns
 
 # --- 페이지 설정 ---
 # layout="wide"로 변경하여 넓은 화면을 모두 사용합니다.
@@ -20,7 +21,8 @@ def get_parquet_sample_data():
     """Parquet 파일 제너레이터에서 첫 번째 청크의 상위 5개 행만 샘플로 반환합니다."""
     try:
         first_chunk = next(load_parquet_year_data(2020))
-        return first_chunk.head()
+        # 대여소_ID는 정수 코드로 저장되어 있으므로 화면에는 원래 ID로 보여줍니다.
+        return decode_station_columns(first_chunk.head())
     except Exception as e:
         st.error(f"Parquet 데이터 로딩 중 오류 발생: {e}")
         return None
@@ -110,8 +112,9 @@ def main_page():
         st.info(
             """
             **주요 컬럼 설명:**
-            - `동별(1)`, `동별(2)`: 행정구역을 나타냅니다.
-            - `'YYYY Q/Q'` 형태의 컬럼: 각 연도/분기별 인구수를 나타내는 다중 헤더 구조를 가집니다.
+            - `자치구`: 행정구역(자치구)을 나타냅니다. `'소계'`는 서울시 전체입니다.
+            - `연도`, `분기`: 인구 집계 시점입니다. (원본의 연도만 있는 컬럼은 전년도 4분기로 변환됩니다)
+            - `인구수`: 해당 분기의 등록 인구수입니다.
             """, icon="✅"
         )
         population_df = get_population_data()
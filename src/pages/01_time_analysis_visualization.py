@@ -1,23 +1,18 @@
 import streamlit as st
 import altair as alt
 import pandas as pd
-import numpy as np
 import load_data.summary_data_load as sdl
+import load_data.timeline_index as tli
+from load_data.catalog import available_years
 
 # --- 설정 ---
 st.set_page_config(page_title="시간 패턴 비교 분석", page_icon="📅", layout="wide")
 
-# --- 전역 옵션: 정규화 토글 ---
-APPLY_NORMALIZATION = True       # True면 불러오는 모든 데이터에서 카운트를 divisor로 나눕니다.
-NORMALIZATION_DIVISOR = 2        # 나눌 값 (이번 케이스는 2)
-# 특정 컬럼만 정규화하고 싶으면 리스트로 지정, None이면 자동탐지 (total/ count / rental / return 포함)
-NORMALIZE_COLUMNS = None
-
 # --- Session State 초기화 ---
 def init_session_state():
     session_keys = [
         'monthly_results', 'daily_hourly_results',
-        'monthly_hourly_results', 'yearly_hourly_results'
+        'monthly_hourly_results', 'yearly_hourly_results', 'rush_hour_results'
     ]
     for key in session_keys:
         if key not in st.session_state:
@@ -25,64 +20,36 @@ def init_session_state():
 
 init_session_state()
 
-# --- 유틸리티: 카운트 정규화 함수 ---
-def normalize_count_columns(df, divisor=NORMALIZATION_DIVISOR, columns=NORMALIZE_COLUMNS):
-    """
-    DataFrame의 카운트 계열 컬럼을 안전하게 숫자형으로 변환한 뒤 divisor로 나눕니다.
-    - columns가 None이면 자동 탐지 (컬럼명에 total/count/rental/return 포함)
-    - 나눗셈 결과가 정수에 매우 근접하면 int로 캐스팅합니다.
-    """
-    if df is None:
-        return df
-    # 빈 데이터프레임이면 바로 반환
-    if hasattr(df, "empty") and df.empty:
-        return df
-
-    df = df.copy()
-
-    # 자동 컬럼 탐지
-    if columns is None:
-        candidate_cols = [c for c in df.columns if any(k in c.lower() for k in ['total','count','rental','return'])]
-    else:
-        candidate_cols = [c for c in columns if c in df.columns]
-
-    if not candidate_cols:
-        return df
-
-    for c in candidate_cols:
-        # 안전하게 숫자형 변환
-        num = pd.to_numeric(df[c], errors='coerce').fillna(0)
-        divided = num / divisor
-
-        # 정수에 가까운 값이면 int로 변환 (오차 허용)
-        if np.all(np.isclose(divided, divided.round(), atol=1e-8)):
-            df[c] = divided.round().astype(int)
-        else:
-            # 소수점이 필요한 경우 소수로 유지 (소수 둘째자리로 반올림)
-            df[c] = divided.round(2)
-
-    return df
-
-# --- 데이터 분석 캐싱 함수 (로드 시 정규화 적용) ---
+# --- 데이터 분석 캐싱 함수 ---
+# 원본 수집 단계에서 중복 행을 제거하므로 마트의 건수를 그대로 사용합니다.
 @st.cache_data
 def get_monthly_data(years):
-    df = sdl.load_summary_monthly_data(years)
-    return normalize_count_columns(df) if APPLY_NORMALIZATION else df
+    return sdl.load_summary_monthly_data(years)
 
 @st.cache_data
 def get_daily_hourly_data(years, month, day):
-    df = sdl.load_summary_daily_data(years, month, day)
-    return normalize_count_columns(df) if APPLY_NORMALIZATION else df
+    return sdl.load_summary_daily_data(years, month, day)
 
 @st.cache_data
 def get_monthly_hourly_data(years, month):
-    df = sdl.load_summary_hourly_for_month(years, month)
-    return normalize_count_columns(df) if APPLY_NORMALIZATION else df
+    return sdl.load_summary_hourly_for_month(years, month)
 
 @st.cache_data
 def get_yearly_hourly_data(years):
-    df = sdl.load_summary_hourly_for_year(years)
-    return normalize_count_columns(df) if APPLY_NORMALIZATION else df
+    return sdl.load_summary_hourly_for_year(years)
+
+@st.cache_data
+def get_rush_hour_data(years, month, resolution):
+    """연도별로 해당 월의 하루 중 시각별 평균 이용 건수 (롤업 큐브에서 조회)"""
+    df_list = []
+    for year in years:
+        start = pd.Timestamp(year=year, month=month, day=1)
+        df = sdl.rollup_time_of_day(start, start + pd.offsets.MonthBegin(1), resolution)
+        if not df.empty:
+            df_list.append(df.assign(year=year))
+    if not df_list:
+        return pd.DataFrame(columns=['minute_of_day', 'avg_total_rentals', 'year'])
+    return pd.concat(df_list, ignore_index=True)
 
 # --- 기존 유틸리티 함수들 (원본 유지) ---
 def calculate_peak_hours(df, value_col):
@@ -100,11 +67,12 @@ def calculate_peak_hours(df, value_col):
     return peak_hour, off_peak_hour
 
 def create_year_selector(label, key_prefix, default_years=[2023, 2024]):
-    """연도 선택기 생성"""
+    """연도 선택기 생성 (선택지는 카탈로그에 기록된 요약 마트 연도)"""
+    options = available_years('summary_daily_hourly', default=range(2020, 2026))
     return st.multiselect(
         label,
-        options=list(range(2020, 2026)),
-        default=default_years,
+        options=options,
+        default=[year for year in default_years if year in options],
         key=f"{key_prefix}_year_select"
     )
 
@@ -124,7 +92,7 @@ def display_metrics_grid(data_dict, cols_per_row=3):
                     st.metric(label=label, value=value)
 
 def create_hourly_chart_column(year, hourly_df, date_info, value_col='total_rentals', chart_color="#3498DB"):
-    """시간대별 차트 컬럼 생성 (데이터는 이미 정규화되어 있다고 가정)"""
+    """시간대별 차트 컬럼 생성"""
     st.write(f"#### {date_info}")
 
     # 안전하게 숫자형으로 변환
@@ -226,7 +194,9 @@ else:
 st.title("🕒 시간대별 이용량 비교 분석")
 st.markdown("---")
 
-tab1, tab2, tab3 = st.tabs(["[ 🗓️ 특정일 기준 ]", "[ 🈷️ 특정월 기준 ]", "[ 🎉 특정년 기준]"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "[ 🗓️ 특정일 기준 ]", "[ 🈷️ 특정월 기준 ]", "[ 🎉 특정년 기준]", "[ ⏱️ 출퇴근 5분 단위 ]", "[ 📆 기간 지정 ]"
+])
 
 # --- Tab 1: 특정일 기준 ---
 with tab1:
@@ -364,3 +334,124 @@ with tab3:
                     create_hourly_chart_column(year, hourly_df, date_info, 'avg_total_rentals', "#2ECC71")
     else:
         st.info("위 필터에서 연도를 선택하고 '연도별 시간대 패턴 분석' 버튼을 눌러주세요.")
+
+# --- Tab 4: 출퇴근 시간대 (5분 단위) ---
+with tab4:
+    st.info("비교하고 싶은 여러 연도와 하나의 월을 선택하여, 출퇴근 시간대의 **5분/15분 단위 평균 이용 패턴**을 비교합니다.", icon="💡")
+
+    resolution_labels = {'5min': '5분', '15min': '15분', 'hour': '1시간'}
+    with st.container():
+        cols = st.columns([2, 1, 1, 1.5])
+        with cols[0]:
+            selected_years_rush = create_year_selector("연도 선택", "rush_hour")
+        with cols[1]:
+            selected_month_rush = st.selectbox(
+                "월 선택",
+                options=list(range(1, 13)),
+                format_func=lambda m: f"{m}월",
+                key="rush_hour_month_select"
+            )
+        with cols[2]:
+            selected_resolution_rush = st.selectbox(
+                "집계 단위",
+                options=list(resolution_labels),
+                format_func=lambda r: resolution_labels[r],
+                key="rush_hour_resolution_select"
+            )
+        with cols[3]:
+            st.write("")
+            if st.button("📈 출퇴근 시간대 분석", use_container_width=True, key="rush_hour_run_button"):
+                if not selected_years_rush:
+                    st.error("분석을 위해 연도를 선택해주세요.", icon="🚨")
+                    st.session_state.rush_hour_results = None
+                else:
+                    with st.spinner("롤업 큐브에서 시간대별 평균 데이터를 조회 중입니다..."):
+                        st.session_state.rush_hour_results = get_rush_hour_data(
+                            years=tuple(sorted(selected_years_rush)),
+                            month=selected_month_rush,
+                            resolution=selected_resolution_rush
+                        )
+
+    # 출퇴근 시간대 결과 시각화 (시간 범위는 조회 없이 바로 바뀝니다)
+    if st.session_state.rush_hour_results is not None:
+        results_df = st.session_state.rush_hour_results
+        st.markdown("---")
+        st.subheader("📊 분석 결과")
+
+        if results_df.empty:
+            st.warning("선택하신 조건에 해당하는 데이터가 없습니다.")
+        else:
+            start_hour, end_hour = st.slider("표시할 시간 범위 (시)", 0, 24, (6, 10), key="rush_hour_range")
+            window_df = results_df[
+                (results_df['minute_of_day'] >= start_hour * 60) & (results_df['minute_of_day'] < end_hour * 60)
+            ].copy()
+            window_df['time'] = window_df['minute_of_day'].map(lambda m: f"{m // 60:02d}:{m % 60:02d}")
+
+            peak_rows = window_df.loc[window_df.groupby('year')['avg_total_rentals'].idxmax()]
+            display_metrics_grid({
+                f"{int(row.year)}년 최고 시각": f"{row.time} ({row.avg_total_rentals:,.0f} 건)"
+                for row in peak_rows.itertuples()
+            })
+
+            rush_chart = alt.Chart(window_df).mark_line(point=True).encode(
+                x=alt.X('time:O', title='시각', axis=alt.Axis(labelAngle=-45)),
+                y=alt.Y('avg_total_rentals:Q', title='평균 이용 건수'),
+                color=alt.Color('year:N', title='연도'),
+                tooltip=['year', 'time', alt.Tooltip('avg_total_rentals:Q', format=',.1f')]
+            ).properties(height=500).interactive()
+            st.altair_chart(rush_chart, use_container_width=True)
+
+# --- Tab 5: 기간 지정 ---
+# 누적합 색인의 배열 차이로 계산하므로 기간을 바꿀 때마다 파일을 읽지 않고 바로 결과가 바뀝니다.
+with tab5:
+    st.info("원하는 기간을 자유롭게 지정하여 총 이용 건수, **평균 시간대별 이용 패턴**, 요일별 일평균 이용량을 확인합니다.", icon="💡")
+
+    timeline_index = tli.load_timeline_index()
+    if timeline_index is None:
+        st.warning("누적합 색인이 없습니다. 시간 분석 데이터 마트를 먼저 생성해주세요.")
+    else:
+        first_date = pd.Timestamp(str(timeline_index['start'])).date()
+        last_date = (pd.Timestamp(str(timeline_index['start'])) + pd.Timedelta(days=timeline_index['num_days'] - 1)).date()
+        selected_range = st.date_input(
+            "기간 선택",
+            value=(max(first_date, last_date.replace(month=1, day=1)), last_date),
+            min_value=first_date,
+            max_value=last_date,
+            key="range_date_input"
+        )
+
+        if len(selected_range) != 2:
+            st.info("시작일과 종료일을 모두 선택해주세요.")
+        else:
+            start_date, end_date = selected_range
+            total_rentals, observed_hours = tli.range_total(start_date, end_date, timeline_index)
+            hourly_df = tli.hourly_profile(start_date, end_date, timeline_index)
+            weekday_df = tli.weekday_profile(start_date, end_date, timeline_index)
+
+            if total_rentals == 0:
+                st.warning("선택하신 기간에 해당하는 데이터가 없습니다.")
+            else:
+                st.markdown("---")
+                st.subheader(f"📊 {start_date} ~ {end_date} 분석 결과")
+                peak_hour, off_peak_hour = calculate_peak_hours(hourly_df, 'avg_total_rentals')
+                busiest_weekday = weekday_df.loc[weekday_df['avg_daily_rentals'].idxmax(), '요일']
+                display_metrics_grid({
+                    "총 이용 건수": f"{total_rentals:,} 건",
+                    "시간당 평균 이용 건수": f"{total_rentals / observed_hours:,.1f} 건",
+                    "최고 시간대 (평균)": f"{peak_hour} 시" if peak_hour != "N/A" else "N/A",
+                    "최저 시간대 (평균)": f"{off_peak_hour} 시" if off_peak_hour != "N/A" else "N/A",
+                    "가장 붐비는 요일 (일평균)": f"{busiest_weekday}요일",
+                })
+
+                chart_cols = st.columns(2)
+                with chart_cols[0]:
+                    st.write("#### 평균 시간대별 이용 건수")
+                    st.bar_chart(hourly_df, x='hour', y='avg_total_rentals', color="#9B59B6")
+                with chart_cols[1]:
+                    st.write("#### 요일별 일평균 이용 건수")
+                    weekday_chart = alt.Chart(weekday_df).mark_bar(color="#E67E22").encode(
+                        x=alt.X('요일:N', sort=tli.WEEKDAY_LABELS, title='요일', axis=alt.Axis(labelAngle=0)),
+                        y=alt.Y('avg_daily_rentals:Q', title='일평균 이용 건수'),
+                        tooltip=['요일', alt.Tooltip('avg_daily_rentals:Q', format=',.0f')]
+                    )
+                    st.altair_chart(weekday_chart, use_container_width=True)
@@ -5,6 +5,7 @@ import altair as alt
 
 # src.load_data.distance_data_load 모듈에 load_yearly_summary_data 함수가 있다고 가정합니다.
 from load_data.distance_data_load import load_yearly_summary_data
+from load_data.catalog import available_years as catalog_years
 
 # --- 페이지 기본 설정 ---
 st.set_page_config(page_title="연도별 이용 시간/거리 패턴 분석", page_icon="🚴‍♀️", layout="wide")
@@ -41,11 +42,12 @@ with st.container(border=True):
     cols = st.columns([3, 1])
     
     with cols[0]:
-        available_years = list(range(2020, 2026))
+        # 카탈로그에 기록된 원본 데이터 연도 (카탈로그가 없으면 기본 범위)
+        available_years = catalog_years('distance_time', default=range(2020, 2026))
         selected_years = st.multiselect(
             "비교할 연도 선택 (두 개 이상)", 
             options=available_years, 
-            default=[2021, 2022, 2023, 2024],
+            default=[year for year in [2021, 2022, 2023, 2024] if year in available_years],
             placeholder="비교할 연도를 선택하세요"
         )
     
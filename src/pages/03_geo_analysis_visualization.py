@@ -3,6 +3,7 @@ import pandas as pd
 import altair as alt
 
 from load_data.station_route_data_load import load_station_summary_data, load_route_summary_data
+from load_data.station_day_index import load_station_day_index, station_day_range, station_period_summary
 
 st.set_page_config(page_title="지리 정보 기반 이용 행태 분석", page_icon="🗺️", layout="wide")
 
@@ -131,6 +132,62 @@ with tab1:
             inflow.index = inflow.index + 1
             st.dataframe(inflow[['전체주소', '순이동량']])
 
+        st.markdown("---")
+        st.subheader("📆 기간별 대여소 순위")
+        station_day_index = load_station_day_index()
+        if station_day_index is None:
+            st.info("대여소 × 일 누적합 행렬이 없습니다. 대여소 데이터 마트를 먼저 생성하면 기간별 순위를 볼 수 있습니다.")
+        else:
+            # 누적합 행렬의 두 행 차이로 계산하므로 기간/요일을 바꾸면 바로 다시 집계됩니다.
+            first_date, last_date = (pd.Timestamp(str(date)).date() for date in station_day_range(station_day_index))
+            weekday_options = {'전체': None, '평일': range(5), '주말': [5, 6]}
+            period_cols = st.columns([2, 1])
+            with period_cols[0]:
+                selected_period = st.date_input(
+                    "기간 선택",
+                    value=(max(first_date, last_date.replace(month=1, day=1)), last_date),
+                    min_value=first_date,
+                    max_value=last_date,
+                    key="station_period_input"
+                )
+            with period_cols[1]:
+                selected_weekday = st.radio("요일", options=list(weekday_options), horizontal=True, key="station_weekday_radio")
+
+            if len(selected_period) != 2:
+                st.info("시작일과 종료일을 모두 선택해주세요.")
+            else:
+                period_df = station_period_summary(*selected_period, weekdays=weekday_options[selected_weekday], index=station_day_index)
+                period_df = period_df.merge(station_df[['대여소_ID', '전체주소']], on='대여소_ID', how='inner')
+
+                if period_df.empty:
+                    st.warning("선택하신 기간에 해당하는 데이터가 없습니다.")
+                else:
+                    def ranking(df, by, ascending=False, columns=None):
+                        ranked = df.sort_values(by=by, ascending=ascending).head(20).reset_index(drop=True)
+                        ranked.index = ranked.index + 1
+                        return ranked[list(columns or ('전체주소', by))]
+
+                    rank_cols = st.columns(3)
+                    with rank_cols[0]:
+                        st.write("🏆 **대여 Top 20**")
+                        st.dataframe(ranking(period_df, '총_대여건수'))
+                    with rank_cols[1]:
+                        st.write("📤 **유출 Top 20 (공급 필요)**")
+                        st.dataframe(ranking(period_df, '순이동량'))
+                    with rank_cols[2]:
+                        st.write("📥 **유입 Top 20 (수거 필요)**")
+                        st.dataframe(ranking(period_df, '순이동량', ascending=True))
+
+                    # 이용 건수가 너무 적으면 비율이 우연히 극단값이 될 수 있으므로 최소 기준을 둡니다.
+                    min_usage_threshold = 100
+                    ratio_df = period_df[period_df['총_이용건수'] >= min_usage_threshold]
+                    st.write(f"⚖️ **쏠림 비율 (총 이용건수 {min_usage_threshold}건 이상)**")
+                    ratio_cols = st.columns(2)
+                    with ratio_cols[0]:
+                        st.dataframe(ranking(ratio_df, '쏠림_비율', columns=('전체주소', '총_이용건수', '쏠림_비율')).style.format({'쏠림_비율': '{:.2%}'}))
+                    with ratio_cols[1]:
+                        st.dataframe(ranking(ratio_df, '쏠림_비율', ascending=True, columns=('전체주소', '총_이용건수', '쏠림_비율')).style.format({'쏠림_비율': '{:.2%}'}))
+
         st.markdown("---")
         st.subheader("🗺️ 자전거 쏠림 현상 지도")
         st.info("지도 우측 상단의 컨트롤 박스를 통해 유출(🔴)/유입(🔵)/균형(⚫) 그룹을 선택하여 볼 수 있습니다.")
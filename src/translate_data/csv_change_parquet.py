@@ -1,27 +1,28 @@
-import pandas as pd
-import os
-import glob
-
-def convert_csvs_to_parquet_individually():
-    folder_path = './data/2025/'
-    output_folder = './data/parquet/'
-    os.makedirs(output_folder, exist_ok=True)
-
-    # CSV 파일 목록 정렬
-    csv_files = sorted(glob.glob(os.path.join(folder_path, '*.csv')))
-
-    # 월별 이름 생성: 202001 ~ 202012
-    for i, file in enumerate(csv_files, start=1):
-        month_str = f'2025{str(i).zfill(2)}'  # 01~12
-        output_file = os.path.join(output_folder, f'bycle_{month_str}.parquet')
-
-        try:
-            df = pd.read_csv(file, encoding='utf-8')
-            df.to_parquet(output_file, index=False)
-            print(f'✅ 저장 완료: {output_file}')
-        except Exception as e:
-            print(f'❌ 오류 발생: {file} → {e}')
-
-    print(f'\n🎉 총 {len(csv_files)}개의 CSV 파일이 Parquet로 변환되었습니다.')
-
-convert_csvs_to_parquet_individually()
+from src.translate_data.csv_ingest import infer_year_month, list_csv_sources, monthly_output_path
+from src.translate_data.ingest_runner import DEFAULT_WORKERS, IngestJob, run_ingest_jobs
+
+YEAR_TO_PROCESS = 2025
+SOURCE_FOLDER = f'./data/{YEAR_TO_PROCESS}/'
+OUTPUT_FOLDER = './data/parquet/'
+MAX_WORKERS = DEFAULT_WORKERS
+
+
+def convert_csvs_to_parquet_individually():
+    """
+    원본 월별 CSV(cp949)를 중간 CSV 없이 곧바로 월별 Parquet 파일로 변환합니다.
+    공공데이터 포털에서 받은 ZIP 파일은 압축을 풀지 않고 안의 CSV를 바로 읽습니다.
+    """
+    # CSV 파일(및 ZIP 안의 CSV) 목록 정렬
+    csv_files = list_csv_sources(SOURCE_FOLDER)
+
+    jobs = []
+    for i, file in enumerate(csv_files, start=1):
+        # 파일명에서 연월을 찾지 못하면 정렬 순서대로 01~12월을 부여합니다.
+        year, month = infer_year_month(file) or (YEAR_TO_PROCESS, i)
+        jobs.append(IngestJob([file], monthly_output_path(OUTPUT_FOLDER, year, month)))
+
+    run_ingest_jobs(jobs, max_workers=MAX_WORKERS)
+
+
+if __name__ == '__main__':
+    convert_csvs_to_parquet_individually()
@@ -0,0 +1,352 @@
+import glob
+import io
+import os
+import re
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from src.load_data.raw_dataset import RAW_SCHEMA, raw_file_path
+from src.load_data.station_dictionary import (
+    encode_station_columns,
+    load_station_dictionary,
+)
+
+# --- 표준 컬럼 정의 ---
+standard_columns = [
+    '기준_날짜', '집계_기준', '기준_시간대',
+    '시작_대여소_ID', '시작_대여소명',
+    '종료_대여소_ID', '종료_대여소명',
+    '전체_건수', '전체_이용_분', '전체_이용_거리'
+]
+
+# 컬럼이 7개일 경우의 컬럼 순서
+seven_columns = [
+    '기준_날짜', '기준_시간대',
+    '시작_대여소_ID',
+    '종료_대여소_ID',
+    '전체_건수', '전체_이용_분', '전체_이용_거리'
+]
+
+# CSV를 읽을 때의 컬럼 타입
+CSV_SCHEMA = pa.schema([
+    ('기준_날짜', pa.int64()),
+    ('집계_기준', pa.string()),
+    ('기준_시간대', pa.int64()),
+    ('시작_대여소_ID', pa.string()),
+    ('시작_대여소명', pa.string()),
+    ('종료_대여소_ID', pa.string()),
+    ('종료_대여소명', pa.string()),
+    ('전체_건수', pa.int64()),
+    ('전체_이용_분', pa.float64()),
+    ('전체_이용_거리', pa.float64()),
+])
+
+# ZIP 안의 CSV를 가리키는 원본 경로 구분자 (예: data/2025.zip::tpss_bcycl_od_202501.csv)
+ZIP_MEMBER_SEPARATOR = '::'
+# UTF-8 플래그가 없는 ZIP 내부 파일 이름의 인코딩 (공공데이터 포털 ZIP은 cp949)
+ZIP_NAME_ENCODING = 'cp949'
+
+# CSV 파서가 한 번에 읽는 블록 크기. 최대 메모리 사용량은 파일 크기가 아니라 이 값에 비례합니다.
+DEFAULT_BLOCK_SIZE = 16 << 20
+# Parquet row group 하나에 모을 행 수. 파일을 날짜/시간대 순으로 정렬해 기록하므로
+# row group을 작게 잡을수록 하루/한 시간 조회에서 건너뛸 수 있는 row group이 많아집니다.
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+
+# 원본 Parquet 파일의 정렬 기준: 날짜 → 5분 시간대 → 시작 대여소
+SORT_KEYS = [('기준_날짜', 'ascending'), ('기준_시간대', 'ascending'), ('시작_대여소_ID', 'ascending')]
+SORTING_COLUMNS = pq.SortingColumn.from_ordering(RAW_SCHEMA, SORT_KEYS)
+
+# 중복 행 판정에 사용하는 컬럼. 대여소명은 파일 형식(7개/10개 컬럼)에 따라 있거나 없으므로 제외합니다.
+DEDUP_KEY_COLUMNS = [
+    '기준_날짜', '기준_시간대', '시작_대여소_ID', '종료_대여소_ID',
+    '전체_건수', '전체_이용_분', '전체_이용_거리'
+]
+
+# 정렬 전 날짜별 임시 파일(Arrow IPC)의 스키마. 대여소명은 정렬 후에 사전 인코딩합니다.
+SPILL_SCHEMA = pa.schema([
+    field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+    for field in RAW_SCHEMA
+])
+
+
+def split_zip_source(source):
+    """'archive.zip::member.csv' 형태의 원본 경로를 (archive, member)로 나눕니다. 일반 파일이면 member는 None."""
+    source = os.fspath(source)
+    if ZIP_MEMBER_SEPARATOR in source:
+        archive, member = source.split(ZIP_MEMBER_SEPARATOR, 1)
+        return archive, member
+    return source, None
+
+
+def open_zip_member(source):
+    """ZIP 안의 CSV를 압축을 풀어 디스크에 쓰지 않고 스트림으로 엽니다."""
+    archive, member = split_zip_source(source)
+    with zipfile.ZipFile(archive, metadata_encoding=ZIP_NAME_ENCODING) as zf:
+        # ZipFile을 닫아도 열린 멤버 스트림은 읽을 수 있습니다.
+        return zf.open(member)
+
+
+def zip_member_info(source):
+    """ZIP 멤버의 ZipInfo (압축 해제 크기, CRC 등)"""
+    archive, member = split_zip_source(source)
+    with zipfile.ZipFile(archive, metadata_encoding=ZIP_NAME_ENCODING) as zf:
+        return zf.getinfo(member)
+
+
+def list_csv_sources(folder, recursive=False):
+    """
+    폴더 안의 CSV 파일과 ZIP 안의 CSV 멤버('archive.zip::member.csv')를 모두 찾아 정렬된 목록으로 반환합니다.
+    """
+    pattern = os.path.join(folder, '**', '*') if recursive else os.path.join(folder, '*')
+    sources = []
+    for path in glob.glob(pattern, recursive=recursive):
+        lower_path = path.lower()
+        if lower_path.endswith('.csv'):
+            sources.append(path)
+        elif lower_path.endswith('.zip'):
+            with zipfile.ZipFile(path, metadata_encoding=ZIP_NAME_ENCODING) as zf:
+                sources.extend(
+                    f'{path}{ZIP_MEMBER_SEPARATOR}{name}' for name in zf.namelist()
+                    if name.lower().endswith('.csv')
+                )
+    return sorted(sources)
+
+
+def read_header_fields(file_path, encoding='cp949'):
+    """CSV(또는 ZIP 안의 CSV) 첫 줄만 읽어 필드 목록을 반환합니다."""
+    if split_zip_source(file_path)[1] is None:
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            header_line = f.readline()
+    else:
+        with io.TextIOWrapper(open_zip_member(file_path), encoding=encoding, newline='') as f:
+            header_line = f.readline()
+    return [field.strip().lstrip('\ufeff') for field in header_line.rstrip('\r\n').split(',')]
+
+
+def detect_layout(header_fields):
+    """
+    헤더 필드를 보고 (컬럼 이름 목록, 건너뛸 행 수)를 결정합니다.
+    7개 컬럼 파일은 헤더가 없는 경우도 있으므로 첫 필드가 날짜(숫자)인지 확인합니다.
+    """
+    num_columns = len(header_fields)
+    has_header = not header_fields[0].isdigit()
+
+    if num_columns == 10:
+        return standard_columns, int(has_header)
+    if num_columns == 7:
+        return seven_columns, int(has_header)
+
+    raise ValueError(f"컬럼 개수가 10개 또는 7개가 아닙니다 (개수: {num_columns})")
+
+
+def open_csv_stream(file_path, encoding='cp949', block_size=DEFAULT_BLOCK_SIZE):
+    """
+    원본 CSV를 블록 단위로 읽는 스트리밍 리더를 엽니다.
+    cp949 디코딩은 블록별로 점진적으로 수행되며, 블록 파싱은 멀티스레드로 처리됩니다.
+    'archive.zip::member.csv'를 넘기면 ZIP 멤버를 압축 해제 스트림으로 바로 읽습니다.
+    """
+    column_names, skip_rows = detect_layout(read_header_fields(file_path, encoding))
+    source = file_path if split_zip_source(file_path)[1] is None else open_zip_member(file_path)
+
+    read_options = pv.ReadOptions(
+        column_names=column_names,
+        skip_rows=skip_rows,
+        encoding=encoding,
+        block_size=block_size,
+        use_threads=True,
+    )
+    convert_options = pv.ConvertOptions(
+        column_types={name: CSV_SCHEMA.field(name).type for name in column_names},
+        strings_can_be_null=True,
+    )
+    return pv.open_csv(source, read_options=read_options, convert_options=convert_options)
+
+
+def yyyymmdd_to_date32(values):
+    """정수 yyyymmdd 배열을 date32 배열로 변환합니다."""
+    timestamps = pc.strptime(pc.cast(values, pa.string()), format='%Y%m%d', unit='s')
+    return pc.cast(timestamps, pa.date32())
+
+
+def conform_raw_table(table, schema=RAW_SCHEMA):
+    """
+    Arrow 테이블/배치를 RAW_SCHEMA(또는 SPILL_SCHEMA)로 맞춥니다. 빠진(또는 전부 null인) 컬럼은 null로 채우고 RAW_SCHEMA에 없는
+    컬럼(집계_기준 등)은 버립니다. 값이 좁은 타입의 범위를 넘으면 cast에서 오류가 납니다.
+    """
+    arrays = []
+    for field in schema:
+        index = table.schema.get_field_index(field.name)
+        if index == -1 or pa.types.is_null(table.schema.field(index).type):
+            arrays.append(pa.nulls(table.num_rows, type=field.type))
+            continue
+
+        column = table.column(index)
+        if field.name == '기준_날짜' and pa.types.is_integer(column.type):
+            column = yyyymmdd_to_date32(column)
+        elif field.name == '전체_건수':
+            column = pc.fill_null(column, 0)
+        elif pa.types.is_dictionary(field.type) and not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+        arrays.append(pc.cast(column, field.type))
+
+    if isinstance(table, pa.RecordBatch):
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def to_standard_batch(batch, station_dictionary):
+    """
+    7개/10개 컬럼 배치(또는 기존 원본 Parquet 배치)를 SPILL_SCHEMA 배치로 맞춥니다.
+    대여소_ID는 대여소 사전의 코드로 바꾸고, 나머지 컬럼은 좁은 타입으로 변환합니다.
+    """
+    return conform_raw_table(encode_station_columns(batch, station_dictionary), SPILL_SCHEMA)
+
+
+def iter_parquet_standard_batches(file_path, station_dictionary):
+    """기존 원본 Parquet 파일을 row group 단위로 읽어 SPILL_SCHEMA 테이블로 돌려줍니다."""
+    with pq.ParquetFile(file_path) as parquet_file:
+        for index in range(parquet_file.num_row_groups):
+            yield to_standard_batch(parquet_file.read_row_group(index), station_dictionary)
+
+
+def _spill_by_day(batches, spill_dir):
+    """
+    SPILL_SCHEMA 배치(또는 테이블)를 날짜별 Arrow IPC 파일로 나눠 기록합니다.
+
+    Returns:
+        {날짜(또는 None): 임시 파일 경로}
+    """
+    writers = {}
+    try:
+        for batch in batches:
+            dates = batch.column(0)
+            for day in pc.unique(dates).to_pylist():
+                if day not in writers:
+                    name = 'null' if day is None else f'{day:%Y%m%d}'
+                    path = os.path.join(spill_dir, f'{name}.arrow')
+                    writers[day] = (path, pa.ipc.new_file(path, SPILL_SCHEMA))
+                mask = pc.is_null(dates) if day is None else pc.equal(dates, day)
+                writers[day][1].write(batch.filter(mask))
+    finally:
+        for _, writer in writers.values():
+            writer.close()
+
+    return {day: path for day, (path, _) in writers.items()}
+
+
+def row_hashes(table, columns=DEDUP_KEY_COLUMNS):
+    """키 컬럼 값으로 행마다 64비트 해시(uint64 배열)를 벡터 연산으로 계산합니다."""
+    key_df = table.select(columns).to_pandas(date_as_object=False)
+    return pd.util.hash_pandas_object(key_df, index=False).to_numpy()
+
+
+def drop_duplicate_rows(table):
+    """
+    키 컬럼이 모두 같은 행 중 첫 행만 남깁니다. (일별/월별 파일을 함께 병합할 때 생기는 중복)
+
+    Returns:
+        (중복을 제거한 테이블, 제거된 행 수)
+    """
+    _, first_index = np.unique(row_hashes(table), return_index=True)
+    duplicates = table.num_rows - len(first_index)
+    if duplicates == 0:
+        return table, 0
+    return table.take(np.sort(first_index)), duplicates
+
+
+def write_sorted_parquet(batches, output_path, row_group_size=DEFAULT_ROW_GROUP_SIZE,
+                         compression='snappy', compression_level=None, use_dictionary=True):
+    """
+    SPILL_SCHEMA 배치들을 (날짜, 시간대, 시작 대여소) 순으로 정렬하여 하나의 Parquet 파일로 기록합니다.
+
+    한 달 치를 한 번에 정렬하지 않도록 먼저 날짜별 임시 파일로 나눈 뒤(외부 정렬),
+    하루씩 읽어 중복 행을 제거하고 정렬합니다. 중복 판정용 해시도 하루 치만 메모리에 둡니다.
+    row group은 날짜 경계를 넘지 않으므로 row group 통계만으로 하루/시간대 조회를
+    가지치기할 수 있고, 페이지 인덱스도 함께 기록합니다.
+    compression/compression_level/use_dictionary는 ParquetWriter에 그대로 전달됩니다.
+
+    Returns:
+        (기록된 총 행 수, 제거된 중복 행 수)
+    """
+    output_dir = os.path.dirname(output_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    temp_path = f'{output_path}.tmp'
+    total_rows = 0
+    duplicate_rows = 0
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='.spill_', dir=output_dir) as spill_dir:
+            spill_files = _spill_by_day(batches, spill_dir)
+
+            with pq.ParquetWriter(temp_path, RAW_SCHEMA, compression=compression,
+                                  compression_level=compression_level, use_dictionary=use_dictionary,
+                                  write_page_index=True, sorting_columns=SORTING_COLUMNS) as writer:
+                for day in sorted(spill_files, key=lambda d: (d is None, d)):
+                    table, duplicates = drop_duplicate_rows(pa.ipc.open_file(spill_files[day]).read_all())
+                    table = table.sort_by(SORT_KEYS)
+                    writer.write_table(conform_raw_table(table), row_group_size=row_group_size)
+                    total_rows += table.num_rows
+                    duplicate_rows += duplicates
+
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return total_rows, duplicate_rows
+
+
+def is_sorted_raw_file(parquet_file):
+    """write_sorted_parquet로 기록된(정렬 정보가 있는) 원본 Parquet 파일인지 확인합니다."""
+    metadata = parquet_file.metadata
+    if metadata.num_row_groups == 0:
+        return True
+    return tuple(metadata.row_group(0).sorting_columns) == tuple(SORTING_COLUMNS)
+
+
+def convert_csv_to_parquet(source_files, output_path, encoding='cp949',
+                           block_size=DEFAULT_BLOCK_SIZE, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    하나 이상의 원본 CSV를 읽어 중복 행을 제거하고 정렬된 하나의 Parquet 파일로 기록합니다.
+    중간 CSV 파일을 만들지 않으며, 메모리에는 하루 치 데이터만 올립니다.
+
+    Returns:
+        (기록된 총 행 수, 제거된 중복 행 수)
+    """
+    if isinstance(source_files, (str, os.PathLike)):
+        source_files = [source_files]
+    station_dictionary = load_station_dictionary()
+
+    def standard_batches():
+        for file_path in source_files:
+            reader = open_csv_stream(file_path, encoding=encoding, block_size=block_size)
+            for batch in reader:
+                yield to_standard_batch(batch, station_dictionary)
+
+    return write_sorted_parquet(standard_batches(), output_path, row_group_size=row_group_size)
+
+
+def infer_year_month(file_path):
+    """
+    파일 경로에서 'YYYYMM' 형태의 연월을 찾아 반환합니다. 찾지 못하면 None.
+    ZIP 멤버는 멤버 이름을 먼저 보고, 없으면 ZIP 파일 이름에서 찾습니다.
+    """
+    archive, member = split_zip_source(file_path)
+    for name in filter(None, [member, archive]):
+        matches = re.findall(r'(20\d{2})(0[1-9]|1[0-2])', os.path.basename(name))
+        if matches:
+            year, month = matches[-1]
+            return int(year), int(month)
+    return None
+
+
+def monthly_output_path(output_folder, year, month):
+    """월별 원본 Parquet 파일 경로 (year=YYYY/month=MM/bycle_{YYYYMM}.parquet)"""
+    return raw_file_path(year, month, base_dir=output_folder)
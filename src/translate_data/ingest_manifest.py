@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+
+import pyarrow.parquet as pq
+
+from src.translate_data.csv_ingest import split_zip_source, zip_member_info
+
+# 이미 변환한 원본 CSV와 그 결과 Parquet 파일의 기록
+MANIFEST_PATH = os.path.join('data', 'ingest_manifest.json')
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    매니페스트를 불러옵니다. 파일이 없으면 빈 매니페스트를 반환합니다.
+
+    구조:
+        sources: {원본 경로: {size, mtime, hash, output}}
+        outputs: {출력 경로: {sources, rows, duplicates}}
+    """
+    if not os.path.exists(path):
+        return {'sources': {}, 'outputs': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.setdefault('sources', {})
+    manifest.setdefault('outputs', {})
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """매니페스트를 임시 파일에 쓴 뒤 교체하여 중간에 중단되어도 깨지지 않게 저장합니다."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def manifest_key(path):
+    """매니페스트에서 사용하는 경로 키 (구분자/상대 경로 표기를 통일)"""
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def file_sha256(path):
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_exists(path):
+    """원본 파일(또는 ZIP 멤버)이 존재하는지 확인합니다."""
+    archive, member = split_zip_source(path)
+    if member is None or not os.path.exists(archive):
+        return os.path.exists(archive)
+    try:
+        zip_member_info(path)
+    except KeyError:
+        return False
+    return True
+
+
+def source_stat(path):
+    """원본의 (크기, 수정 시각). ZIP 멤버는 (압축 해제 크기, ZIP 파일의 수정 시각)"""
+    archive, member = split_zip_source(path)
+    mtime = os.stat(archive).st_mtime
+    size = os.stat(path).st_size if member is None else zip_member_info(path).file_size
+    return size, mtime
+
+
+def content_hash(path):
+    """
+    원본 내용의 해시. 일반 파일은 SHA-256, ZIP 멤버는 ZIP 디렉터리에 기록된 CRC-32를 사용하므로
+    ZIP 멤버는 압축을 풀지 않고 비교할 수 있습니다.
+    """
+    if split_zip_source(path)[1] is not None:
+        return f'crc32:{zip_member_info(path).CRC:08x}'
+    return f'sha256:{file_sha256(path)}'
+
+
+def fingerprint_source(path):
+    """원본 파일의 크기, 수정 시각, 내용 해시"""
+    size, mtime = source_stat(path)
+    return {'size': size, 'mtime': mtime, 'hash': content_hash(path)}
+
+
+def is_source_unchanged(manifest, path):
+    """
+    원본 파일이 마지막 변환 이후 바뀌지 않았는지 확인합니다.
+    크기와 수정 시각이 같으면 해시 계산 없이 바로 판단하고, 다르면 내용 해시로 비교합니다.
+    """
+    entry = manifest['sources'].get(manifest_key(path))
+    if entry is None or not source_exists(path):
+        return False
+
+    size, mtime = source_stat(path)
+    if size != entry['size']:
+        return False
+    if mtime == entry['mtime']:
+        return True
+
+    # 수정 시각만 바뀐 경우(복사/재다운로드 등) 내용이 같으면 기록만 갱신합니다.
+    if content_hash(path) != entry.get('hash'):
+        return False
+    entry['mtime'] = mtime
+    return True
+
+
+def is_job_up_to_date(manifest, job):
+    """작업의 출력 파일이 있고, 같은 원본 목록에서 만들어졌으며, 원본이 모두 그대로인지 확인합니다."""
+    output = manifest['outputs'].get(manifest_key(job.output_path))
+    if output is None or not os.path.exists(job.output_path):
+        return False
+    if sorted(output['sources']) != sorted(manifest_key(path) for path in job.sources):
+        return False
+    return all(is_source_unchanged(manifest, path) for path in job.sources)
+
+
+def record_job(manifest, output_path, source_fingerprints, rows, duplicates=0):
+    """변환에 성공한 작업의 원본 지문과 출력 행 수(및 제거된 중복 행 수)를 매니페스트에 기록합니다."""
+    output_key = manifest_key(output_path)
+    # 같은 출력의 이전 원본 기록은 지우고 새로 기록합니다. (원본 목록이 바뀐 경우)
+    for source_key in manifest['outputs'].get(output_key, {}).get('sources', []):
+        manifest['sources'].pop(source_key, None)
+    for path, fingerprint in source_fingerprints.items():
+        manifest['sources'][manifest_key(path)] = dict(fingerprint, output=output_key)
+    manifest['outputs'][output_key] = {
+        'sources': sorted(manifest_key(path) for path in source_fingerprints),
+        'rows': rows,
+        'duplicates': duplicates,
+    }
+
+
+def validate_outputs(manifest):
+    """
+    매니페스트에 기록된 출력 파일을 한꺼번에 검증합니다.
+    파일이 없거나 Parquet 메타데이터의 행 수가 기록과 다르면 문제 목록에 담습니다.
+
+    Returns:
+        [(출력 경로, 문제 설명), ...]
+    """
+    problems = []
+    for output_key, output in sorted(manifest['outputs'].items()):
+        if not os.path.exists(output_key):
+            problems.append((output_key, '파일 없음'))
+            continue
+        try:
+            rows = pq.ParquetFile(output_key).metadata.num_rows
+        except Exception as e:
+            problems.append((output_key, f"읽기 실패: {e}"))
+            continue
+        if rows != output['rows']:
+            problems.append((output_key, f"행 수 불일치 (기록 {output['rows']:,}, 실제 {rows:,})"))
+    return problems
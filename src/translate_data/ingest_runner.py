@@ -0,0 +1,183 @@
+import argparse
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, NamedTuple
+
+from src.load_data.catalog import refresh_catalog
+from src.load_data.station_dictionary import (
+    load_station_dictionary,
+    set_registration_lock,
+)
+from src.translate_data.csv_ingest import (
+    convert_csv_to_parquet,
+    infer_year_month,
+    list_csv_sources,
+    monthly_output_path,
+)
+from src.translate_data.ingest_manifest import (
+    MANIFEST_PATH,
+    fingerprint_source,
+    is_job_up_to_date,
+    load_manifest,
+    record_job,
+    save_manifest,
+    validate_outputs,
+)
+
+# 기본 워커 수: 사용 가능한 CPU 코어 수
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+class IngestJob(NamedTuple):
+    """하나의 출력 Parquet 파일을 만드는 변환 작업 (원본 CSV 여러 개 → bycle_{YYYYMM}.parquet 1개)"""
+    sources: List[str]
+    output_path: str
+
+
+def plan_monthly_jobs(source_folder, output_folder='./data/parquet/'):
+    """
+    source_folder 아래의 모든 CSV(ZIP 안의 CSV 포함)를 재귀적으로 찾아 연월별 작업으로 묶습니다.
+    월별 파일(..._202107.csv)과 일별 파일(.../07/..._20220701.csv)을 모두 지원합니다.
+    """
+    csv_files = list_csv_sources(source_folder, recursive=True)
+
+    grouped = defaultdict(list)
+    for file_path in csv_files:
+        year_month = infer_year_month(file_path)
+        if year_month is None:
+            print(f"  ⚠️ 경고: 파일명에서 연월을 찾을 수 없습니다. 건너뜁니다: {file_path}")
+            continue
+        grouped[year_month].append(file_path)
+
+    return [
+        IngestJob(sources, monthly_output_path(output_folder, year, month))
+        for (year, month), sources in sorted(grouped.items())
+    ]
+
+
+def _run_job(job):
+    """워커 프로세스에서 실행됩니다. 예외는 결과로 돌려주어 배치 전체가 멈추지 않게 합니다."""
+    start_time = time.perf_counter()
+    fingerprints = {}
+    try:
+        # 변환 전에 원본 지문을 남겨, 변환 도중 원본이 바뀌면 다음 실행에서 다시 변환되게 합니다.
+        fingerprints = {path: fingerprint_source(path) for path in job.sources}
+        rows, duplicates = convert_csv_to_parquet(job.sources, job.output_path)
+        error = None
+    except Exception as e:
+        rows, duplicates = 0, 0
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        'output_path': job.output_path,
+        'sources': len(job.sources),
+        'rows': rows,
+        'duplicates': duplicates,
+        'seconds': time.perf_counter() - start_time,
+        'error': error,
+        'fingerprints': fingerprints,
+    }
+
+
+def run_ingest_jobs(jobs, max_workers=DEFAULT_WORKERS, manifest_path=MANIFEST_PATH, force=False):
+    """
+    변환 작업들을 프로세스 풀에 분산하여 실행하고, 파일별 처리 속도와 실패 여부를 출력합니다.
+    매니페스트(data/ingest_manifest.json)에 기록된 원본이 그대로인 작업은 건너뛰며,
+    force=True이면 모든 작업을 다시 변환합니다.
+
+    Returns:
+        실행한 작업별 결과 딕셔너리 목록 (output_path, sources, rows, duplicates, seconds, error, fingerprints)
+    """
+    manifest = load_manifest(manifest_path)
+    if not force:
+        pending_jobs = [job for job in jobs if not is_job_up_to_date(manifest, job)]
+        if len(pending_jobs) < len(jobs):
+            print(f"⏩ 변경이 없는 {len(jobs) - len(pending_jobs)}개 작업은 건너뜁니다.")
+            # 해시 비교로 확인한 수정 시각 갱신을 저장합니다.
+            save_manifest(manifest, manifest_path)
+        jobs = pending_jobs
+
+    if not jobs:
+        print("⏩ 처리할 작업이 없습니다.")
+        return []
+
+    max_workers = max(1, min(max_workers, len(jobs)))
+    print(f"--- 🚀 {len(jobs)}개 작업을 {max_workers}개 워커로 변환 시작 ---")
+    start_time = time.perf_counter()
+
+    # 대여소 사전을 미리 준비하고, 워커들이 새 대여소를 등록할 때 쓸 공유 잠금을 넘겨줍니다.
+    load_station_dictionary()
+    # 매니저는 풀이 끝나면 함께 종료되도록 with 블록으로 감쌉니다.
+    results = []
+    with multiprocessing.Manager() as manager:
+        registration_lock = manager.Lock()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=set_registration_lock,
+                                 initargs=(registration_lock,)) as executor:
+            futures = {executor.submit(_run_job, job): job for job in jobs}
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 워커 프로세스 자체가 비정상 종료된 경우
+                    result = {'output_path': job.output_path, 'sources': len(job.sources), 'rows': 0,
+                              'duplicates': 0, 'seconds': 0.0, 'error': f"{type(e).__name__}: {e}", 'fingerprints': {}}
+                results.append(result)
+                if not result['error']:
+                    # 작업이 끝날 때마다 기록하여 중간에 중단되어도 완료된 작업은 다시 변환하지 않습니다.
+                    record_job(manifest, result['output_path'], result['fingerprints'], result['rows'],
+                               result['duplicates'])
+                    save_manifest(manifest, manifest_path)
+
+                name = os.path.basename(result['output_path'])
+                if result['error']:
+                    print(f"  ❌ [{done}/{len(jobs)}] {name} 실패 → {result['error']}")
+                else:
+                    rows_per_sec = result['rows'] / result['seconds'] if result['seconds'] > 0 else 0
+                    read_rows = result['rows'] + result['duplicates']
+                    duplicate_rate = result['duplicates'] / read_rows if read_rows else 0
+                    print(f"  ✅ [{done}/{len(jobs)}] {name}: {result['rows']:,}행, "
+                          f"{result['seconds']:.1f}초 ({rows_per_sec:,.0f} rows/sec), "
+                          f"중복 제거 {result['duplicates']:,}행 ({duplicate_rate:.1%})")
+
+    elapsed = time.perf_counter() - start_time
+    failed = [r for r in results if r['error']]
+    total_rows = sum(r['rows'] for r in results)
+    total_duplicates = sum(r['duplicates'] for r in results)
+    print(f"\n🎉 완료: 성공 {len(results) - len(failed)}개, 실패 {len(failed)}개, "
+          f"총 {total_rows:,}행 (중복 제거 {total_duplicates:,}행), {elapsed:.1f}초")
+    for result in failed:
+        print(f"  - 실패: {result['output_path']} ({result['error']})")
+
+    return sorted(results, key=lambda r: r['output_path'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 CSV를 병렬로 월별 Parquet 파일로 변환합니다.")
+    parser.add_argument('source_folder', help="원본 CSV/ZIP이 있는 폴더 (하위 폴더 포함)")
+    parser.add_argument('--output', default='./data/parquet/', help="Parquet 저장 폴더")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="워커 프로세스 수")
+    parser.add_argument('--force', action='store_true', help="매니페스트와 관계없이 모든 파일을 다시 변환")
+    parser.add_argument('--validate', action='store_true', help="변환 대신 매니페스트의 출력 파일을 검증")
+    args = parser.parse_args()
+
+    if args.validate:
+        problems = validate_outputs(load_manifest())
+        for output_path, problem in problems:
+            print(f"  ❌ {output_path}: {problem}")
+        print(f"🔍 검증 완료: 문제 {len(problems)}개")
+        return
+
+    jobs = plan_monthly_jobs(args.source_folder, args.output)
+    run_ingest_jobs(jobs, max_workers=args.workers, force=args.force)
+
+    updated, removed = refresh_catalog()
+    print(f"🗂️ 카탈로그 갱신: {updated}개 갱신, {removed}개 삭제")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import pyarrow.parquet as pq
+
+from src.load_data.raw_dataset import RAW_DATA_DIR, RAW_SCHEMA, list_raw_files
+from src.load_data.station_dictionary import load_station_dictionary
+from src.translate_data.csv_ingest import (
+    DEFAULT_ROW_GROUP_SIZE,
+    is_sorted_raw_file,
+    iter_parquet_standard_batches,
+    write_sorted_parquet,
+)
+
+
+def migrate_raw_file(file_path, station_dictionary, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    원본 Parquet 파일 하나를 현재 RAW_SCHEMA로, (날짜, 시간대, 시작 대여소) 순으로 정렬하여 다시 기록합니다.
+    (문자열 대여소_ID → 대여소 사전 코드, int64/float64 → 좁은 타입, 집계_기준 제거, 중복 행 제거)
+
+    Returns:
+        (기록된 행 수, 제거된 중복 행 수). 이미 변환된 파일이면 None
+    """
+    with pq.ParquetFile(file_path) as parquet_file:
+        if parquet_file.schema_arrow.equals(RAW_SCHEMA) and is_sorted_raw_file(parquet_file):
+            return None
+
+    # row group 단위로 읽어 파일 전체를 메모리에 올리지 않습니다.
+    batches = iter_parquet_standard_batches(file_path, station_dictionary)
+    return write_sorted_parquet(batches, file_path, row_group_size=row_group_size)
+
+
+def migrate_raw_parquet(base_dir=RAW_DATA_DIR):
+    """data/parquet 아래의 기존 원본 Parquet 파일을 모두 현재 스키마로 변환합니다."""
+    files = list_raw_files(base_dir=base_dir)
+    station_dictionary = load_station_dictionary()
+    print(f"--- 🔄 {len(files)}개 원본 Parquet 파일 스키마 변환 시작 ---")
+
+    for file_path in files:
+        result = migrate_raw_file(file_path, station_dictionary)
+        if result is None:
+            print(f"  ⏩ 이미 최신 스키마입니다: {file_path}")
+            continue
+        rows, duplicates = result
+        print(f"  ✅ 변환 완료: {file_path} ({rows:,}행, 중복 제거 {duplicates:,}행)")
+
+    print(f"🎉 변환 완료! (대여소 사전: {len(station_dictionary):,}개 대여소)")
+
+
+if __name__ == '__main__':
+    migrate_raw_parquet()
@@ -0,0 +1,35 @@
+import glob
+import os
+
+from src.load_data.raw_dataset import RAW_DATA_DIR, raw_file_path
+from src.translate_data.csv_ingest import infer_year_month
+
+
+def relayout_raw_parquet(base_dir=RAW_DATA_DIR):
+    """
+    기존 data/parquet/{연도}/bycle_{YYYYMM}.parquet 배치를
+    Hive 파티션 배치(data/parquet/year=YYYY/month=MM/)로 옮깁니다.
+    """
+    legacy_files = sorted(glob.glob(os.path.join(base_dir, '[0-9][0-9][0-9][0-9]', 'bycle_*.parquet')))
+    print(f"--- 📦 {len(legacy_files)}개 파일을 year=/month= 파티션으로 이동 ---")
+
+    for file_path in legacy_files:
+        year_month = infer_year_month(file_path)
+        if year_month is None:
+            print(f"  ⚠️ 연월을 알 수 없어 건너뜁니다: {file_path}")
+            continue
+
+        target_path = raw_file_path(*year_month, base_dir=base_dir)
+        if os.path.exists(target_path):
+            print(f"  ⏩ 이미 존재하여 건너뜁니다: {target_path}")
+            continue
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(file_path, target_path)
+        print(f"  ✅ {file_path} → {target_path}")
+
+    print("🎉 이동 완료!")
+
+
+if __name__ == '__main__':
+    relayout_raw_parquet()